@@ -0,0 +1,123 @@
+import os
+import tempfile
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+class Settings:
+    """Runtime configuration, read once from environment variables"""
+
+    def __init__(self):
+        # Structured logging: level, and "json" lines or "text" for local development
+        self.log_level = os.getenv("REPORT_LOG_LEVEL", "INFO").upper()
+        self.log_format = os.getenv("REPORT_LOG_FORMAT", "json").lower()
+
+        # Report rendering pool: "process" spreads renders across cores,
+        # "thread" keeps everything in one process (cheaper startup, shares caches)
+        self.render_mode = os.getenv("REPORT_RENDER_MODE", "process").lower()
+        self.render_workers = _env_int("REPORT_RENDER_WORKERS", os.cpu_count() or 1)
+        self.render_queue_size = _env_int("REPORT_RENDER_QUEUE_SIZE", 2 * self.render_workers)
+        self.render_retry_after = _env_int("REPORT_RENDER_RETRY_AFTER", 5)
+
+        # Production server (serve.py): uvicorn worker processes sharing one socket,
+        # seconds a terminating worker keeps serving while /ready answers 503 (so
+        # load balancers stop routing to it), then seconds allowed for in-flight
+        # requests to finish once it stops accepting connections
+        self.server_host = os.getenv("REPORT_SERVER_HOST", "0.0.0.0")
+        self.server_port = _env_int("REPORT_SERVER_PORT", 8000)
+        self.server_workers = _env_int("REPORT_SERVER_WORKERS", os.cpu_count() or 1)
+        self.drain_seconds = _env_int("REPORT_DRAIN_SECONDS", 5)
+        self.graceful_timeout = _env_int("REPORT_GRACEFUL_TIMEOUT", 30)
+
+        # Startup pre-warm: "off" loads ReportLab/matplotlib on the first render,
+        # "import" loads them at startup, "render" also starts every render worker
+        # and renders a sample report in it. With REPORT_PREWARM_WAIT=1 the server
+        # only starts accepting connections once warm; otherwise /ready answers
+        # 503 until then.
+        self.prewarm = os.getenv("REPORT_PREWARM", "render").lower()
+        self.prewarm_wait = os.getenv("REPORT_PREWARM_WAIT", "0") == "1"
+
+        # Chart renderer: "vector" (native ReportLab drawing) or "matplotlib" (PNG)
+        self.chart_renderer = os.getenv("REPORT_CHART_RENDERER", "vector").lower()
+
+        # PDF output size: binary instead of ASCII85 streams, and the logo and PNG
+        # chart resampled to REPORT_PDF_IMAGE_DPI and re-encoded as JPEG. An optional
+        # TTF (embedded as a subset of the glyphs used) draws the section heading
+        # icons the standard PDF fonts lack
+        self.pdf_compact = os.getenv("REPORT_PDF_COMPACT", "1") == "1"
+        self.pdf_image_dpi = _env_int("REPORT_PDF_IMAGE_DPI", 150)
+        self.pdf_jpeg_quality = _env_int("REPORT_PDF_JPEG_QUALITY", 85)
+        self.pdf_symbol_font = os.getenv("REPORT_PDF_SYMBOL_FONT") or None
+
+        # Rendered chart PNG cache (0 disables the in-memory tier; a directory adds a disk tier)
+        self.chart_cache_size = _env_int("REPORT_CHART_CACHE_SIZE", 256)
+        self.chart_cache_dir = os.getenv("REPORT_CHART_CACHE_DIR") or None
+
+        # Whole-report PDF cache, bounded by entry count and total bytes
+        self.report_cache_size = _env_int("REPORT_CACHE_SIZE", 512)
+        self.report_cache_max_bytes = _env_int("REPORT_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+        self.report_cache_dir = os.getenv("REPORT_CACHE_DIR") or None
+
+        # PDF responses: "buffered" keeps the whole PDF in memory, "spooled" moves
+        # PDFs larger than the threshold to a temp file and streams it in chunks
+        self.response_mode = os.getenv("REPORT_RESPONSE_MODE", "buffered").lower()
+        self.spool_threshold = _env_int("REPORT_SPOOL_THRESHOLD", 2 * 1024 * 1024)
+        self.spool_dir = os.getenv("REPORT_SPOOL_DIR") or None
+        self.stream_chunk_size = _env_int("REPORT_STREAM_CHUNK_SIZE", 64 * 1024)
+
+        # Rows per LongTable chunk of the ledger and of the expense/income tables
+        self.ledger_chunk_rows = _env_int("REPORT_LEDGER_CHUNK_ROWS", 250)
+
+        # JSON finance payloads decoded with orjson and validated column by column
+        # (validate-finance, generate-report and the exports), and validate-finance
+        # responses serialized with orjson
+        self.json_fast_path = os.getenv("REPORT_JSON_FAST_PATH", "0") == "1"
+
+        # Abuse and overload protection for the rendering endpoints, per server process.
+        # Each client (the REPORT_CLIENT_HEADER value, e.g. X-API-Key or
+        # X-Forwarded-For, else the peer address) gets a token bucket of
+        # REPORT_RATE_LIMIT_BURST requests refilled at REPORT_RATE_LIMIT per minute
+        # (0 disables it). Expense and income lists hold at most REPORT_MAX_ITEMS
+        # entries each. Renders are admitted while their estimated costs (table rows
+        # laid out) fit in REPORT_ADMISSION_CAPACITY; others wait up to
+        # REPORT_ADMISSION_WAIT seconds, then get a 503
+        self.rate_limit_per_minute = _env_int("REPORT_RATE_LIMIT", 0)
+        self.rate_limit_burst = _env_int("REPORT_RATE_LIMIT_BURST", 10)
+        self.client_header = os.getenv("REPORT_CLIENT_HEADER") or None
+        self.max_items = _env_int("REPORT_MAX_ITEMS", 100_000)
+        self.admission_capacity = _env_int("REPORT_ADMISSION_CAPACITY", 500_000)
+        self.admission_wait = _env_int("REPORT_ADMISSION_WAIT", 10)
+
+        # Maximum number of payloads and body bytes accepted by the batch endpoint
+        self.batch_max_items = _env_int("REPORT_BATCH_MAX_ITEMS", 5000)
+        self.batch_max_bytes = _env_int("REPORT_BATCH_MAX_BYTES", 64 * 1024 * 1024)
+
+        # Bulk CSV/NDJSON uploads: rows validated per batch, total rows and bytes
+        # accepted, and how many row errors are reported back
+        self.upload_batch_rows = _env_int("REPORT_UPLOAD_BATCH_ROWS", 5000)
+        self.upload_max_rows = _env_int("REPORT_UPLOAD_MAX_ROWS", 1_000_000)
+        self.upload_max_bytes = _env_int("REPORT_UPLOAD_MAX_BYTES", 256 * 1024 * 1024)
+        self.upload_max_errors = _env_int("REPORT_UPLOAD_MAX_ERRORS", 100)
+
+        # Asynchronous report jobs: concurrent renders, waiting jobs, result lifetime
+        # (seconds after a job finishes)
+        self.job_workers = _env_int("REPORT_JOB_WORKERS", self.render_workers)
+        self.job_queue_size = _env_int("REPORT_JOB_QUEUE_SIZE", 100)
+        self.job_ttl = _env_int("REPORT_JOB_TTL", 3600)
+        self.job_dir = os.getenv("REPORT_JOB_DIR") or os.path.join(tempfile.gettempdir(), "farm_finance_jobs")
+
+        # Season ledgers (append-only transactions, running totals, reusable report pages)
+        self.season_db = os.getenv("REPORT_SEASON_DB") or os.path.join(
+            tempfile.gettempdir(), "farm_finance_seasons", "seasons.sqlite3"
+        )
+
+        # Analytics index of the latest totals per farm season, for district/crop rollups
+        self.analytics_db = os.getenv("REPORT_ANALYTICS_DB") or os.path.join(
+            tempfile.gettempdir(), "farm_finance_analytics", "analytics.sqlite3"
+        )
+
+
+settings = Settings()
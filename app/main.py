@@ -1,14 +1,56 @@
+import time
+
+# Start of the app import, for the startup report
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from app.routers import finance_router
+from app.config import settings
+from app.log import configure_logging, log_event
+from app.routers import analytics_router, finance_router, jobs_router, metrics_router, seasons_router
+from app.services.analytics import analytics_index
+from app.services.jobs import job_manager
+from app.services.metrics import http_requests_total, http_request_seconds
+from app.services.render_pool import render_pool
+from app.services.seasons import season_store
+from app.services.startup import prewarm, startup_report
+
+configure_logging(settings.log_level, settings.log_format)
+logger = logging.getLogger("app.main")
+startup_report.imported(_import_started)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup_report.timer.stage("job_manager"):
+        await job_manager.start()
+    # Pre-warm before accepting connections, or in the background while /ready answers 503
+    warming = None
+    if settings.prewarm_wait:
+        await prewarm()
+    else:
+        warming = asyncio.create_task(prewarm())
+    yield
+    if warming is not None:
+        warming.cancel()
+    await job_manager.stop()
+    # Let in-flight renders finish and stop the worker pool
+    render_pool.shutdown()
+    season_store.close()
+    analytics_index.close()
 
 
 app = FastAPI(
     title="Finance Report Generator",
     description="An API to generate financial reports based on user data.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Static files (CSS, JS)
@@ -26,8 +68,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def log_requests(request: Request, call_next):
+    """Stamp request arrival (used for validation timing), log and count every API request"""
+    request.state.started_at = time.perf_counter()
+    response = await call_next(request)
+    if request.url.path.startswith("/api"):
+        duration = time.perf_counter() - request.state.started_at
+        # Route template (e.g. /api/reports/{job_id}) keeps metric labels bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        http_requests_total.inc(method=request.method, route=route, status=str(response.status_code))
+        http_request_seconds.observe(duration, method=request.method, route=route)
+        log_event(
+            logger, logging.INFO, "request",
+            method=request.method,
+            path=request.url.path,
+            status=response.status_code,
+            duration_ms=round(duration * 1000, 3),
+        )
+    return response
+
+
 # Include routers
 app.include_router(finance_router)
+app.include_router(jobs_router)
+app.include_router(seasons_router)
+app.include_router(analytics_router)
+app.include_router(metrics_router)
 
 
 # Root endpoints
@@ -42,3 +110,10 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "ok"}
 
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 503 until the startup pre-warm is done and while draining, with the startup timings"""
+    report = startup_report.stats()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
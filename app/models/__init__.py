@@ -1,5 +1,6 @@
 from .farmer import FarmerDetails
 from .finance import ExpenseItem, IncomeItem
 from .payload import FinancePayload
+from .season import SeasonTransactions
 
-__all__ = ["FarmerDetails", "ExpenseItem", "IncomeItem", "FinancePayload"]
+__all__ = ["FarmerDetails", "ExpenseItem", "IncomeItem", "FinancePayload", "SeasonTransactions"]
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import List
+from app.config import settings
 from .farmer import FarmerDetails
 from .finance import ExpenseItem, IncomeItem
 
@@ -7,5 +8,5 @@ from .finance import ExpenseItem, IncomeItem
 class FinancePayload(BaseModel):
     """Complete finance submission"""
     farmer_details: FarmerDetails
-    expenses: List[ExpenseItem] = Field(..., min_length=1)
-    income: List[IncomeItem] = Field(..., min_length=1)
+    expenses: List[ExpenseItem] = Field(..., min_length=1, max_length=settings.max_items)
+    income: List[IncomeItem] = Field(..., min_length=1, max_length=settings.max_items)
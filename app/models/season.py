@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List
+from app.config import settings
+from .finance import ExpenseItem, IncomeItem
+
+
+class SeasonTransactions(BaseModel):
+    """Transactions appended to a season ledger; at least one of either kind"""
+    expenses: List[ExpenseItem] = Field(default_factory=list, max_length=settings.max_items)
+    income: List[IncomeItem] = Field(default_factory=list, max_length=settings.max_items)
+
+    @model_validator(mode="after")
+    def validate_not_empty(self):
+        if not self.expenses and not self.income:
+            raise ValueError("At least one expense or income entry is required")
+        return self
@@ -1,3 +1,7 @@
+from .analytics import router as analytics_router
 from .finance import router as finance_router
+from .jobs import router as jobs_router
+from .metrics import router as metrics_router
+from .seasons import router as seasons_router
 
-__all__ = ["finance_router"]
+__all__ = ["analytics_router", "finance_router", "jobs_router", "metrics_router", "seasons_router"]
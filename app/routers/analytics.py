@@ -0,0 +1,44 @@
+import asyncio
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from app.services.analytics import analytics_index
+
+router = APIRouter(
+    prefix="/api/analytics",
+    tags=["Analytics"]
+)
+
+
+@router.get("/rollup")
+async def rollup(group_by: str = "crop_name,season", state: Optional[str] = None, district: Optional[str] = None,
+                 taluka: Optional[str] = None, crop_name: Optional[str] = None, season: Optional[str] = None,
+                 year: Optional[int] = None, sown_from: Optional[date] = None, sown_to: Optional[date] = None):
+    """Aggregate every recorded farm season matching the filters, per group.
+
+    ``group_by`` is a comma-separated list of ``state``, ``district``,
+    ``taluka``, ``crop_name``, ``season`` and ``year`` (sowing year); the
+    other parameters filter on the same fields (place and crop names are
+    case-insensitive) and on the sowing date.
+    """
+    dimensions = [name.strip() for name in group_by.split(",") if name.strip()]
+    filters = {
+        name: value
+        for name, value in (("state", state), ("district", district), ("taluka", taluka),
+                            ("crop_name", crop_name), ("season", season), ("year", year))
+        if value is not None
+    }
+    try:
+        groups = await asyncio.to_thread(
+            analytics_index.rollup, dimensions, filters,
+            sown_from=sown_from.isoformat() if sown_from else None,
+            sown_to=sown_to.isoformat() if sown_to else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "group_by": dimensions,
+        "filters": {**filters, "sown_from": sown_from, "sown_to": sown_to},
+        "farm_seasons": sum(group["farm_seasons"] for group in groups),
+        "groups": groups,
+    }
@@ -1,7 +1,34 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
-from app.models import FinancePayload
-from app.services.finance_report_generator import FinanceReportGenerator
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from app.config import settings
+from app.log import log_event
+from app.models import FarmerDetails, FinancePayload
+from app.services.admission import (
+    admission, client_id, rate_limit, rate_limiter, report_cost, AdmissionTimedOut, ReportTooCostly,
+)
+from app.services.aggregates import aggregate_payload
+from app.services.analytics import analytics_index
+from app.services.batch import parse_batch_body, iter_batch_zip, report_filename
+from app.services.engines import render_report_output
+from app.services.export import EXPORT_SECTIONS, iter_csv, iter_xlsx
+from app.services.fast_json import decode_finance_payload
+from app.services.ingest import TransactionUploadParser, UploadInvalid, UploadRejected, UploadTooLarge
+from app.services.metrics import report_stage_seconds, report_failures_total
+from app.services.render_pool import render_pool, RenderPoolSaturated
+from app.services.report_cache import payload_fingerprint, upload_fingerprint, etag_for, etag_matches, get_or_render
+from app.services.report_options import REPORT_SECTIONS, ReportOptions
+from app.services.spool import RenderedPDF, iter_file_chunks
+from app.services.timing import StageTimer
+from app.services.transactions import ColumnarPayload, ReportPayload
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/api",
@@ -9,77 +36,302 @@ router = APIRouter(
 )
 
 
-@router.post("/validate-finance")
-async def validate_finance(payload: FinancePayload):
+async def _fast_finance_payload(request: Request) -> ReportPayload:
+    return decode_finance_payload(await request.body())
+
+
+# With REPORT_JSON_FAST_PATH the finance body is decoded by the dependency
+# instead of by FastAPI; the OpenAPI schema still documents it as FinancePayload
+if settings.json_fast_path:
+    FinanceBody = Annotated[ReportPayload, Depends(_fast_finance_payload)]
+    _finance_body_schema = {"requestBody": {"required": True, "content": {"application/json": {
+        "schema": {"$ref": "#/components/schemas/FinancePayload"}}}}}
+    _json_response_class = ORJSONResponse
+else:
+    FinanceBody = FinancePayload
+    _finance_body_schema = None
+    _json_response_class = JSONResponse
+
+
+def _report_options(
+    sections: Optional[str] = Query(None, description=f"Comma-separated sections to include: {', '.join(REPORT_SECTIONS)}"),
+    summary_only: bool = Query(False, description="Only the finance summary, chart and farmer details"),
+    max_pages: Optional[int] = Query(None, ge=1, description="Stop the report after this many pages"),
+) -> ReportOptions:
+    try:
+        return ReportOptions.from_request(sections, summary_only, max_pages)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _pdf_response(rendered: RenderedPDF, headers: dict) -> Response:
+    """Send an in-memory PDF directly, or stream a spooled one in fixed chunks.
+
+    The spooled file is deleted once the response is sent, even if its body
+    was never read (the client went away first).
+    """
+    if rendered.in_memory:
+        return Response(content=rendered.data, media_type="application/pdf", headers=headers)
+    return StreamingResponse(
+        iter_file_chunks(rendered, settings.stream_chunk_size),
+        media_type="application/pdf",
+        headers={**headers, "Content-Length": str(rendered.size)},
+        background=BackgroundTask(rendered.discard),
+    )
+
+
+def _validation_ms(request: Request) -> Optional[float]:
+    """Time from request arrival to handler entry: body read, JSON decode and Pydantic validation"""
+    started_at = getattr(request.state, "started_at", None)
+    return round((time.perf_counter() - started_at) * 1000, 3) if started_at else None
+
+
+@router.post("/validate-finance", response_class=_json_response_class, openapi_extra=_finance_body_schema)
+async def validate_finance(payload: FinanceBody, request: Request):
     """Validate finance data and calculate totals"""
-    print("\n" + "="*50)
-    print("📥 RECEIVED PAYLOAD:")
-    print("="*50)
-    print(f"👤 Farmer: {payload.farmer_details.farmer_name}")
-    print(f"🌾 Crop: {payload.farmer_details.crop_name}")
-    print(f"📅 Season: {payload.farmer_details.season}")
-    print(f"📍 Location: {payload.farmer_details.village}, {payload.farmer_details.district}")
-    print(f"\n💰 Expenses ({len(payload.expenses)} items):")
-    for idx, exp in enumerate(payload.expenses, 1):
-        print(f"  {idx}. {exp.category}: ₹{exp.amount} on {exp.expense_date}")
-    print(f"\n💵 Income ({len(payload.income)} items):")
-    for idx, inc in enumerate(payload.income, 1):
-        print(f"  {idx}. {inc.category}: ₹{inc.amount} on {inc.income_date}")
-    
+    validation_ms = _validation_ms(request)
     try:
-        total_expenses = sum(item.amount for item in payload.expenses)
-        total_income = sum(item.amount for item in payload.income)
-        net_profit = total_income - total_expenses
+        timer = StageTimer()
+        with timer.stage("aggregation"):
+            aggregates = aggregate_payload(payload)
+        if logger.isEnabledFor(logging.DEBUG):
+            for event, columns in (("expense_item", aggregates.expenses), ("income_item", aggregates.income)):
+                items = zip(columns.category_codes.tolist(), columns.amounts.tolist(), columns.iso_dates())
+                for idx, (code, amount, day) in enumerate(items, 1):
+                    log_event(logger, logging.DEBUG, event, index=idx, category=columns.categories[code],
+                              amount=amount, date=day)
         
-        print(f"\n📊 CALCULATION RESULTS:")
-        print(f"  Total Expenses: ₹{total_expenses}")
-        print(f"  Total Income: ₹{total_income}")
-        print(f"  Net Profit: ₹{net_profit}")
-        print("="*50 + "\n")
+        log_event(
+            logger, logging.INFO, "finance_validated",
+            crop=payload.farmer_details.crop_name,
+            season=payload.farmer_details.season,
+            district=payload.farmer_details.district,
+            expense_rows=len(payload.expenses),
+            income_rows=len(payload.income),
+            stages_ms={"validation": validation_ms, **timer.durations},
+            **aggregates.totals(),
+        )
         
         return {
             "status": "valid",
-            "total_expenses": total_expenses,
-            "total_income": total_income,
-            "net_profit": net_profit
+            **aggregates.totals(),
+            "cost_per_acre": aggregates.cost_per_acre,
+            "expense_by_category": aggregates.expense_by_category,
+            "income_by_category": aggregates.income_by_category,
+            "by_month": aggregates.by_month,
         }
     except Exception as e:
-        print(f"\n❌ ERROR: {str(e)}")
-        print("="*50 + "\n")
+        logger.exception("finance_validation_failed", extra={"fields": {"error": str(e)}})
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/generate-report")
-async def generate_report(payload: FinancePayload):
-    """Generate and download PDF finance report"""
-    print("\n" + "="*50)
-    print("📄 GENERATING PDF REPORT")
-    print("="*50)
-    print(f"👤 Farmer: {payload.farmer_details.farmer_name}")
-    print(f"🌾 Crop: {payload.farmer_details.crop_name}")
-    
+@router.post("/generate-report", openapi_extra=_finance_body_schema, dependencies=[Depends(rate_limit)])
+async def generate_report(payload: FinanceBody, request: Request,
+                          options: ReportOptions = Depends(_report_options),
+                          if_none_match: Optional[str] = Header(None)):
+    """Generate and download PDF finance report.
+
+    ``sections`` or ``summary_only`` select what the report contains and
+    ``max_pages`` cuts it off after that many pages. Reports too large to
+    render now wait briefly for capacity, then get a 503 (413 when they could
+    never fit; ``summary_only``, ``max_pages`` or a report job still can).
+    """
+    # Identical payloads (and options) produce the same report, identified by this ETag
+    return await _serve_report(payload, payload_fingerprint(payload, options), _validation_ms(request),
+                               if_none_match, options)
+
+
+@router.post("/export/csv", openapi_extra=_finance_body_schema)
+async def export_csv(payload: FinanceBody, section: str = "ledger"):
+    """Stream one section of the report's figures as CSV, without rendering a PDF.
+
+    ``section`` is ``ledger`` (default), ``expenses``, ``income`` or ``summary``.
+    """
+    if section not in EXPORT_SECTIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown section: {section} (one of {', '.join(EXPORT_SECTIONS)})")
+    return StreamingResponse(
+        iter_csv(payload, section),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f"attachment; filename={report_filename(payload, f'_{section}.csv')}"},
+    )
+
+
+@router.post("/export/xlsx", openapi_extra=_finance_body_schema)
+async def export_xlsx(payload: FinanceBody):
+    """Stream the report's figures as an XLSX workbook (summary, expenses, income and ledger sheets), without rendering a PDF"""
+    return StreamingResponse(
+        iter_xlsx(payload),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": f"attachment; filename={report_filename(payload, '.xlsx')}"},
+    )
+
+
+@router.post("/generate-report/upload", dependencies=[Depends(rate_limit)])
+async def generate_report_upload(request: Request, farmer_details: Annotated[FarmerDetails, Query()],
+                                 options: ReportOptions = Depends(_report_options),
+                                 if_none_match: Optional[str] = Header(None)):
+    """Generate a PDF report from a CSV or NDJSON upload of transactions.
+
+    Farmer details are query parameters; the body holds one transaction per
+    row or line (``type``, ``category``, ``amount``, ``date``, ``description``).
+    Rows are validated in batches while the body streams in and go straight
+    into columnar arrays; invalid rows are reported back with their line numbers.
+    ``sections``, ``summary_only`` and ``max_pages`` work as for ``/generate-report``.
+    """
     try:
-        # Generate PDF
-        generator = FinanceReportGenerator()
-        pdf_buffer = generator.generate(payload)
+        parser = TransactionUploadParser(request.headers.get("content-type", ""))
+        digest = hashlib.sha256()
+        # Parsing and validating a batch is CPU work: keep it off the event loop
+        async for chunk in request.stream():
+            digest.update(chunk)
+            await asyncio.to_thread(parser.feed, chunk)
+        expenses, income = await asyncio.to_thread(parser.finish)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UploadInvalid as e:
+        log_event(logger, logging.INFO, "upload_rejected", rows=parser.rows, error_count=e.error_count)
+        raise HTTPException(
+            status_code=422,
+            detail={"message": str(e), "error_count": e.error_count, "errors": e.errors},
+        )
+
+    payload = ColumnarPayload(farmer_details=farmer_details, expenses=expenses, income=income)
+    fingerprint = upload_fingerprint(farmer_details, digest.hexdigest(), options)
+    return await _serve_report(payload, fingerprint, _validation_ms(request), if_none_match, options)
+
+
+async def _serve_report(payload: ReportPayload, fingerprint: str, validation_ms: Optional[float],
+                        if_none_match: Optional[str], options: ReportOptions) -> Response:
+    """Answer a conditional request, or serve the report from cache or the render pool"""
+    if validation_ms is not None:
+        report_stage_seconds.observe(validation_ms / 1000, stage="validation")
+    fields = {
+        "crop": payload.farmer_details.crop_name,
+        "season": payload.farmer_details.season,
+        "expense_rows": len(payload.expenses),
+        "income_rows": len(payload.income),
+    }
+    if not options.full:
+        fields.update(sections=list(options.sections), max_pages=options.max_pages)
+    spool_threshold = settings.spool_threshold if settings.response_mode == "spooled" else None
+    cost = report_cost(len(payload.expenses), len(payload.income), options)
+
+    async def render() -> RenderedPDF:
+        # Generate the PDF on the render pool so the event loop stays free, once
+        # admitted: cache hits and shared renders never wait for admission
+        async with admission.admit(cost):
+            return await render_pool.run(
+                render_report_output, payload, datetime.now(), spool_threshold, settings.spool_dir, options
+            )
+
+    # A spooled PDF not handed to a response (an error, or the request was
+    # cancelled) is deleted here
+    rendered: Optional[RenderedPDF] = None
+    response: Optional[Response] = None
+    try:
+        etag = etag_for(fingerprint)
+        if etag_matches(if_none_match, etag):
+            log_event(logger, logging.INFO, "report_not_modified", **fields)
+            return Response(status_code=304, headers={"ETag": etag})
+
+        # Serve from the report cache, or render
+        render_started = time.perf_counter()
+        rendered, cache_hit = await get_or_render(fingerprint, render)
+        render_wall_ms = (time.perf_counter() - render_started) * 1000
+        # SQLite may wait on other server processes' writes: keep it off the event loop
+        await asyncio.to_thread(analytics_index.record_report, payload.farmer_details, rendered.stats)
         
         # Create filename
-        farmer_name = payload.farmer_details.farmer_name.replace(" ", "_")
-        crop_name = payload.farmer_details.crop_name.replace(" ", "_")
-        filename = f"Finance_Report_{farmer_name}_{crop_name}.pdf"
+        filename = report_filename(payload)
         
-        print(f"✅ PDF generated successfully: {filename}")
-        print("="*50 + "\n")
+        stages = {"validation": validation_ms, **rendered.stats.get("stages_ms", {})}
+        log_event(
+            logger, logging.INFO, "report_generated",
+            cache="hit" if cache_hit else "miss",
+            bytes=rendered.size,
+            pages=rendered.stats.get("pages"),
+            truncated=rendered.stats.get("truncated"),
+            stages_ms=stages,
+            total_ms=round(render_wall_ms + (validation_ms or 0), 3),
+            **fields,
+        )
         
         # Return PDF as downloadable file
-        return StreamingResponse(
-            pdf_buffer,
-            media_type="application/pdf",
+        response = _pdf_response(
+            rendered,
             headers={
-                "Content-Disposition": f"attachment; filename={filename}"
+                "Content-Disposition": f"attachment; filename={filename}",
+                "ETag": etag,
+                "X-Report-Cache": "hit" if cache_hit else "miss",
             }
         )
+        return response
+    except RenderPoolSaturated as e:
+        report_failures_total.inc(reason="saturated")
+        log_event(logger, logging.WARNING, "render_pool_saturated", error=str(e), **fields)
+        raise HTTPException(
+            status_code=503,
+            detail="Report service is busy, please retry shortly",
+            headers={"Retry-After": str(settings.render_retry_after)},
+        )
+    except ReportTooCostly as e:
+        report_failures_total.inc(reason="too_costly")
+        log_event(logger, logging.WARNING, "report_too_costly", cost=cost, error=str(e), **fields)
+        raise HTTPException(
+            status_code=413,
+            detail=f"{e}; use summary_only or max_pages, or queue it as a report job",
+        )
+    except AdmissionTimedOut as e:
+        report_failures_total.inc(reason="admission_timeout")
+        log_event(logger, logging.WARNING, "report_admission_timed_out", cost=cost, error=str(e), **fields)
+        raise HTTPException(
+            status_code=503,
+            detail="Report service is busy, please retry shortly",
+            headers={"Retry-After": str(settings.render_retry_after)},
+        )
     except Exception as e:
-        print(f"\n❌ PDF GENERATION ERROR: {str(e)}")
-        print("="*50 + "\n")
+        report_failures_total.inc(reason="error")
+        logger.exception("report_generation_failed", extra={"fields": {"error": str(e), **fields}})
         raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
+    finally:
+        if response is None and rendered is not None:
+            rendered.discard()
+
+
+@router.post("/generate-reports/batch", dependencies=[Depends(rate_limit)])
+async def generate_reports_batch(request: Request):
+    """Generate many reports at once and stream them back as a ZIP archive.
+
+    Accepts a JSON array of finance payloads, or NDJSON (one payload per line)
+    with ``Content-Type: application/x-ndjson``. Invalid or failed items are
+    reported inside the archive instead of failing the batch.
+    """
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.batch_max_bytes:
+            raise HTTPException(status_code=413, detail=f"Batch is larger than {settings.batch_max_bytes} bytes")
+    try:
+        # Decoding and validating thousands of payloads is CPU work: keep it off the event loop
+        items = await asyncio.to_thread(parse_batch_body, bytes(body), request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(items) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(items)} items; the limit is {settings.batch_max_items}",
+        )
+
+    # The request took one rate-limit token; every further report in it costs one more
+    rate_limiter.charge(client_id(request), sum(1 for _, payload, _ in items if payload is not None) - 1)
+
+    log_event(logger, logging.INFO, "batch_requested", items=len(items))
+    return StreamingResponse(
+        iter_batch_zip(items),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=Finance_Reports.zip"},
+    )
@@ -0,0 +1,61 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, JSONResponse
+from app.config import settings
+from app.log import log_event
+from app.models import FinancePayload
+from app.services.admission import rate_limit
+from app.services.jobs import job_manager, JobQueueFull, DONE
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/reports",
+    tags=["Report Jobs"]
+)
+
+
+@router.post("", status_code=202, dependencies=[Depends(rate_limit)])
+async def create_report_job(payload: FinancePayload):
+    """Queue a report for background generation and return its job id"""
+    try:
+        job_id = await job_manager.submit(payload)
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(settings.render_retry_after)},
+        )
+    log_event(logger, logging.INFO, "report_job_queued", job_id=job_id,
+              expense_rows=len(payload.expenses), income_rows=len(payload.income))
+    return JSONResponse(
+        status_code=202,
+        content=await job_manager.status(job_id),
+        headers={"Location": f"{router.prefix}/{job_id}"},
+    )
+
+
+@router.get("/{job_id}")
+async def get_report_job(job_id: str):
+    """Return the status and progress of a report job"""
+    status = await job_manager.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    if status["status"] == DONE:
+        status["download_url"] = f"{router.prefix}/{job_id}/pdf"
+    return status
+
+
+@router.get("/{job_id}/pdf")
+async def download_report_job(job_id: str):
+    """Download the PDF of a finished report job"""
+    status = await job_manager.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    if status["status"] != DONE:
+        raise HTTPException(status_code=409, detail=f"Report job is {status['status']}")
+    return FileResponse(
+        job_manager.store.result_path(job_id),
+        media_type="application/pdf",
+        filename=status["filename"],
+    )
@@ -0,0 +1,58 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.services.admission import admission
+from app.services.jobs import job_manager
+from app.services.metrics import registry, CallbackMetric
+from app.services.render_pool import render_pool
+from app.services.report_cache import chart_cache, report_cache
+from app.services.startup import startup_report
+
+router = APIRouter(tags=["Monitoring"])
+
+_caches = (chart_cache, report_cache)
+
+
+def _cache_stat(field: str):
+    return lambda: {(cache.name,): cache.stats()[field] for cache in _caches}
+
+
+registry.register(CallbackMetric(
+    "render_pool_in_flight", "Renders running or waiting on the render pool",
+    lambda: {(): render_pool.in_flight}))
+registry.register(CallbackMetric(
+    "render_pool_queued", "Renders waiting for a free render worker",
+    lambda: {(): render_pool.queued}))
+registry.register(CallbackMetric(
+    "admission_cost_in_flight", "Estimated cost (table rows) of the admitted renders not yet finished",
+    lambda: {(): admission.in_flight}))
+registry.register(CallbackMetric(
+    "admission_waiting", "Renders waiting for admission capacity",
+    lambda: {(): admission.waiting}))
+registry.register(CallbackMetric(
+    "report_jobs_queued", "Report jobs waiting in the job queue",
+    lambda: {(): job_manager.queued}))
+registry.register(CallbackMetric(
+    "startup_stage_seconds", "Time this server process spent in each startup stage", lambda: {
+        (stage,): ms / 1000 for stage, ms in startup_report.timer.durations.items()
+    }, labels=("stage",)))
+registry.register(CallbackMetric(
+    "server_ready", "1 once the startup pre-warm has finished, 0 again while draining",
+    lambda: {(): int(startup_report.ready and not startup_report.draining)}))
+registry.register(CallbackMetric(
+    "cache_hits_total", "Cache hits (memory and disk)", lambda: {
+        (cache.name,): cache.hits + cache.disk_hits for cache in _caches
+    }, labels=("cache",), kind="counter"))
+registry.register(CallbackMetric(
+    "cache_misses_total", "Cache misses", _cache_stat("misses"), labels=("cache",), kind="counter"))
+registry.register(CallbackMetric(
+    "cache_hit_ratio", "Share of cache lookups that hit", _cache_stat("hit_ratio"), labels=("cache",)))
+registry.register(CallbackMetric(
+    "cache_entries", "Entries held in memory", _cache_stat("entries"), labels=("cache",)))
+registry.register(CallbackMetric(
+    "cache_bytes", "Bytes held in memory", _cache_stat("bytes"), labels=("cache",)))
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text-format metrics for this server process"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
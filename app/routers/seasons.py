@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import JSONResponse, Response
+from app.config import settings
+from app.log import log_event
+from app.models import FarmerDetails, SeasonTransactions
+from app.services.admission import admission, rate_limit, report_cost, AdmissionTimedOut, ReportTooCostly
+from app.services.analytics import analytics_index
+from app.services.batch import report_filename
+from app.services.cache import content_key
+from app.services.metrics import report_failures_total
+from app.services.render_pool import render_pool, RenderPoolSaturated
+from app.services.engines import render_season_report
+from app.services.report_cache import etag_for, etag_matches, get_or_render, render_settings
+from app.services.seasons import (
+    SEASON_LAYOUT_VERSION,
+    SeasonHeaderPayload,
+    SeasonNotFound,
+    season_store,
+    season_summary,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/seasons",
+    tags=["Seasons"]
+)
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Report service is busy, please retry shortly",
+        headers={"Retry-After": str(settings.render_retry_after)},
+    )
+
+
+# Season store calls are synchronous SQLite work (an append can hold
+# REPORT_MAX_ITEMS transactions): they run in a thread, off the event loop
+async def _summary_or_404(season_id: str) -> dict:
+    try:
+        return await asyncio.to_thread(season_summary, season_id)
+    except SeasonNotFound:
+        raise HTTPException(status_code=404, detail="Season not found")
+
+
+@router.post("", status_code=201)
+async def create_season(farmer_details: FarmerDetails):
+    """Start a season ledger for a farmer and crop; transactions are appended to it later"""
+    season_id = await asyncio.to_thread(season_store.create, farmer_details)
+    log_event(logger, logging.INFO, "season_created", season_id=season_id,
+              crop=farmer_details.crop_name, season=farmer_details.season)
+    return JSONResponse(
+        status_code=201,
+        content=await asyncio.to_thread(season_summary, season_id),
+        headers={"Location": f"{router.prefix}/{season_id}"},
+    )
+
+
+@router.get("/{season_id}")
+async def get_season(season_id: str):
+    """Totals and breakdowns of a season, from its running totals"""
+    return await _summary_or_404(season_id)
+
+
+@router.post("/{season_id}/transactions")
+async def append_transactions(season_id: str, transactions: SeasonTransactions):
+    """Append expenses and/or income to a season and return its updated totals"""
+    try:
+        season = await asyncio.to_thread(season_store.append, season_id, transactions.expenses, transactions.income)
+    except SeasonNotFound:
+        raise HTTPException(status_code=404, detail="Season not found")
+    log_event(logger, logging.INFO, "season_appended", season_id=season_id, version=season["version"],
+              expense_rows=len(transactions.expenses), income_rows=len(transactions.income))
+    await asyncio.to_thread(analytics_index.record_report, season_store.farmer_details(season), {
+        "total_expenses": season["total_expenses"],
+        "total_income": season["total_income"],
+        "expense_rows": season["expense_count"],
+        "income_rows": season["income_count"],
+    }, source="season")
+    return await _summary_or_404(season_id)
+
+
+@router.get("/{season_id}/report", dependencies=[Depends(rate_limit)])
+async def season_report(season_id: str, if_none_match: Optional[str] = Header(None)):
+    """Download the season's PDF report.
+
+    Pages whose transactions have not changed since the last download are
+    reused, so re-downloading after a few new entries only lays out the pages
+    those entries touch.
+    """
+    try:
+        season = await asyncio.to_thread(season_store.get, season_id)
+    except SeasonNotFound:
+        raise HTTPException(status_code=404, detail="Season not found")
+    if not season["expense_count"] and not season["income_count"]:
+        raise HTTPException(status_code=409, detail="Season has no transactions yet")
+
+    # Every append bumps the version, which identifies the report
+    fingerprint = content_key("season-report", SEASON_LAYOUT_VERSION, *render_settings(),
+                              season_id, season["version"])
+    etag = etag_for(fingerprint)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    fields = {"season_id": season_id, "version": season["version"],
+              "expense_rows": season["expense_count"], "income_rows": season["income_count"]}
+    # Reused pages make this an overestimate after small appends
+    cost = report_cost(season["expense_count"], season["income_count"])
+
+    async def render():
+        async with admission.admit(cost):
+            return await render_pool.run(render_season_report, season_id, datetime.now())
+
+    try:
+        rendered, cache_hit = await get_or_render(fingerprint, render)
+    except RenderPoolSaturated as e:
+        report_failures_total.inc(reason="saturated")
+        log_event(logger, logging.WARNING, "render_pool_saturated", error=str(e), **fields)
+        raise _busy()
+    except AdmissionTimedOut as e:
+        report_failures_total.inc(reason="admission_timeout")
+        log_event(logger, logging.WARNING, "report_admission_timed_out", cost=cost, error=str(e), **fields)
+        raise _busy()
+    except ReportTooCostly as e:
+        report_failures_total.inc(reason="too_costly")
+        log_event(logger, logging.WARNING, "report_too_costly", cost=cost, error=str(e), **fields)
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        report_failures_total.inc(reason="error")
+        logger.exception("season_report_failed", extra={"fields": {"error": str(e), **fields}})
+        raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
+
+    log_event(
+        logger, logging.INFO, "season_report_generated",
+        cache="hit" if cache_hit else "miss",
+        bytes=rendered.size,
+        pages=rendered.stats.get("pages"),
+        reused_pages=rendered.stats.get("reused_pages"),
+        stages_ms=rendered.stats.get("stages_ms"),
+        **fields,
+    )
+    filename = report_filename(SeasonHeaderPayload(season_store.farmer_details(season)))
+    return Response(
+        content=rendered.data,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "ETag": etag,
+            "X-Report-Cache": "hit" if cache_hit else "miss",
+        },
+    )
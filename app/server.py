@@ -0,0 +1,89 @@
+import argparse
+import logging
+import os
+import time
+from typing import List, Optional
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+from app.config import settings
+from app.log import log_event
+
+logger = logging.getLogger("app.server")
+
+# Production entry point (see serve.py). A supervisor process binds the socket
+# and keeps ``workers`` uvicorn worker processes running on it, restarting any
+# that die. Only the supervisor imports this module's settings: workers are
+# spawned fresh and read their configuration, including the defaults set by
+# main(), from the environment.
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that drains before it shuts down.
+
+    On the first SIGTERM/SIGINT the worker reports itself as not ready
+    (``/ready`` answers 503) but keeps serving for ``drain_seconds``, so load
+    balancers stop routing to it without refusing requests already on their
+    way. It then stops accepting connections, gives in-flight requests the
+    graceful timeout, and runs the lifespan shutdown, which lets running renders
+    finish. A second SIGTERM/SIGINT exits immediately, without waiting for
+    in-flight requests or the lifespan shutdown.
+    """
+
+    def __init__(self, config: uvicorn.Config, drain_seconds: int = 0):
+        super().__init__(config)
+        self.drain_seconds = drain_seconds
+        self.drain_until: Optional[float] = None
+        self.drain_logged = False
+
+    def handle_exit(self, sig, frame) -> None:
+        # Signal handler: only flip flags here, on_tick() does the rest
+        if self.drain_until is None and self.drain_seconds > 0 and not self.should_exit:
+            from app.services.startup import startup_report
+
+            self.drain_until = time.monotonic() + self.drain_seconds
+            startup_report.draining = True
+            return
+        if self.drain_until is not None:
+            # Second signal: skip the rest of the drain and the graceful shutdown
+            self.force_exit = True
+        super().handle_exit(sig, frame)
+
+    async def on_tick(self, counter: int) -> bool:
+        if self.drain_until is not None and not self.should_exit:
+            if not self.drain_logged:
+                self.drain_logged = True
+                log_event(logger, logging.INFO, "draining", pid=os.getpid(), drain_seconds=self.drain_seconds)
+            if time.monotonic() >= self.drain_until:
+                self.should_exit = True
+        return await super().on_tick(counter)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the report service with several pre-warmed worker processes")
+    parser.add_argument("--host", default=settings.server_host)
+    parser.add_argument("--port", type=int, default=settings.server_port)
+    parser.add_argument("--workers", type=int, default=settings.server_workers,
+                        help="uvicorn worker processes (default: REPORT_SERVER_WORKERS or the CPU count)")
+    parser.add_argument("--drain-seconds", type=int, default=settings.drain_seconds)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.graceful_timeout)
+    args = parser.parse_args(argv)
+    workers = max(1, args.workers)
+
+    # Every worker has its own render pool: share the cores between them
+    # instead of starting a full pool per worker
+    os.environ.setdefault("REPORT_RENDER_WORKERS", str(max(1, (os.cpu_count() or 1) // workers)))
+    # Workers only accept connections once their render pool is warm
+    os.environ.setdefault("REPORT_PREWARM_WAIT", "1")
+
+    config = uvicorn.Config(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        # The app logs every API request itself (structured)
+        access_log=False,
+    )
+    server = DrainingServer(config, drain_seconds=args.drain_seconds)
+    sock = config.bind_socket()
+    Multiprocess(config, target=server.run, sockets=[sock]).run()
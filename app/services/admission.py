@@ -0,0 +1,225 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional, Tuple
+from fastapi import HTTPException, Request
+from app.config import settings
+from app.services.metrics import report_failures_total
+from app.services.report_options import ReportOptions
+
+# Cost of the report pages that do not grow with the transactions (summary,
+# chart, farmer details), in the unit of one table row
+BASE_COST = 500
+
+# Aggregating a transaction (every report does, whatever its sections) costs
+# about this share of laying out one table row
+AGGREGATE_WEIGHT = 0.05
+
+# Upper bound of table rows on one page: the report frame (672pt) over the
+# 9pt minimum row height, as in pdf.tables.max_table_rows
+ROWS_PER_PAGE = 75
+
+
+class RateLimited(Exception):
+    """Raised when a client has used up its request allowance"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit exceeded, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class ReportTooCostly(Exception):
+    """Raised for a report estimated to cost more than the whole admission capacity"""
+
+
+class AdmissionTimedOut(Exception):
+    """Raised when a report waited ``max_wait`` seconds without capacity freeing up"""
+
+
+def report_cost(expense_rows: int, income_rows: int, options: Optional[ReportOptions] = None) -> int:
+    """Estimated cost of rendering a report, in table rows laid out.
+
+    Expenses and income are tabled once in their own sections and again in the
+    ledger; ``max_pages`` caps the rows that are laid out at all.
+    """
+    sections = (options or ReportOptions()).sections
+    rows = 0
+    if "expenses" in sections:
+        rows += expense_rows
+    if "income" in sections:
+        rows += income_rows
+    if "ledger" in sections:
+        rows += expense_rows + income_rows
+    if options is not None and options.max_pages:
+        rows = min(rows, options.max_pages * ROWS_PER_PAGE)
+    return BASE_COST + rows + math.ceil((expense_rows + income_rows) * AGGREGATE_WEIGHT)
+
+
+class RateLimiter:
+    """Token bucket per client: ``burst`` requests at once, refilled at ``per_minute``.
+
+    Clients are tracked in an LRU of at most ``max_clients``; a client evicted
+    from it starts again with a full bucket. ``per_minute`` of 0 disables the limit.
+    """
+
+    def __init__(self, per_minute: float, burst: int, max_clients: int = 10_000):
+        self.rate = per_minute / 60
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, client: str) -> None:
+        """Take one token from ``client``'s bucket; raises ``RateLimited`` when it is empty"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self._buckets[client] = (tokens, now)
+                raise RateLimited((1 - tokens) / self.rate)
+            self._buckets[client] = (tokens - 1, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+
+    def charge(self, client: str, tokens: float) -> None:
+        """Take ``tokens`` more from ``client``'s bucket without a check, e.g. for
+        the items of a batch once its request has been let through.
+
+        The bucket may go below zero; the client then gets ``RateLimited``
+        until it has refilled past one token.
+        """
+        if not self.enabled or tokens <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            balance, updated = self._buckets.pop(client, (self.burst, now))
+            balance = min(self.burst, balance + (now - updated) * self.rate)
+            self._buckets[client] = (balance - tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+
+
+class AdmissionController:
+    """Admits renders while their estimated costs in flight fit in ``capacity``.
+
+    A render that does not fit waits (first come, first served) until enough
+    earlier ones finish, for at most ``max_wait`` seconds, then fails with
+    ``AdmissionTimedOut``. A render costing more than ``capacity`` on its own is
+    refused up front with ``ReportTooCostly``. Work is admitted before it is
+    handed to the render pool, so a few huge reports cannot take every worker
+    and all the memory while small ones queue behind them.
+    """
+
+    def __init__(self, capacity: int, max_wait: float):
+        self.capacity = max(1, capacity)
+        self.max_wait = max_wait
+        self._in_flight = 0
+        self._waiters: Deque[Tuple[int, "asyncio.Future[None]"]] = deque()
+
+    @property
+    def in_flight(self) -> int:
+        """Estimated cost of the renders admitted and not yet finished"""
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, future in self._waiters if not future.done())
+
+    def _fits(self, cost: int) -> bool:
+        return self._in_flight == 0 or self._in_flight + cost <= self.capacity
+
+    def _wake(self) -> None:
+        while self._waiters:
+            cost, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._fits(cost):
+                break
+            self._waiters.popleft()
+            self._in_flight += cost
+            future.set_result(None)
+
+    def _release(self, cost: int) -> None:
+        self._in_flight -= cost
+        self._wake()
+
+    @asynccontextmanager
+    async def admit(self, cost: int, background: bool = False) -> AsyncIterator[None]:
+        """Hold ``cost`` of the capacity for the duration of the block.
+
+        ``background`` work (report jobs, batch items) waits without a time limit, and a
+        cost above ``capacity`` is clamped to it so the render runs alone.
+        """
+        if cost > self.capacity:
+            if not background:
+                raise ReportTooCostly(
+                    f"Report is too large to render here (estimated cost {cost}, limit {self.capacity})"
+                )
+            cost = self.capacity
+        if not self._waiters and self._fits(cost):
+            self._in_flight += cost
+        else:
+            entry = (cost, asyncio.get_running_loop().create_future())
+            self._waiters.append(entry)
+            # Waiters that gave up may be all that is ahead of this one
+            self._wake()
+            try:
+                await asyncio.wait_for(asyncio.shield(entry[1]), None if background else self.max_wait)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if entry[1].done():
+                    # Admitted just as the wait ended
+                    self._release(cost)
+                else:
+                    entry[1].cancel()
+                    self._wake()
+                if isinstance(e, asyncio.TimeoutError):
+                    raise AdmissionTimedOut(
+                        f"Report service is at capacity ({self._in_flight} of {self.capacity} in flight)"
+                    )
+                raise
+        try:
+            yield
+        finally:
+            self._release(cost)
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_wait": self.max_wait,
+        }
+
+
+def client_id(request: Request) -> str:
+    """The client a request counts against: the ``REPORT_CLIENT_HEADER`` value when set, else the peer address"""
+    if settings.client_header:
+        value = request.headers.get(settings.client_header)
+        if value:
+            # X-Forwarded-For lists the original client first
+            return value.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def rate_limit(request: Request) -> None:
+    """Dependency of the rendering endpoints: 429 with ``Retry-After`` once the client's bucket is empty"""
+    try:
+        rate_limiter.acquire(client_id(request))
+    except RateLimited as e:
+        report_failures_total.inc(reason="rate_limited")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+
+
+rate_limiter = RateLimiter(settings.rate_limit_per_minute, settings.rate_limit_burst)
+admission = AdmissionController(settings.admission_capacity, settings.admission_wait)
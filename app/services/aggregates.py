@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, List, Tuple
+import numpy as np
+from app.services.transactions import ColumnarPayload, ReportPayload, TransactionColumns, ledger_order
+
+
+@dataclass
+class ReportAggregates:
+    """Every figure a report needs, computed once per payload"""
+    expenses: TransactionColumns
+    income: TransactionColumns
+    total_expenses: float
+    total_income: float
+    net_profit: float
+    cost_per_acre: float
+    expense_by_category: Dict[str, float]
+    income_by_category: Dict[str, float]
+    by_month: Dict[str, Dict[str, float]]
+
+    def totals(self) -> dict:
+        return {
+            "total_expenses": self.total_expenses,
+            "total_income": self.total_income,
+            "net_profit": self.net_profit,
+        }
+
+    @cached_property
+    def ledger_order(self) -> np.ndarray:
+        """Ledger (date) order over expenses followed by income; sorted on first use by a ledger"""
+        return ledger_order(self.expenses, self.income)
+
+
+def aggregate_payload(payload: ReportPayload) -> ReportAggregates:
+    """Convert the payload to columns once and derive totals and breakdowns from them"""
+    if isinstance(payload, ColumnarPayload):
+        expenses, income = payload.expenses, payload.income
+    else:
+        expenses = TransactionColumns.from_items(payload.expenses, "expense_date")
+        income = TransactionColumns.from_items(payload.income, "income_date")
+    return aggregate_columns(expenses, income, payload.farmer_details.total_acres)
+
+
+def aggregate_columns(expenses: TransactionColumns, income: TransactionColumns,
+                      total_acres: float) -> ReportAggregates:
+    total_expenses = expenses.total
+    total_income = income.total
+
+    return ReportAggregates(
+        expenses=expenses,
+        income=income,
+        total_expenses=total_expenses,
+        total_income=total_income,
+        net_profit=total_income - total_expenses,
+        cost_per_acre=total_expenses / total_acres if total_acres > 0 else 0,
+        expense_by_category=expenses.by_category(),
+        income_by_category=income.by_category(),
+        by_month=_by_month(expenses, income),
+    )
+
+
+def finance_summary_rows(total_income: float, total_expenses: float, total_acres: float) -> List[Tuple[str, float]]:
+    """(label, amount) rows of the finance summary: totals, profit or loss, cost of cultivation per acre"""
+    cost_per_acre = total_expenses / total_acres if total_acres > 0 else 0
+    net_profit = total_income - total_expenses
+    return [
+        ("Total Income", total_income),
+        ("Total Expense", total_expenses),
+        ("Profit" if net_profit >= 0 else "Loss", abs(net_profit)),
+        ("Cost of Cultivation/Acre", cost_per_acre),
+    ]
+
+
+def _by_month(expenses: TransactionColumns, income: TransactionColumns) -> Dict[str, Dict[str, float]]:
+    """{"YYYY-MM": {"income": ..., "expense": ...}} in calendar order"""
+    result: Dict[str, Dict[str, float]] = {}
+    for key, columns in (("expense", expenses), ("income", income)):
+        months, inverse = np.unique(columns.months(), return_inverse=True)
+        sums = np.bincount(inverse, weights=columns.amounts, minlength=len(months))
+        for month, total in zip(months, sums):
+            result.setdefault(str(month), {"income": 0.0, "expense": 0.0})[key] = round(float(total), 2)
+    return dict(sorted(result.items()))
@@ -0,0 +1,246 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from app.config import settings
+from app.log import log_event
+from app.models import FarmerDetails
+from app.services.cache import content_key
+
+logger = logging.getLogger(__name__)
+
+# Columns a rollup can be grouped or filtered by; "year" is the sowing year
+DIMENSIONS = ("state", "district", "taluka", "crop_name", "season", "year")
+
+# Quantiles (nearest rank) of net profit per acre reported for every group
+PROFIT_QUANTILES = (10, 25, 50, 75, 90)
+
+# Place and crop names compare case-insensitively (any script, unlike SQLite's
+# ASCII-only NOCASE): they are grouped and filtered on a stored lowercase key
+_NAME_KEYS = {"state": "state_key", "district": "district_key", "taluka": "taluka_key", "crop_name": "crop_key"}
+
+_TABLE = (
+    # One row per farm season (farmer, crop, season, sowing date and place);
+    # resubmissions of the same season replace its totals instead of adding a row
+    """
+    CREATE TABLE IF NOT EXISTS farm_seasons (
+        key TEXT PRIMARY KEY,
+        farmer_name TEXT NOT NULL,
+        crop_name TEXT NOT NULL,
+        crop_key TEXT NOT NULL,
+        season TEXT NOT NULL,
+        state TEXT NOT NULL,
+        state_key TEXT NOT NULL,
+        district TEXT NOT NULL,
+        district_key TEXT NOT NULL,
+        taluka TEXT NOT NULL,
+        taluka_key TEXT NOT NULL,
+        village TEXT NOT NULL,
+        sowing_date TEXT NOT NULL,
+        harvest_date TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        total_acres REAL NOT NULL,
+        total_expenses REAL NOT NULL,
+        total_income REAL NOT NULL,
+        expense_rows INTEGER NOT NULL,
+        income_rows INTEGER NOT NULL,
+        source TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """
+)
+
+_INDEXES = (
+    # Indexes on the NOCASE name columns, before the name keys were added
+    "DROP INDEX IF EXISTS farm_seasons_district",
+    "DROP INDEX IF EXISTS farm_seasons_taluka",
+    "DROP INDEX IF EXISTS farm_seasons_crop",
+    # The trailing totals make every index covering: rollups never read the table itself
+    "CREATE INDEX IF NOT EXISTS farm_seasons_district_key ON farm_seasons"
+    " (district_key, crop_key, season, sowing_date, total_acres, total_expenses, total_income)",
+    "CREATE INDEX IF NOT EXISTS farm_seasons_taluka_key ON farm_seasons"
+    " (taluka_key, crop_key, season, sowing_date, total_acres, total_expenses, total_income)",
+    "CREATE INDEX IF NOT EXISTS farm_seasons_crop_key ON farm_seasons"
+    " (crop_key, season, sowing_date, total_acres, total_expenses, total_income)",
+    "CREATE INDEX IF NOT EXISTS farm_seasons_sowing ON farm_seasons"
+    " (sowing_date, total_acres, total_expenses, total_income)",
+)
+
+
+def name_key(name: str) -> str:
+    """Case-insensitive form of a place or crop name, as stored in the ``*_key`` columns"""
+    return name.strip().lower()
+
+
+def _add_name_keys(db: sqlite3.Connection) -> None:
+    """Add and fill the name key columns of a database created before they existed"""
+    existing = {row[1] for row in db.execute("PRAGMA table_info(farm_seasons)")}
+    missing = [(name, key) for name, key in _NAME_KEYS.items() if key not in existing]
+    if not missing:
+        return
+    db.create_function("name_key", 1, name_key, deterministic=True)
+    for name, key in missing:
+        db.execute(f"ALTER TABLE farm_seasons ADD COLUMN {key} TEXT NOT NULL DEFAULT ''")
+        db.execute(f"UPDATE farm_seasons SET {key} = name_key({name})")
+
+
+def farm_season_key(farmer_details: FarmerDetails) -> str:
+    """Identity of a farm season: who grew what, when and where (not the acreage or harvest date)"""
+    return content_key(
+        "farm-season",
+        *(str(value).strip().lower() for value in (
+            farmer_details.farmer_name, farmer_details.crop_name, farmer_details.season,
+            farmer_details.sowing_date, farmer_details.village, farmer_details.taluka,
+            farmer_details.district, farmer_details.state,
+        )),
+    )
+
+
+class AnalyticsIndex:
+    """SQLite index of the latest totals of every farm season seen by the service.
+
+    Reports and season ledgers record their totals here; rollups by place,
+    crop, season and year are answered with indexed filters and SQL grouping
+    over the matching rows instead of re-reading payloads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None or self._pid != os.getpid():
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            db.row_factory = sqlite3.Row
+            with db:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                db.execute(_TABLE)
+                _add_name_keys(db)
+                for statement in _INDEXES:
+                    db.execute(statement)
+            self._db, self._pid = db, os.getpid()
+        return self._db
+
+    def record(self, farmer_details: FarmerDetails, total_expenses: float, total_income: float,
+               expense_rows: int, income_rows: int, source: str) -> None:
+        """Insert or replace the totals of one farm season"""
+        details = farmer_details
+        with self._lock, self.db:
+            self.db.execute(
+                """INSERT OR REPLACE INTO farm_seasons (key, farmer_name, crop_name, crop_key, season, state, state_key,
+                       district, district_key, taluka, taluka_key, village, sowing_date, harvest_date, year,
+                       total_acres, total_expenses, total_income, expense_rows, income_rows, source, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (farm_season_key(details), details.farmer_name, details.crop_name, name_key(details.crop_name),
+                 details.season, details.state, name_key(details.state), details.district,
+                 name_key(details.district), details.taluka, name_key(details.taluka), details.village,
+                 details.sowing_date.isoformat(),
+                 details.harvest_date.isoformat(), details.sowing_date.year, details.total_acres,
+                 total_expenses, total_income, expense_rows, income_rows, source, time.time()),
+            )
+
+    def record_report(self, farmer_details: FarmerDetails, stats: dict, source: str = "report") -> None:
+        """Record a freshly rendered report from its render stats (empty on cache hits, which are skipped).
+
+        Never raises: a failing index must not fail the report it describes.
+        """
+        if "total_expenses" not in stats:
+            return
+        try:
+            self.record(farmer_details, stats["total_expenses"], stats["total_income"],
+                        stats["expense_rows"], stats["income_rows"], source)
+        except sqlite3.Error as e:
+            log_event(logger, logging.WARNING, "analytics_record_failed", source=source, error=str(e))
+
+    def rollup(self, group_by: Sequence[str], filters: Dict[str, object], sown_from: Optional[str] = None,
+               sown_to: Optional[str] = None) -> List[dict]:
+        """Totals, cost of cultivation and profit distribution per group of farm seasons.
+
+        ``group_by`` and the keys of ``filters`` must be in ``DIMENSIONS``;
+        ``sown_from`` / ``sown_to`` bound the sowing date (ISO, inclusive).
+        """
+        unknown = [name for name in (*group_by, *filters) if name not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown dimension(s): {', '.join(unknown)}")
+
+        conditions = [f"{_NAME_KEYS.get(name, name)} = ?" for name in filters]
+        params: List[object] = [name_key(str(value)) if name in _NAME_KEYS else value
+                                for name, value in filters.items()]
+        if sown_from:
+            conditions.append("sowing_date >= ?")
+            params.append(sown_from)
+        if sown_to:
+            conditions.append("sowing_date <= ?")
+            params.append(sown_to)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # Groups are formed on the name keys; each shows one spelling of its name (the lowest)
+        columns = ", ".join(_NAME_KEYS.get(name, name) for name in group_by)
+        names = "".join(f"MIN({name}) AS {name}, " for name in group_by if name in _NAME_KEYS)
+        order = f"ORDER BY {columns}" if group_by else ""
+
+        with self._lock:
+            totals = self.db.execute(
+                f"""SELECT {columns + ', ' if group_by else ''}{names}COUNT(*) AS farm_seasons, SUM(total_acres) AS total_acres,
+                           SUM(total_expenses) AS total_expenses, SUM(total_income) AS total_income,
+                           SUM(total_income < total_expenses) AS loss_count
+                    FROM farm_seasons {where} {'GROUP BY ' + columns if group_by else ''} {order}""",
+                params,
+            ).fetchall()
+            # Plain tuples: (*group values, profit per acre), in group order
+            cursor = self.db.cursor()
+            cursor.row_factory = None
+            profits = cursor.execute(
+                f"""SELECT {columns + ', ' if group_by else ''}(total_income - total_expenses) / total_acres
+                    FROM farm_seasons {where} {order}""",
+                params,
+            ).fetchall()
+
+        values = np.fromiter((row[-1] for row in profits), dtype=np.float64, count=len(profits))
+        keys = [tuple(row[:-1]) for row in profits]
+        bounds = [0, *(i for i in range(1, len(keys)) if keys[i] != keys[i - 1]), len(keys)]
+        quantiles = {
+            keys[start]: {
+                f"p{q}": round(float(value), 2)
+                for q, value in zip(PROFIT_QUANTILES, np.percentile(values[start:end], PROFIT_QUANTILES,
+                                                                    method="inverted_cdf"))
+            }
+            for start, end in zip(bounds, bounds[1:]) if end > start
+        }
+
+        groups = []
+        for row in totals:
+            if not row["farm_seasons"]:
+                continue
+            acres = row["total_acres"]
+            net_profit = row["total_income"] - row["total_expenses"]
+            groups.append({
+                **{name: row[name] for name in group_by},
+                "farm_seasons": row["farm_seasons"],
+                "total_acres": round(acres, 2),
+                "total_expenses": round(row["total_expenses"], 2),
+                "total_income": round(row["total_income"], 2),
+                "net_profit": round(net_profit, 2),
+                "cost_per_acre": round(row["total_expenses"] / acres, 2),
+                "profit_per_acre": round(net_profit / acres, 2),
+                "loss_share": round(row["loss_count"] / row["farm_seasons"], 4),
+                "profit_per_acre_quantiles": quantiles[tuple(row[:len(group_by)])],
+            })
+        return groups
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db = None
+
+
+analytics_index = AnalyticsIndex(settings.analytics_db)
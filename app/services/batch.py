@@ -0,0 +1,139 @@
+import asyncio
+import json
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from pydantic import ValidationError
+from app.models import FinancePayload
+from app.services.admission import admission, report_cost
+from app.services.analytics import analytics_index
+from app.services.engines import render_report_output
+from app.services.render_pool import render_pool
+from app.services.report_cache import payload_fingerprint, get_or_render
+from app.services.spool import StreamSink
+from app.services.transactions import ReportPayload
+
+# (index, payload, error) - exactly one of payload / error is set
+BatchItem = Tuple[int, Optional[FinancePayload], Optional[dict]]
+
+
+def report_filename(payload: ReportPayload, suffix: str = ".pdf") -> str:
+    """Download filename for a farmer's report (or, with another ``suffix``, its data export)"""
+    farmer_name = payload.farmer_details.farmer_name.replace(" ", "_")
+    crop_name = payload.farmer_details.crop_name.replace(" ", "_")
+    return f"Finance_Report_{farmer_name}_{crop_name}{suffix}"
+
+
+def _validate_item(index: int, raw) -> BatchItem:
+    try:
+        return index, FinancePayload.model_validate(raw), None
+    except ValidationError as e:
+        return index, None, {"error": "validation_error", "details": e.errors(include_url=False, include_context=False)}
+
+
+def parse_batch_body(body: bytes, content_type: str) -> List[BatchItem]:
+    """Parse a JSON array or NDJSON body into per-item payloads or errors.
+
+    Invalid items become error entries instead of failing the whole batch.
+    Raises ``ValueError`` when the body itself is not a JSON array / NDJSON.
+    """
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        items = []
+        for index, line in enumerate(body.decode("utf-8").splitlines()):
+            if not line.strip():
+                continue
+            try:
+                raw = json.loads(line)
+            except json.JSONDecodeError as e:
+                items.append((index, None, {"error": "invalid_json", "details": str(e)}))
+                continue
+            items.append(_validate_item(index, raw))
+        return items
+
+    try:
+        raw_items = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Body is not valid JSON: {e}")
+    if not isinstance(raw_items, list):
+        raise ValueError("Body must be a JSON array of finance payloads")
+    return [_validate_item(index, raw) for index, raw in enumerate(raw_items)]
+
+
+async def _render_item(payload: FinancePayload) -> bytes:
+    """Render one batch item, waiting for admission and a free slot instead of failing when busy"""
+
+    async def render():
+        async with admission.admit(report_cost(len(payload.expenses), len(payload.income)), background=True):
+            return await render_pool.run_when_free(render_report_output, payload, datetime.now())
+
+    rendered, _ = await get_or_render(payload_fingerprint(payload), render)
+    await asyncio.to_thread(analytics_index.record_report, payload.farmer_details, rendered.stats, "batch")
+    return rendered.read_bytes()
+
+
+async def iter_batch_zip(items: List[BatchItem]) -> AsyncIterator[bytes]:
+    """Render the batch in parallel and yield a ZIP archive incrementally.
+
+    Each PDF is added as soon as it finishes (completion order), failed items
+    get an ``errors/<index>.json`` entry, and ``manifest.json`` comes last.
+    At most one render per pool worker is in flight, so a batch never floods
+    the queue that interactive requests rely on.
+    """
+    sink = StreamSink()
+    manifest = []
+    window = render_pool.max_workers
+    pending = set()
+    task_index = {}
+    queue = iter(items)
+
+    def add_error(index: int, error: dict) -> None:
+        name = f"errors/{index:05d}.json"
+        archive.writestr(name, json.dumps({"index": index, **error}, indent=2, default=str))
+        manifest.append({"index": index, "status": "error", "file": name, "error": error["error"]})
+
+    def schedule() -> None:
+        while len(pending) < window:
+            item = next(queue, None)
+            if item is None:
+                return
+            index, payload, error = item
+            if error is not None:
+                add_error(index, error)
+                continue
+            task = asyncio.ensure_future(_render_item(payload))
+            task_index[task] = (index, payload)
+            pending.add(task)
+
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        try:
+            schedule()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.discard(task)
+                    index, payload = task_index.pop(task)
+                    try:
+                        pdf_bytes = task.result()
+                    except Exception as e:
+                        add_error(index, {"error": "render_failed", "details": str(e)})
+                        continue
+                    name = f"{index:05d}_{report_filename(payload)}"
+                    archive.writestr(name, pdf_bytes)
+                    manifest.append({"index": index, "status": "ok", "file": name})
+                schedule()
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        finally:
+            # Client went away or something failed: stop outstanding renders
+            for task in pending:
+                task.cancel()
+
+        manifest.sort(key=lambda entry: entry["index"])
+        archive.writestr("manifest.json", json.dumps({
+            "total": len(items),
+            "succeeded": sum(1 for entry in manifest if entry["status"] == "ok"),
+            "failed": sum(1 for entry in manifest if entry["status"] == "error"),
+            "items": manifest,
+        }, indent=2))
+    yield sink.drain()
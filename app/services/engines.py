@@ -0,0 +1,82 @@
+import importlib
+import os
+import time
+from datetime import date, datetime
+from typing import Dict, Optional
+from app.config import settings
+from app.models import FinancePayload
+from app.services.spool import RenderedPDF
+
+# ReportLab (and matplotlib, for PNG charts) make up most of the service's
+# import time, so the API layer only references the thin entry points below:
+# the engine modules are imported by the first render in each process, or
+# ahead of time by warm_up() from the startup hook.
+
+ENGINE_MODULES = (
+    "app.services.finance_report_generator",
+    "app.services.season_report",
+)
+
+# Only the PNG chart renderer needs matplotlib
+MATPLOTLIB_MODULES = (
+    "matplotlib.figure",
+    "matplotlib.backends.backend_agg",
+)
+
+
+def render_report_output(*args, **kwargs) -> RenderedPDF:
+    """``finance_report_generator.render_report_output``, loading the engine on first use.
+
+    Module-level so process pools can pickle it.
+    """
+    from app.services.finance_report_generator import render_report_output as render
+    return render(*args, **kwargs)
+
+
+def render_season_report(*args, **kwargs) -> RenderedPDF:
+    """``season_report.render_season_report``, loading the engine on first use.
+
+    Module-level so process pools can pickle it.
+    """
+    from app.services.season_report import render_season_report as render
+    return render(*args, **kwargs)
+
+
+def load_engines(chart_renderer: Optional[str] = None) -> Dict[str, float]:
+    """Import the report engines into this process; returns milliseconds per module (0 if already loaded)"""
+    modules = list(ENGINE_MODULES)
+    if (chart_renderer or settings.chart_renderer) != "vector":
+        modules.extend(MATPLOTLIB_MODULES)
+    timings = {}
+    for name in modules:
+        started = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = round((time.perf_counter() - started) * 1000, 3)
+    return timings
+
+
+def _sample_payload() -> FinancePayload:
+    return FinancePayload(**{
+        "farmer_details": {
+            "farmer_name": "Warm-up", "crop_name": "Rice", "season": "Kharif", "total_acres": 1,
+            "sowing_date": date(2000, 6, 1), "harvest_date": date(2000, 10, 1),
+            "village": "-", "taluka": "-", "district": "-", "state": "-",
+        },
+        "expenses": [{"category": "Seeds", "amount": 1, "expense_date": date(2000, 6, 1)}],
+        "income": [{"category": "Crop Sale", "amount": 1, "income_date": date(2000, 10, 1)}],
+    })
+
+
+def warm_up(render: bool = True) -> dict:
+    """Load the engines into this process and optionally render a one-row report.
+
+    The sample render fills what the first real report would otherwise pay
+    for (font metrics, the logo, page header forms). Module-level so process
+    pools can pickle it; returns the process id and timings.
+    """
+    stats = {"pid": os.getpid(), "imports_ms": load_engines()}
+    if render:
+        started = time.perf_counter()
+        render_report_output(_sample_payload(), datetime(2000, 10, 1))
+        stats["render_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return stats
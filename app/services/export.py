@@ -0,0 +1,278 @@
+import csv
+import io
+import logging
+import re
+import time
+import zipfile
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+from app.config import settings
+from app.log import log_event
+from app.services.aggregates import ReportAggregates, aggregate_payload, finance_summary_rows
+from app.services.spool import StreamSink
+from app.services.transactions import LEDGER_HEADER, TRANSACTION_HEADER, ReportPayload, TransactionColumns, iter_ledger_entries
+
+logger = logging.getLogger(__name__)
+
+# Sections of an export, in workbook sheet order; a CSV export holds one of them
+EXPORT_SECTIONS = ("summary", "expenses", "income", "ledger")
+
+SUMMARY_HEADER = ["Item", "Amount"]
+
+# Text starting with one of these is read as a formula by Excel and Sheets;
+# categories and descriptions are user input, so such cells are kept as text
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+# Sheet title and column widths (in characters) per section
+_SHEETS = {
+    "summary": ("Summary", (28, 16)),
+    "expenses": ("Expenses", (8, 20, 14, 12, 40)),
+    "income": ("Income", (8, 20, 14, 12, 40)),
+    "ledger": ("Ledger", (12, 20, 18, 40, 14)),
+}
+
+
+def section_rows(aggregates: ReportAggregates, total_acres: float, section: str) -> Tuple[List[str], Iterator[tuple]]:
+    """Header and rows of one export section, the same figures the PDF tables show.
+
+    Rows hold plain values (``date`` objects, float amounts, "" for a missing
+    description) and are produced lazily, one at a time.
+    """
+    if section == "summary":
+        return SUMMARY_HEADER, iter(finance_summary_rows(aggregates.total_income, aggregates.total_expenses,
+                                                         total_acres))
+    if section == "expenses":
+        return TRANSACTION_HEADER, _transaction_rows(aggregates.expenses)
+    if section == "income":
+        return TRANSACTION_HEADER, _transaction_rows(aggregates.income)
+    if section == "ledger":
+        return LEDGER_HEADER, iter_ledger_entries(aggregates.expenses, aggregates.income, missing_description="",
+                                                  order=aggregates.ledger_order)
+    raise ValueError(f"Unknown export section: {section}")
+
+
+def _transaction_rows(columns: TransactionColumns) -> Iterator[tuple]:
+    """(#, category, amount, date, description) rows, in submission order like the itemised PDF tables"""
+    categories = columns.categories
+    rows = zip(columns.category_codes.tolist(), columns.amounts.tolist(), columns.days.tolist(),
+               columns.description_labels(""))
+    for idx, (code, amount, day, description) in enumerate(rows, 1):
+        yield idx, categories[code], amount, date.fromordinal(day), description
+
+
+def iter_csv(payload: ReportPayload, section: str = "ledger", chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """Yield one section as UTF-8 CSV in chunks of about ``chunk_size`` bytes.
+
+    Amounts are written with two decimals and no thousands separators, dates
+    as ISO, and text that would start a formula behind a ``'``; memory use does
+    not grow with the number of rows written.
+    """
+    started = time.perf_counter()
+    chunk_size = chunk_size or settings.stream_chunk_size
+    header, rows = section_rows(aggregate_payload(payload), payload.farmer_details.total_acres, section)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    count = size = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        count += 1
+        if buffer.tell() >= chunk_size:
+            chunk = buffer.getvalue().encode("utf-8")
+            size += len(chunk)
+            yield chunk
+            buffer.seek(0)
+            buffer.truncate()
+    chunk = buffer.getvalue().encode("utf-8")
+    yield chunk
+    log_event(logger, logging.INFO, "export_generated", format="csv", section=section, rows=count,
+              bytes=size + len(chunk), duration_ms=round((time.perf_counter() - started) * 1000, 3))
+
+
+def _csv_value(value):
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_xlsx(payload: ReportPayload, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """Yield an XLSX workbook with one sheet per section in chunks of about ``chunk_size`` bytes.
+
+    Worksheets are written row by row into a streamed ZIP (inline strings, no
+    shared string table), so memory use does not grow with the number of rows.
+    Text that would start a formula gets a quote-prefix style, the XLSX form of
+    a leading ``'``.
+    """
+    started = time.perf_counter()
+    chunk_size = chunk_size or settings.stream_chunk_size
+    aggregates = aggregate_payload(payload)
+    sink = StreamSink()
+    text_cells: Dict[str, str] = {}
+    count = size = 0
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _workbook_parts(EXPORT_SECTIONS):
+            archive.writestr(name, content)
+        for n, section in enumerate(EXPORT_SECTIONS, 1):
+            header, rows = section_rows(aggregates, payload.farmer_details.total_acres, section)
+            with archive.open(f"xl/worksheets/sheet{n}.xml", mode="w") as sheet:
+                batch = [_sheet_start(_SHEETS[section][1]), _header_row(header)]
+                for row in rows:
+                    batch.append(_xlsx_row(row, text_cells))
+                    count += 1
+                    if len(batch) >= _ROWS_PER_WRITE:
+                        sheet.write("".join(batch).encode("utf-8"))
+                        batch.clear()
+                        if sink.pending >= chunk_size:
+                            chunk = sink.drain()
+                            size += len(chunk)
+                            yield chunk
+                batch.append(_SHEET_END)
+                sheet.write("".join(batch).encode("utf-8"))
+    chunk = sink.drain()
+    yield chunk
+    log_event(logger, logging.INFO, "export_generated", format="xlsx", section="all", rows=count,
+              bytes=size + len(chunk), duration_ms=round((time.perf_counter() - started) * 1000, 3))
+
+
+# Minimal SpreadsheetML (XLSX) package: workbook, styles and one worksheet per section
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# Cell formats (cellXfs indexes in the styles part)
+_DATE_STYLE = 1
+_AMOUNT_STYLE = 2
+_HEADER_STYLE = 3
+_QUOTED_TEXT_STYLE = 4
+
+_STYLES = (
+    _XML_DECLARATION
+    + f'<styleSheet xmlns="{_MAIN_NS}">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="5">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0" quotePrefix="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+_SHEET_END = "</sheetData></worksheet>"
+
+# Spreadsheet dates are days since 1899-12-30
+_EXCEL_EPOCH_ORDINAL = date(1899, 12, 30).toordinal()
+
+# Control characters are not allowed in XML 1.0
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Distinct strings whose cell XML is kept per export, and rows written to the ZIP at once
+_TEXT_CACHE_SIZE = 4096
+_ROWS_PER_WRITE = 256
+
+
+def _workbook_parts(sections: Sequence[str]) -> List[Tuple[str, str]]:
+    """Every part of the package except the worksheets themselves"""
+    count = len(sections)
+    sheet_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+    content_types = (
+        _XML_DECLARATION
+        + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml"'
+        ' ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/styles.xml"'
+        ' ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        + "".join(f'<Override PartName="/xl/worksheets/sheet{n}.xml" ContentType="{sheet_type}"/>'
+                  for n in range(1, count + 1))
+        + "</Types>"
+    )
+    package_rels = (
+        _XML_DECLARATION
+        + f'<Relationships xmlns="{_PKG_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    )
+    workbook = (
+        _XML_DECLARATION
+        + f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>'
+        + "".join(f'<sheet name="{_SHEETS[section][0]}" sheetId="{n}" r:id="rId{n}"/>'
+                  for n, section in enumerate(sections, 1))
+        + "</sheets></workbook>"
+    )
+    workbook_rels = (
+        _XML_DECLARATION
+        + f'<Relationships xmlns="{_PKG_REL_NS}">'
+        + "".join(f'<Relationship Id="rId{n}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{n}.xml"/>'
+                  for n in range(1, count + 1))
+        + f'<Relationship Id="rId{count + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+        "</Relationships>"
+    )
+    return [
+        ("[Content_Types].xml", content_types),
+        ("_rels/.rels", package_rels),
+        ("xl/workbook.xml", workbook),
+        ("xl/_rels/workbook.xml.rels", workbook_rels),
+        ("xl/styles.xml", _STYLES),
+    ]
+
+
+def _sheet_start(widths: Sequence[int]) -> str:
+    """Worksheet opening: frozen header row and column widths"""
+    cols = "".join(f'<col min="{n}" max="{n}" width="{width}" customWidth="1"/>'
+                   for n, width in enumerate(widths, 1))
+    return (
+        _XML_DECLARATION
+        + f'<worksheet xmlns="{_MAIN_NS}">'
+        '<sheetViews><sheetView workbookViewId="0">'
+        '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+        "</sheetView></sheetViews>"
+        f"<cols>{cols}</cols><sheetData>"
+    )
+
+
+def _header_row(values: Sequence[str]) -> str:
+    return "<row>" + "".join(_text_cell(value, _HEADER_STYLE) for value in values) + "</row>"
+
+
+def _xlsx_row(values: Sequence, text_cells: Dict[str, str]) -> str:
+    """One worksheet row; ``text_cells`` caches the cells of strings seen before (categories repeat a lot)"""
+    cells = []
+    for value in values:
+        kind = type(value)
+        if kind is str:
+            cell = text_cells.get(value)
+            if cell is None:
+                cell = _text_cell(value, _QUOTED_TEXT_STYLE if value.startswith(FORMULA_PREFIXES) else 0)
+                if len(text_cells) < _TEXT_CACHE_SIZE:
+                    text_cells[value] = cell
+        elif kind is float:
+            cell = f'<c s="{_AMOUNT_STYLE}"><v>{value!r}</v></c>'
+        elif kind is int:
+            cell = f"<c><v>{value}</v></c>"
+        else:
+            cell = f'<c s="{_DATE_STYLE}"><v>{value.toordinal() - _EXCEL_EPOCH_ORDINAL}</v></c>'
+        cells.append(cell)
+    return "<row>" + "".join(cells) + "</row>"
+
+
+def _text_cell(value: str, style: int = 0) -> str:
+    if not value:
+        return "<c/>"
+    text = escape(_XML_ILLEGAL.sub("", value))
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    style_attr = f' s="{style}"' if style else ""
+    return f'<c t="inlineStr"{style_attr}><is><t{space}>{text}</t></is></c>'
@@ -0,0 +1,101 @@
+from datetime import date
+from typing import List, Optional
+import numpy as np
+import orjson
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from app.config import settings
+from app.models import FarmerDetails, FinancePayload
+from app.services.ingest import CATEGORY_MAX_LENGTH, DESCRIPTION_MAX_LENGTH
+from app.services.transactions import (
+    ColumnarPayload, ReportPayload, TransactionColumns, TransactionColumnsBuilder,
+)
+
+
+def decode_finance_payload(body: bytes) -> ReportPayload:
+    """Decode and validate a JSON finance payload body (``REPORT_JSON_FAST_PATH``).
+
+    The body is parsed with orjson and the expense and income lists are
+    checked a column at a time, each distinct category, date and description
+    once, going straight into ``TransactionColumns`` without an
+    ``ExpenseItem``/``IncomeItem`` per row.
+    Only the plain shape is taken this way (numeric amounts, ``YYYY-MM-DD``
+    dates, string or null descriptions); anything else, valid or not, is
+    validated by ``FinancePayload`` as usual, so the result and the 422 errors
+    are the same as without the fast path.
+    """
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        data = None
+    if isinstance(data, dict):
+        payload = _columnar_payload(data)
+        if payload is not None:
+            return payload
+
+    try:
+        return FinancePayload.model_validate_json(body)
+    except ValidationError as e:
+        # Same shape as FastAPI's own body errors
+        errors = [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        raise RequestValidationError(errors, body=body)
+
+
+def _columnar_payload(data: dict) -> Optional[ColumnarPayload]:
+    expenses, income = data.get("expenses"), data.get("income")
+    if not (isinstance(expenses, list) and expenses and isinstance(income, list) and income):
+        return None
+    if len(expenses) > settings.max_items or len(income) > settings.max_items:
+        return None
+    try:
+        farmer_details = FarmerDetails.model_validate(data.get("farmer_details"))
+    except ValidationError:
+        return None
+    expense_columns = _item_columns(expenses, "expense_date")
+    income_columns = _item_columns(income, "income_date") if expense_columns is not None else None
+    if income_columns is None:
+        return None
+    return ColumnarPayload(farmer_details=farmer_details, expenses=expense_columns, income=income_columns)
+
+
+def _item_columns(items: List[object], date_field: str) -> Optional[TransactionColumns]:
+    """Columns for a list of ExpenseItem/IncomeItem-shaped dicts, or None unless every item is plainly valid"""
+    if {type(item) for item in items} != {dict}:
+        return None
+    categories = [item.get("category") for item in items]
+    amounts = [item.get("amount") for item in items]
+    dates = [item.get(date_field) for item in items]
+    descriptions = [item.get("description") for item in items]
+
+    # bool is an int: only plain numbers pass
+    if not {type(amount) for amount in amounts} <= {int, float}:
+        return None
+    try:
+        amount_values = np.asarray(amounts, dtype=np.float64)
+        # A season has few distinct categories, dates and descriptions: check each value once
+        day_of = {text: _day(text) for text in dict.fromkeys(dates)}
+        distinct_categories = dict.fromkeys(categories)
+        distinct_descriptions = dict.fromkeys(descriptions)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if not (np.isfinite(amount_values) & (amount_values > 0)).all():
+        return None
+    if not all(type(category) is str and 0 < len(category) <= CATEGORY_MAX_LENGTH
+               for category in distinct_categories):
+        return None
+    if not all(description is None or type(description) is str and len(description) <= DESCRIPTION_MAX_LENGTH
+               for description in distinct_descriptions):
+        return None
+
+    builder = TransactionColumnsBuilder()
+    builder.extend(categories, amounts, [day_of[text] for text in dates], descriptions)
+    return builder.build()
+
+
+def _day(text: str) -> int:
+    """Day ordinal of a ``YYYY-MM-DD`` date; ValueError/TypeError for anything else"""
+    day = date.fromisoformat(text)
+    # fromisoformat also takes other ISO forms (e.g. "20240601", "2024-W23-1")
+    if day.isoformat() != text:
+        raise ValueError(f"Not a YYYY-MM-DD date: {text}")
+    return day.toordinal()
@@ -1,90 +1,206 @@
+import time
 from datetime import datetime
 from io import BytesIO
+from typing import BinaryIO, Optional
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
-from app.models import FinancePayload
-from app.services.pdf.styles import build_styles
-from app.services.pdf.tables import farmer_table, expense_table, income_table, finance_summary_section, ledger_table
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from app.services.transactions import ReportPayload
+from app.services.aggregates import aggregate_payload
+from app.services.pdf.styles import report_styles
+from app.services.pdf.tables import (
+    farmer_table, expense_table, income_table, finance_summary_section, ledger_tables, max_table_rows,
+)
 from app.services.pdf.header import draw_page_header
-from app.services.pdf.footer import draw_page_footer
-from app.services.pdf.chart import generate_income_expense_chart
+from app.services.pdf.footer import draw_page_footer, draw_truncation_note
+from app.services.pdf.output import configure_pdf_output, heading_text
+from app.services.pdf.chart import build_chart_flowable
+from app.services.report_options import ReportOptions
+from app.services.spool import PDFSpool, RenderedPDF
+from app.services.timing import StageTimer
+
+
+# Stream encoding applies to every document this process renders
+configure_pdf_output()
+
+
+class ReportDocument(SimpleDocTemplate):
+    """``SimpleDocTemplate`` that stops laying out once ``max_pages`` pages are complete.
+
+    When flowables are left at the end of the last allowed page, that page
+    gets a note saying the report is cut off and ``truncated`` is set; the
+    remaining flowables are dropped, so the build ends there and the document
+    is saved with the pages done so far.
+    """
+
+    def __init__(self, *args, max_pages: Optional[int] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_pages = max_pages
+        self.truncated = False
+        self._remaining: list = []
+
+    def handle_pageEnd(self):
+        # Layout only ends a page with flowables left when they need another one
+        if self.max_pages is not None and self.page >= self.max_pages and self._remaining:
+            self.truncated = True
+            draw_truncation_note(self.canv, self.page)
+            super().handle_pageEnd()
+            # The next page only begins when another flowable is laid out
+            del self._remaining[:]
+            return
+        super().handle_pageEnd()
+
+    def build(self, flowables, **kwargs):
+        # Layout consumes this very list
+        self._remaining = flowables
+        super().build(flowables, **kwargs)
+
+
+def report_document(buffer: BinaryIO, farmer_name: str, max_pages: Optional[int] = None) -> ReportDocument:
+    """A4 document with the report margins (room for the page header)"""
+    return ReportDocument(
+        buffer,
+        pagesize=A4,
+        rightMargin=50,
+        leftMargin=50,
+        topMargin=120,  # More space for header
+        bottomMargin=50,
+        title=f"Farm Finance Report - {farmer_name}",
+        max_pages=max_pages,
+    )
 
 
 class FinanceReportGenerator:
     """Generate the finance PDF report with headers on every page."""
 
     def __init__(self):
-        self.styles = build_styles()
+        # Shared, process-wide styles; nothing is rebuilt per report
+        self.styles = report_styles
+        # Stage timings, page/row counts and totals of the last generate() call
+        self.stats: dict = {}
+
+    def generate(self, payload: ReportPayload, generated_at: Optional[datetime] = None,
+                 output: Optional[BinaryIO] = None, options: Optional[ReportOptions] = None) -> BinaryIO:
+        """Write the report to ``output`` (a new BytesIO by default) and return it.
 
-    def generate(self, payload: FinancePayload) -> BytesIO:
-        buffer = BytesIO()
+        ``options`` selects sections and a page limit; by default the report is complete.
+        """
+        buffer = output if output is not None else BytesIO()
+        options = options or ReportOptions()
+        sections = options.sections
+        started = time.perf_counter()
+        timer = StageTimer()
+        # One timestamp for the whole document, so headers and footer agree
+        generated_at = generated_at or datetime.now()
         
         # Header and footer function for every page
         def on_page(canvas, doc):
-            draw_page_header(canvas, doc, payload, doc.page)
+            draw_page_header(canvas, doc, payload, doc.page, generated_at)
             draw_page_footer(canvas, doc)
         
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=50,
-            leftMargin=50,
-            topMargin=120,  # More space for header
-            bottomMargin=50,
-            title=f"Farm Finance Report - {payload.farmer_details.farmer_name}",
-        )
+        doc = report_document(buffer, payload.farmer_details.farmer_name, options.max_pages)
+        # Under a page limit, rows that could only land past it are not tabled
+        max_rows = max_table_rows(doc.height, options.max_pages) if options.max_pages else None
 
         elements = []
 
+        # All totals come from one aggregation pass over the payload
+        with timer.stage("aggregation"):
+            aggregates = aggregate_payload(payload)
+
         # Finance Summary Section (FIRST - before farmer details)
-        elements.append(Paragraph("📈 Finance Summary", self.styles["SectionHeader"]))
-        total_expenses_calc = sum(item.amount for item in payload.expenses)
-        total_income_calc = sum(item.amount for item in payload.income)
-        finance_summary_tbl = finance_summary_section(
-            total_income=total_income_calc,
-            total_expenses=total_expenses_calc,
-            total_acres=payload.farmer_details.total_acres,
-            total_production=0  # Add production data if available
-        )
-        elements.append(finance_summary_tbl)
-        elements.append(Spacer(1, 0.5 * inch))
+        if "summary" in sections:
+            with timer.stage("tables"):
+                elements.append(Paragraph(heading_text("📈", "Finance Summary"), self.styles["SectionHeader"]))
+                finance_summary_tbl = finance_summary_section(
+                    total_income=aggregates.total_income,
+                    total_expenses=aggregates.total_expenses,
+                    total_acres=payload.farmer_details.total_acres,
+                    total_production=0  # Add production data if available
+                )
+                elements.append(finance_summary_tbl)
+                elements.append(Spacer(1, 0.5 * inch))
 
         # Generate and embed chart
-        chart_buffer = generate_income_expense_chart(total_income_calc, total_expenses_calc)
-        chart_image = Image(chart_buffer, width=5.5*inch, height=2.75*inch)
-        elements.append(chart_image)
-        elements.append(Spacer(1, 0.4 * inch))
-
-        # Expenses
-        elements.append(Paragraph("💰 Expenses", self.styles["SectionHeader"]))
-        expense_tbl, total_expenses = expense_table(payload.expenses)
-        elements.append(expense_tbl)
-        elements.append(Spacer(1, 0.4 * inch))
-
-        # Income
-        elements.append(Paragraph("💵 Income", self.styles["SectionHeader"]))
-        income_tbl, total_income = income_table(payload.income)
-        elements.append(income_tbl)
-        elements.append(Spacer(1, 0.4 * inch))
-
-        # Ledger
-        elements.append(Paragraph("📝 Ledger", self.styles["SectionHeader"]))
-        ledger_tbl = ledger_table(payload.expenses, payload.income)
-        elements.append(ledger_tbl)
-        elements.append(Spacer(1, 0.4 * inch))
-
-        # Farmer section (after expenses and income)
-        elements.append(Paragraph("📋 Farmer & Crop Details", self.styles["SectionHeader"]))
-        elements.append(farmer_table(payload))
-        elements.append(Spacer(1, 0.5 * inch))
+        if "chart" in sections:
+            with timer.stage("chart"):
+                elements.append(build_chart_flowable(aggregates.total_income, aggregates.total_expenses))
+                elements.append(Spacer(1, 0.4 * inch))
+
+        with timer.stage("tables"):
+            # Expenses
+            if "expenses" in sections:
+                elements.append(Paragraph(heading_text("💰", "Expenses"), self.styles["SectionHeader"]))
+                expense_tables, _ = expense_table(aggregates.expenses, aggregates.total_expenses, max_rows)
+                elements.extend(expense_tables)
+                elements.append(Spacer(1, 0.4 * inch))
+
+            # Income
+            if "income" in sections:
+                elements.append(Paragraph(heading_text("💵", "Income"), self.styles["SectionHeader"]))
+                income_tables, _ = income_table(aggregates.income, aggregates.total_income, max_rows)
+                elements.extend(income_tables)
+                elements.append(Spacer(1, 0.4 * inch))
+
+        if "ledger" in sections:
+            with timer.stage("ledger"):
+                # Ledger
+                elements.append(Paragraph(heading_text("📝", "Ledger"), self.styles["SectionHeader"]))
+                elements.extend(ledger_tables(aggregates.expenses, aggregates.income, max_rows=max_rows,
+                                              order=aggregates.ledger_order))
+                elements.append(Spacer(1, 0.4 * inch))
+
+        if "farmer" in sections:
+            with timer.stage("tables"):
+                # Farmer section (after expenses and income)
+                elements.append(Paragraph(heading_text("📋", "Farmer & Crop Details"), self.styles["SectionHeader"]))
+                elements.append(farmer_table(payload))
+                elements.append(Spacer(1, 0.5 * inch))
 
         # Footer
         elements.append(Spacer(1, 0.5 * inch))
-        footer_text = f"Report generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}"
+        footer_text = f"Report generated on {generated_at.strftime('%B %d, %Y at %I:%M %p')}"
         elements.append(Paragraph(footer_text, self.styles["InfoText"]))
 
         # Build with header on every page
-        doc.build(elements, onFirstPage=on_page, onLaterPages=on_page)
-        buffer.seek(0)
+        with timer.stage("layout"):
+            doc.build(elements, onFirstPage=on_page, onLaterPages=on_page)
+
+        self.stats = {
+            "stages_ms": timer.durations,
+            "render_ms": round((time.perf_counter() - started) * 1000, 3),
+            "pages": doc.page,
+            "sections": list(sections),
+            "truncated": doc.truncated,
+            "expense_rows": len(payload.expenses),
+            "income_rows": len(payload.income),
+            "total_expenses": aggregates.total_expenses,
+            "total_income": aggregates.total_income,
+        }
+        if output is None:
+            buffer.seek(0)
         return buffer
+
+
+def render_report(payload: ReportPayload, generated_at: Optional[datetime] = None) -> bytes:
+    """Render a report to PDF bytes; module-level so process pools can pickle it."""
+    return FinanceReportGenerator().generate(payload, generated_at).getvalue()
+
+
+def render_report_output(payload: ReportPayload, generated_at: Optional[datetime] = None,
+                         spool_threshold: Optional[int] = None, spool_dir: Optional[str] = None,
+                         options: Optional[ReportOptions] = None) -> RenderedPDF:
+    """Render a report, spilling it to a temp file once it exceeds ``spool_threshold`` bytes.
+
+    With no threshold the PDF is always returned in memory.
+    """
+    generator = FinanceReportGenerator()
+    if spool_threshold is None:
+        data = generator.generate(payload, generated_at, options=options).getvalue()
+        rendered = RenderedPDF(size=len(data), data=data)
+    else:
+        spool = PDFSpool(spool_threshold, spool_dir)
+        generator.generate(payload, generated_at, output=spool, options=options)
+        rendered = spool.finish()
+    rendered.stats = generator.stats
+    return rendered
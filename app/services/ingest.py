@@ -0,0 +1,306 @@
+import codecs
+import csv
+import io
+import json
+import math
+from datetime import date
+from typing import List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.services.transactions import TransactionColumns, TransactionColumnsBuilder, to_ordinals
+
+# Per-row limits, matching ExpenseItem / IncomeItem
+CATEGORY_MAX_LENGTH = 50
+DESCRIPTION_MAX_LENGTH = 200
+
+# Longest line accepted: far more than any valid row (even a fully escaped
+# NDJSON one), so a body without newlines cannot grow the buffer without bound
+LINE_MAX_LENGTH = 16 * 1024
+
+REQUIRED_COLUMNS = ("type", "category", "amount", "date")
+COLUMNS = REQUIRED_COLUMNS + ("description",)
+
+# (line number, type, category, amount, date, description) as uploaded, not yet validated
+RawRow = Tuple[int, object, object, object, object, object]
+
+
+class UploadRejected(ValueError):
+    """The upload as a whole is unusable (content type, encoding, CSV header, no rows)"""
+
+
+class UploadTooLarge(UploadRejected):
+    """The upload has more rows than ``upload_max_rows``, more expense or income rows than
+    ``max_items``, more bytes than ``upload_max_bytes`` or a line longer than ``LINE_MAX_LENGTH``"""
+
+
+class UploadInvalid(ValueError):
+    """One or more rows failed validation; ``errors`` holds the first few of them"""
+
+    def __init__(self, errors: List[dict], error_count: int):
+        super().__init__(f"{error_count} invalid row(s) in upload")
+        self.errors = errors
+        self.error_count = error_count
+
+
+def upload_format(content_type: str) -> str:
+    """"csv" or "ndjson" for a request Content-Type"""
+    content_type = content_type.lower()
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        return "ndjson"
+    raise UploadRejected("Content-Type must be text/csv or application/x-ndjson")
+
+
+class TransactionUploadParser:
+    """Incrementally parse and validate a CSV or NDJSON transaction upload into columns.
+
+    Bytes are fed as they arrive and buffered as text until about ``batch_rows``
+    complete lines are available (for CSV, only where no quoted field is left
+    open). Each batch is then parsed, validated and appended straight to
+    array-backed column builders, so no per-row model is ever created.
+
+    Every row has a ``type`` (expense or income), ``category``, ``amount``,
+    ``date`` (YYYY-MM-DD) and an optional ``description``; CSV uploads name
+    these columns in a header row. As for JSON payloads, each type holds at
+    most ``max_items`` rows; the upload is refused as soon as one has more.
+    """
+
+    def __init__(self, content_type: str, batch_rows: Optional[int] = None, max_rows: Optional[int] = None,
+                 max_errors: Optional[int] = None, max_bytes: Optional[int] = None,
+                 max_items: Optional[int] = None):
+        self.format = upload_format(content_type)
+        self.batch_rows = batch_rows or settings.upload_batch_rows
+        self.max_rows = max_rows or settings.upload_max_rows
+        self.max_items = max_items or settings.max_items
+        self.max_bytes = max_bytes or settings.upload_max_bytes
+        self.bytes = 0
+        self.max_errors = settings.upload_max_errors if max_errors is None else max_errors
+        self.expenses = TransactionColumnsBuilder()
+        self.income = TransactionColumnsBuilder()
+        self.rows = 0
+        self.errors: List[dict] = []
+        self.error_count = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._tail = ""
+        # Index of each of COLUMNS in a CSV row, known once the header is read
+        self._positions: Optional[List[Optional[int]]] = None
+        # Complete lines waiting for the next batch, and the lines consumed before them
+        self._pending: List[str] = []
+        self._pending_lines = 0
+        self._pending_quotes = 0
+        self._line_no = 0
+
+    def feed(self, chunk: bytes) -> None:
+        self.bytes += len(chunk)
+        if self.bytes > self.max_bytes:
+            raise UploadTooLarge(f"Upload is larger than {self.max_bytes} bytes")
+        try:
+            text = self._tail + self._decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            raise UploadRejected(f"Upload is not valid UTF-8: {e}")
+        cut = text.rfind("\n") + 1
+        self._tail = text[cut:]
+        if len(self._tail) > LINE_MAX_LENGTH:
+            raise UploadTooLarge(f"Upload has a line longer than {LINE_MAX_LENGTH} characters")
+        if not cut:
+            return
+        complete = text[:cut]
+        self._pending.append(complete)
+        self._pending_lines += complete.count("\n")
+        if self.format == "csv":
+            self._pending_quotes += complete.count('"')
+        if self._pending_lines >= self.batch_rows:
+            # An odd number of quotes means a quoted field continues past this chunk
+            if self._pending_quotes % 2 == 0:
+                self._flush()
+            elif self._pending_lines > 10 * self.batch_rows:
+                raise UploadRejected("Unterminated quoted field")
+
+    def finish(self) -> Tuple[TransactionColumns, TransactionColumns]:
+        """Validate the remaining rows and return the (expenses, income) columns.
+
+        Raises ``UploadInvalid`` if any row failed validation.
+        """
+        try:
+            self._tail += self._decoder.decode(b"", final=True)
+        except UnicodeDecodeError as e:
+            raise UploadRejected(f"Upload is not valid UTF-8: {e}")
+        if self._tail:
+            self._pending.append(self._tail + "\n")
+            self._pending_lines += 1
+            self._pending_quotes += self._tail.count('"')
+            self._tail = ""
+        if self._pending_quotes % 2:
+            raise UploadRejected("Unterminated quoted field")
+        self._flush()
+
+        if self.format == "csv" and self._positions is None:
+            raise UploadRejected("Upload is empty")
+        if not self.rows:
+            raise UploadRejected("Upload has no transactions")
+        if not self.error_count:
+            if not len(self.expenses):
+                self._error(None, "type", "At least one expense row is required")
+            if not len(self.income):
+                self._error(None, "type", "At least one income row is required")
+        if self.error_count:
+            raise UploadInvalid(self.errors, self.error_count)
+        return self.expenses.build(), self.income.build()
+
+    def _flush(self) -> None:
+        text = "".join(self._pending)
+        first_line = self._line_no
+        self._line_no += self._pending_lines
+        self._pending, self._pending_lines, self._pending_quotes = [], 0, 0
+        if not text:
+            return
+        rows = self._csv_rows(text, first_line) if self.format == "csv" else self._ndjson_rows(text, first_line)
+        self.rows += len(rows)
+        if self.rows > self.max_rows:
+            raise UploadTooLarge(f"Upload has more than {self.max_rows} rows")
+        if rows:
+            self._add_rows(rows)
+        for name, builder in (("expense", self.expenses), ("income", self.income)):
+            if len(builder) > self.max_items:
+                raise UploadTooLarge(f"Upload has more than {self.max_items} {name} rows")
+
+    def _csv_rows(self, text: str, first_line: int) -> List[RawRow]:
+        rows: List[RawRow] = []
+        reader = csv.reader(io.StringIO(text, newline=""))
+        line_no = first_line + 1
+        try:
+            for fields in reader:
+                if fields and self._positions is None:
+                    self._positions = self._read_header(fields)
+                elif fields:
+                    rows.append((line_no, *[
+                        fields[i] if i is not None and i < len(fields) else None for i in self._positions
+                    ]))
+                line_no = first_line + reader.line_num + 1
+        except csv.Error as e:
+            raise UploadRejected(f"Malformed CSV at line {line_no}: {e}")
+        return rows
+
+    @staticmethod
+    def _read_header(fields: List[str]) -> List[Optional[int]]:
+        names = [name.strip().lower() for name in fields]
+        missing = [column for column in REQUIRED_COLUMNS if column not in names]
+        if missing:
+            raise UploadRejected(f"CSV header is missing column(s): {', '.join(missing)}")
+        return [names.index(column) if column in names else None for column in COLUMNS]
+
+    def _ndjson_rows(self, text: str, first_line: int) -> List[RawRow]:
+        rows: List[RawRow] = []
+        for line_no, line in enumerate(text.split("\n")[:-1], first_line + 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                self._error(line_no, None, f"Invalid JSON: {e}")
+                continue
+            if not isinstance(row, dict):
+                self._error(line_no, None, "Each line must be a JSON object")
+                continue
+            # Rows shaped like ExpenseItem / IncomeItem are accepted as well
+            txn_date = row.get("date", row.get("expense_date", row.get("income_date")))
+            amount = row.get("amount")
+            rows.append((line_no, row.get("type"), row.get("category"),
+                         None if isinstance(amount, bool) else amount, txn_date, row.get("description")))
+        return rows
+
+    def _add_rows(self, rows: List[RawRow]) -> None:
+        """Validate one batch of rows and append the valid ones to the columns, in order.
+
+        Every check runs over the whole batch at once (amounts and dates are
+        parsed by numpy). If any row fails, the batch is walked row by row and
+        the failing rows go through ``_check_row``, which reports their errors.
+        """
+        count = len(rows)
+        _, types, categories, amounts, dates, descriptions = zip(*rows)
+        type_values = np.asarray(types, dtype=object)
+        is_expense = type_values == "expense"
+        is_income = type_values == "income"
+        try:
+            amount_values = np.asarray(amounts, dtype=np.float64)
+            date_values = np.asarray(dates, dtype="datetime64[D]")
+            valid = (is_expense | is_income) & np.isfinite(amount_values) & (amount_values > 0)
+            # numpy also parses partial dates such as "2024-06"; require the exact YYYY-MM-DD text
+            valid &= np.datetime_as_string(date_values, unit="D") == np.asarray(dates, dtype=str)
+        except (TypeError, ValueError):
+            valid = np.zeros(count, dtype=bool)
+        valid &= np.fromiter(
+            (isinstance(category, str) and 0 < len(category) <= CATEGORY_MAX_LENGTH for category in categories),
+            dtype=bool, count=count,
+        )
+        valid &= np.fromiter(
+            (description is None or isinstance(description, str) and len(description) <= DESCRIPTION_MAX_LENGTH
+             for description in descriptions),
+            dtype=bool, count=count,
+        )
+
+        if valid.all():
+            category_values = np.asarray(categories, dtype=object)
+            description_values = np.asarray(descriptions, dtype=object)
+            description_values[description_values == ""] = None
+            days = to_ordinals(date_values)
+            for builder, mask in ((self.expenses, is_expense), (self.income, is_income)):
+                builder.extend(category_values[mask].tolist(), amount_values[mask].tolist(),
+                               days[mask].tolist(), description_values[mask].tolist())
+            return
+
+        # type -> parallel (categories, amounts, days, descriptions) lists
+        accepted = {"expense": ([], [], [], []), "income": ([], [], [], [])}
+        for i, row_valid in enumerate(valid.tolist()):
+            if row_valid:
+                values = (types[i], categories[i], float(amount_values[i]),
+                          date.fromisoformat(dates[i]).toordinal(), descriptions[i] or None)
+            else:
+                values = self._check_row(*rows[i])
+                if values is None:
+                    continue
+            for column, value in zip(accepted[values[0]], values[1:]):
+                column.append(value)
+        self.expenses.extend(*accepted["expense"])
+        self.income.extend(*accepted["income"])
+
+    def _check_row(self, line_no: int, txn_type, category, amount, txn_date,
+                   description) -> Optional[Tuple[str, str, float, int, Optional[str]]]:
+        """Validate one row field by field, recording every error; None if it is invalid"""
+        valid = True
+        if isinstance(txn_type, str):
+            txn_type = txn_type.strip().lower()
+        if txn_type not in ("expense", "income"):
+            valid = self._error(line_no, "type", "Must be 'expense' or 'income'")
+
+        if not isinstance(category, str) or not 1 <= len(category) <= CATEGORY_MAX_LENGTH:
+            valid = self._error(line_no, "category", f"Must be 1-{CATEGORY_MAX_LENGTH} characters")
+
+        try:
+            amount = float(amount)
+        except (TypeError, ValueError):
+            amount = math.nan
+        if not (math.isfinite(amount) and amount > 0):
+            valid = self._error(line_no, "amount", "Must be a number greater than 0")
+
+        day = 0
+        try:
+            day = date.fromisoformat(txn_date).toordinal()
+        except (TypeError, ValueError):
+            valid = self._error(line_no, "date", "Must be a date in YYYY-MM-DD format")
+
+        if description == "":
+            description = None
+        if description is not None and (not isinstance(description, str)
+                                        or len(description) > DESCRIPTION_MAX_LENGTH):
+            valid = self._error(line_no, "description", f"Must be at most {DESCRIPTION_MAX_LENGTH} characters")
+
+        return (txn_type, category, amount, day, description) if valid else None
+
+    def _error(self, line_no: Optional[int], field: Optional[str], message: str) -> bool:
+        """Record a row error (only the first ``max_errors`` are kept) and return False"""
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line_no, "field": field, "message": message})
+        return False
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from app.config import settings
+from app.log import log_event
+from app.models import FinancePayload
+from app.services.admission import admission, report_cost
+from app.services.analytics import analytics_index
+from app.services.batch import report_filename
+from app.services.engines import render_report_output
+from app.services.render_pool import render_pool
+from app.services.report_cache import payload_fingerprint, get_or_render
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Rough progress reported for each state; renders run in another process,
+# so finer-grained progress is not available
+_PROGRESS = {QUEUED: 0.0, RUNNING: 0.5, DONE: 1.0, FAILED: 1.0}
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue cannot accept more work"""
+
+
+class JobStore:
+    """SQLite job metadata plus one PDF file per finished job in ``directory``.
+
+    The database and result files live on disk, so every server process on the
+    host sees the same jobs. Each job records the process that queued it, so
+    jobs left queued or running by a process that died can be failed.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.directory / "jobs.sqlite3"), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    error TEXT,
+                    size INTEGER,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    owner INTEGER
+                )
+                """
+            )
+            if "owner" not in {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}:
+                self._db.execute("ALTER TABLE jobs ADD COLUMN owner INTEGER")
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_created_at ON jobs (created_at)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)")
+
+    def result_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.pdf"
+
+    def create(self, filename: str) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, filename, created_at, owner) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, filename, time.time(), os.getpid()),
+            )
+        return job_id
+
+    def update(self, job_id: str, **fields) -> None:
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._db:
+            self._db.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def fail_orphaned(self) -> int:
+        """Fail queued and running jobs whose process is gone (it crashed or was
+        killed), so ``delete_expired`` removes them in time"""
+        with self._lock:
+            ids: List[str] = [row["id"] for row in self._db.execute(
+                "SELECT id, owner FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ) if not _process_alive(row["owner"])]
+            with self._db:
+                self._db.executemany(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                    [(FAILED, "Server stopped before the job finished", time.time(), job_id) for job_id in ids],
+                )
+        return len(ids)
+
+    def delete_expired(self, ttl: float) -> int:
+        """Delete jobs (and their PDFs) that finished more than ``ttl`` seconds ago.
+
+        Queued and running jobs are kept however long they wait, as long as
+        their process is alive (see ``fail_orphaned``).
+        """
+        cutoff = time.time() - ttl
+        with self._lock:
+            ids: List[str] = [row["id"] for row in self._db.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (DONE, FAILED, cutoff)
+            )]
+            with self._db:
+                self._db.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in ids])
+        for job_id in ids:
+            try:
+                self.result_path(job_id).unlink()
+            except FileNotFoundError:
+                pass
+        return len(ids)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class JobManager:
+    """In-process job queue drained by a fixed number of async workers.
+
+    Each worker hands one render at a time to the shared render pool, so at most
+    ``workers`` job renders run concurrently; the queue itself is bounded.
+    """
+
+    def __init__(self, directory: str, workers: int, queue_size: int, ttl: float):
+        self.directory = directory
+        self.store: Optional[JobStore] = None
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.ttl = ttl
+        self._queue: Optional[asyncio.Queue] = None
+        self._order: List[str] = []
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        # The database is shared by every server process: its calls (which may
+        # wait on another process's lock) run in a thread, off the event loop
+        self.store = await asyncio.to_thread(JobStore, self.directory)
+        await self._fail_orphaned()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._cleanup()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Whatever was still waiting will never run
+        for job_id in self._order:
+            await asyncio.to_thread(self.store.update, job_id, status=FAILED,
+                                    error="Server shut down before the job ran", finished_at=time.time())
+        self._order = []
+        await asyncio.to_thread(self.store.close)
+        self.store = None
+        self._queue = None
+
+    async def submit(self, payload: FinancePayload) -> str:
+        if self._queue is None:
+            raise RuntimeError("Job manager is not running")
+        if self._queue.full():
+            raise JobQueueFull(f"Job queue is full ({self.queue_size} jobs waiting)")
+        job_id = await asyncio.to_thread(self.store.create, report_filename(payload))
+        if self._queue.full():
+            # Filled up by other submissions while the job was being stored
+            await asyncio.to_thread(self.store.update, job_id, status=FAILED, error="Job queue was full",
+                                    finished_at=time.time())
+            raise JobQueueFull(f"Job queue is full ({self.queue_size} jobs waiting)")
+        self._queue.put_nowait((job_id, payload))
+        self._order.append(job_id)
+        return job_id
+
+    @property
+    def queued(self) -> int:
+        return len(self._order)
+
+    async def status(self, job_id: str) -> Optional[dict]:
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None:
+            return None
+        status = {
+            "id": job["id"],
+            "status": job["status"],
+            "progress": _PROGRESS[job["status"]],
+            "filename": job["filename"],
+            "created_at": _iso(job["created_at"]),
+            "started_at": _iso(job["started_at"]),
+            "finished_at": _iso(job["finished_at"]),
+            "error": job["error"],
+            "size": job["size"],
+        }
+        if job["status"] == QUEUED and job_id in self._order:
+            status["queue_position"] = self._order.index(job_id) + 1
+        return status
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, payload = await self._queue.get()
+            try:
+                self._order.remove(job_id)
+                await self._run(job_id, payload)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, payload: FinancePayload) -> None:
+        await asyncio.to_thread(self.store.update, job_id, status=RUNNING, started_at=time.time())
+
+        async def render():
+            # Jobs count against the same admission capacity as interactive
+            # reports, but wait as long as it takes (and may exceed it, alone)
+            async with admission.admit(report_cost(len(payload.expenses), len(payload.income)), background=True):
+                return await render_pool.run_when_free(
+                    render_report_output, payload, datetime.now(),
+                    settings.spool_threshold, str(self.store.directory),
+                )
+
+        try:
+            rendered, _ = await get_or_render(payload_fingerprint(payload), render)
+            await asyncio.to_thread(analytics_index.record_report, payload.farmer_details, rendered.stats, "job")
+            target = self.store.result_path(job_id)
+            if rendered.in_memory:
+                await asyncio.to_thread(target.write_bytes, rendered.data)
+            else:
+                os.replace(rendered.path, target)
+            await asyncio.to_thread(self.store.update, job_id, status=DONE, size=rendered.size,
+                                    finished_at=time.time())
+            log_event(logger, logging.INFO, "report_job_done", job_id=job_id, bytes=rendered.size,
+                      pages=rendered.stats.get("pages"), stages_ms=rendered.stats.get("stages_ms"))
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.store.update, job_id, status=FAILED,
+                                    error="Server shut down during the job", finished_at=time.time())
+            raise
+        except Exception as e:
+            log_event(logger, logging.ERROR, "report_job_failed", job_id=job_id, error=str(e))
+            await asyncio.to_thread(self.store.update, job_id, status=FAILED, error=str(e),
+                                    finished_at=time.time())
+
+    async def _cleanup(self) -> None:
+        interval = max(1.0, min(self.ttl / 4, 300.0))
+        while True:
+            await asyncio.sleep(interval)
+            await self._fail_orphaned()
+            removed = await asyncio.to_thread(self.store.delete_expired, self.ttl)
+            if removed:
+                log_event(logger, logging.INFO, "report_jobs_expired", removed=removed)
+
+    async def _fail_orphaned(self) -> None:
+        failed = await asyncio.to_thread(self.store.fail_orphaned)
+        if failed:
+            log_event(logger, logging.WARNING, "report_jobs_orphaned", failed=failed)
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """True while process ``pid`` exists on this host (jobs from before owners were recorded have none)"""
+    if pid is None:
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat(timespec="seconds") if timestamp else None
+
+
+job_manager = JobManager(
+    settings.job_dir,
+    workers=settings.job_workers,
+    queue_size=settings.job_queue_size,
+    ttl=settings.job_ttl,
+)
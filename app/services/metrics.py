@@ -0,0 +1,158 @@
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Minimal in-process metrics rendered in the Prometheus text exposition format.
+# Each server process keeps its own values; nothing external is required.
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                for key, value in values]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float], labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.buckets = sorted(buckets)
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def collect(self) -> List[str]:
+        lines = []
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + [float("inf")], counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Gauge (or counter) whose samples are read from a callback at scrape time"""
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Dict[LabelValues, float]],
+                 labels: Sequence[str] = (), kind: str = "gauge"):
+        super().__init__(name, documentation, labels)
+        self.callback = callback
+        self.kind = kind
+
+    def collect(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                for key, value in sorted(self.callback().items())]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+report_stage_seconds = registry.register(Histogram(
+    "report_stage_seconds", "Report generation time per stage", SECONDS_BUCKETS, labels=("stage",)))
+report_pdf_bytes = registry.register(Histogram(
+    "report_pdf_bytes", "Size of generated PDFs in bytes",
+    (16e3, 32e3, 64e3, 128e3, 256e3, 512e3, 1e6, 2e6, 4e6, 8e6, 16e6, 64e6)))
+report_pages = registry.register(Histogram(
+    "report_pages", "Pages per generated report", (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)))
+report_rows = registry.register(Histogram(
+    "report_rows", "Transactions (expenses + income) per report", (10, 100, 1e3, 1e4, 1e5, 1e6)))
+reports_total = registry.register(Counter(
+    "reports_total", "Reports served, by cache outcome", labels=("cache",)))
+report_failures_total = registry.register(Counter(
+    "report_failures_total", "Report requests that failed, by reason", labels=("reason",)))
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "API requests by route and status", labels=("method", "route", "status")))
+http_request_seconds = registry.register(Histogram(
+    "http_request_seconds", "API request latency by route", SECONDS_BUCKETS, labels=("method", "route")))
+
+
+def observe_report(stats: dict, size: int, cache_hit: bool) -> None:
+    """Record one served report; ``stats`` is the render stats (empty on cache hits)"""
+    reports_total.inc(cache="hit" if cache_hit else "miss")
+    if not stats:
+        return
+    for stage, milliseconds in stats.get("stages_ms", {}).items():
+        report_stage_seconds.observe(milliseconds / 1000, stage=stage)
+    report_stage_seconds.observe(stats["render_ms"] / 1000, stage="render")
+    report_pdf_bytes.observe(size)
+    report_pages.observe(stats["pages"])
+    report_rows.observe(stats["expense_rows"] + stats["income_rows"])
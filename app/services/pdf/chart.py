@@ -1,64 +1,170 @@
-import matplotlib.pyplot as plt
-import matplotlib
+import logging
 from io import BytesIO
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.shapes import Drawing, Group, String
+from reportlab.lib import colors as rl_colors
+from reportlab.lib.units import inch
+from reportlab.platypus import Flowable, Image
+from app.config import settings
+from app.log import log_event
+from app.services.cache import content_key
+from app.services.pdf.output import compact_image, image_settings
+from app.services.report_cache import chart_cache
 
-# Use non-interactive backend for server environments
-matplotlib.use('Agg')
+logger = logging.getLogger(__name__)
+
+# Figures are built with the object-oriented API (no pyplot global state),
+# so charts can be rendered safely from several worker threads at once.
+# matplotlib is imported on the first PNG render: the default vector chart never needs it.
+
+CHART_WIDTH = 5.5 * inch
+CHART_HEIGHT = 2.75 * inch
+
+# Bump when the chart's look changes so stale disk-cached PNGs are not reused
+CHART_VERSION = 1
 
 
 def generate_income_expense_chart(total_income: float, total_expense: float) -> BytesIO:
     """
     Generate Income vs Expense bar chart in memory (BytesIO).
-    
+
     Args:
         total_income: Total income amount
         total_expense: Total expense amount
-    
+
     Returns:
-        BytesIO buffer containing PNG image
+        BytesIO buffer containing the PNG image, or a downsampled JPEG with REPORT_PDF_COMPACT
     """
+    key = content_key("income_expense", CHART_VERSION, f"{total_income:.2f}", f"{total_expense:.2f}",
+                      *image_settings())
+    image = chart_cache.get(key) if chart_cache.enabled else None
+    if image is None:
+        image = compact_image(_render_income_expense_png(total_income, total_expense), CHART_WIDTH, CHART_HEIGHT)
+        if chart_cache.enabled:
+            chart_cache.put(key, image)
+    return BytesIO(image)
+
+
+def _render_income_expense_png(total_income: float, total_expense: float) -> bytes:
+    """Render the matplotlib Income vs Expense chart to PNG bytes"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import FuncFormatter
+
     # Create figure and axis
-    fig, ax = plt.subplots(figsize=(7, 4), dpi=100)
-    
+    fig = Figure(figsize=(7, 4), dpi=100)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+
     # Data
     categories = ['Income', 'Expense']
     amounts = [total_income, total_expense]
     colors = ['#90EE90', '#FFB6C6']  # Light green for Income, Light pink/red for Expense
-    
+
     # Create bar chart
     bars = ax.bar(categories, amounts, color=colors, edgecolor='#333333', linewidth=2)
-    
+
     # Add value labels on top of bars
     for bar, amount in zip(bars, amounts):
         height = bar.get_height()
         ax.text(bar.get_x() + bar.get_width()/2., height,
                 f'{amount:,.2f}',
                 ha='center', va='bottom', fontsize=12, fontweight='bold', color='#333333')
-    
+
     # Styling
     ax.set_ylabel('Amount', fontsize=12, fontweight='bold')
     ax.set_title('Income vs Expense Overview', fontsize=14, fontweight='bold', pad=20)
     ax.grid(axis='y', alpha=0.4, linestyle='--', color='#cccccc')
     ax.set_axisbelow(True)
-    
+
     # Format y-axis with thousand separators
-    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{int(x):,}'))
-    
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'{int(x):,}'))
+
     # Set background color
     ax.set_facecolor('#f9f9f9')
     fig.patch.set_facecolor('white')
-    
+
     # Remove top and right spines for cleaner look
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
-    
+
     # Tight layout
-    plt.tight_layout()
-    
+    fig.tight_layout()
+
     # Save to BytesIO buffer
     buffer = BytesIO()
-    plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
-    buffer.seek(0)
-    plt.close(fig)
-    
-    return buffer
+    fig.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
+
+    return buffer.getvalue()
+
+
+def generate_income_expense_drawing(total_income: float, total_expense: float,
+                                    width: float = CHART_WIDTH, height: float = CHART_HEIGHT) -> Drawing:
+    """
+    Generate the Income vs Expense bar chart as a native ReportLab vector Drawing.
+
+    Same look as the matplotlib chart, but drawn straight into the PDF, so there is
+    no PNG to rasterize, embed and decode.
+    """
+    drawing = Drawing(width, height)
+    amounts = [total_income, total_expense]
+    top = max(amounts) * 1.15 or 1  # headroom for the value labels
+
+    chart = VerticalBarChart()
+    chart.x = 60
+    chart.y = 25
+    chart.width = width - 75
+    chart.height = height - 60
+    chart.data = [amounts]
+    chart.fillColor = rl_colors.HexColor('#f9f9f9')
+    chart.barWidth = 8
+    chart.groupSpacing = 2  # bars fill ~80% of each category, like matplotlib
+
+    # Bars: light green for Income, light pink/red for Expense
+    chart.bars.strokeColor = rl_colors.HexColor('#333333')
+    chart.bars.strokeWidth = 1.5
+    chart.bars[(0, 0)].fillColor = rl_colors.HexColor('#90EE90')
+    chart.bars[(0, 1)].fillColor = rl_colors.HexColor('#FFB6C6')
+
+    # Value labels on top of bars
+    chart.barLabelFormat = lambda value: f'{value:,.2f}'
+    chart.barLabels.nudge = 8
+    chart.barLabels.fontName = 'Helvetica-Bold'
+    chart.barLabels.fontSize = 10
+    chart.barLabels.fillColor = rl_colors.HexColor('#333333')
+
+    # Axes
+    chart.categoryAxis.categoryNames = ['Income', 'Expense']
+    chart.categoryAxis.labels.fontName = 'Helvetica'
+    chart.categoryAxis.labels.fontSize = 10
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.valueMax = top
+    chart.valueAxis.labelTextFormat = lambda value: f'{int(value):,}'
+    chart.valueAxis.labels.fontName = 'Helvetica'
+    chart.valueAxis.labels.fontSize = 8
+    chart.valueAxis.visibleGrid = True
+    chart.valueAxis.gridStrokeColor = rl_colors.HexColor('#cccccc')
+    chart.valueAxis.gridStrokeDashArray = (3, 3)
+    drawing.add(chart)
+
+    # Title and y-axis label
+    drawing.add(String(width / 2, height - 18, 'Income vs Expense Overview',
+                       fontName='Helvetica-Bold', fontSize=12, textAnchor='middle'))
+    y_label = Group(String(0, 0, 'Amount', fontName='Helvetica-Bold', fontSize=10, textAnchor='middle'))
+    y_label.translate(10, chart.y + chart.height / 2)
+    y_label.rotate(90)
+    drawing.add(y_label)
+
+    return drawing
+
+
+def build_chart_flowable(total_income: float, total_expense: float, renderer: str = None) -> Flowable:
+    """Return the chart flowable for the configured renderer, falling back to matplotlib"""
+    renderer = renderer or settings.chart_renderer
+    if renderer == "vector":
+        try:
+            return generate_income_expense_drawing(total_income, total_expense)
+        except Exception as e:
+            log_event(logger, logging.WARNING, "vector_chart_failed", error=str(e))
+    chart_buffer = generate_income_expense_chart(total_income, total_expense)
+    return Image(chart_buffer, width=CHART_WIDTH, height=CHART_HEIGHT)
@@ -2,20 +2,44 @@ from reportlab.lib.units import inch
 from reportlab.pdfgen.canvas import Canvas
 from typing import Any
 
+# Name of the per-document form XObject holding the footer
+FOOTER_FORM = "PageFooter"
+
 
 def draw_page_footer(canvas_obj: Canvas, doc: Any) -> None:
     """Draw footer on each page with GramIQ branding"""
+    # Same on every page: draw once into a form XObject, then reference it
+    if not canvas_obj.hasForm(FOOTER_FORM):
+        canvas_obj.beginForm(FOOTER_FORM)
+        _draw_footer_content(canvas_obj)
+        canvas_obj.endForm()
+    canvas_obj.doForm(FOOTER_FORM)
+
+
+def draw_truncation_note(canvas_obj: Canvas, page: int) -> None:
+    """Note above the footer of the last page of a report cut off by its page limit"""
     canvas_obj.saveState()
-    
+    canvas_obj.setFont("Helvetica-Oblique", 8)
+    canvas_obj.setFillColorRGB(0.7, 0.1, 0.1)
+    canvas_obj.drawCentredString(
+        8.27 * inch / 2, 0.4 * inch + 12,
+        f"Report truncated at page {page} (page limit): later rows, totals and sections are not included",
+    )
+    canvas_obj.restoreState()
+
+
+def _draw_footer_content(canvas_obj: Canvas) -> None:
+    canvas_obj.saveState()
+
     # Footer text
     footer_text = "Proudly maintained accounting with GramIQ"
-    
+
     # Set font and size for footer
     canvas_obj.setFont("Helvetica", 9)
     canvas_obj.setFillGray(0.5)  # Gray color for footer
-    
+
     # Draw footer at bottom center
     page_width = 8.27 * inch  # A4 width
     canvas_obj.drawCentredString(page_width / 2, 0.4 * inch, footer_text)
-    
+
     canvas_obj.restoreState()
@@ -1,45 +1,77 @@
+import logging
 from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen.canvas import Canvas
 from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
-from typing import Any
-from app.models import FinancePayload
+from typing import Any, Optional
+from app.log import log_event
+from app.services.pdf.output import compact_image
+from app.services.transactions import ReportPayload
 
+logger = logging.getLogger(__name__)
 
-def draw_page_header(canvas_obj: Canvas, doc: Any, payload: FinancePayload, page_num: int) -> None:
+LOGO_PATH = Path(__file__).resolve().parents[3] / "static" / "gramiq_logo.jpg"
+LOGO_SIZE = 2 * inch
+
+# Name of the per-document form XObject holding the (page independent) header
+HEADER_FORM = "PageHeader"
+
+
+@lru_cache(maxsize=1)
+def load_logo() -> Optional[ImageReader]:
+    """Read and decode the header logo once per process; None if it is unavailable"""
+    if not LOGO_PATH.exists():
+        log_event(logger, logging.WARNING, "logo_missing", path=str(LOGO_PATH))
+        return None
+    try:
+        # Resampled to the size it is drawn at, once per process
+        logo = ImageReader(BytesIO(compact_image(LOGO_PATH.read_bytes(), LOGO_SIZE, LOGO_SIZE)))
+        logo.getRGBData()  # decode now so pages never pay for it
+        return logo
+    except Exception as e:
+        log_event(logger, logging.ERROR, "logo_load_failed", path=str(LOGO_PATH), error=str(e))
+        return None
+
+
+def draw_page_header(canvas_obj: Canvas, doc: Any, payload: ReportPayload, page_num: int,
+                     generated_at: Optional[datetime] = None) -> None:
     """Draw header on each page with logo, title, farmer name, and timestamp"""
+    # The header is identical on every page of a document, so it is drawn once
+    # into a form XObject and every page just references it
+    if not canvas_obj.hasForm(HEADER_FORM):
+        canvas_obj.beginForm(HEADER_FORM)
+        _draw_header_content(canvas_obj, payload, generated_at or datetime.now())
+        canvas_obj.endForm()
+    canvas_obj.doForm(HEADER_FORM)
+
+
+def _draw_header_content(canvas_obj: Canvas, payload: ReportPayload, generated_at: datetime) -> None:
     canvas_obj.saveState()
-    
-    # Logo (top-left) - use absolute path
-    logo_path = Path("static/gramiq_logo.jpg").resolve()
-    print(f"🔍 Looking for logo at: {logo_path}")
-    print(f"✅ Logo exists: {logo_path.exists()}")
-    
-    if logo_path.exists():
-        try:
-            canvas_obj.drawImage(str(logo_path), 0.5*inch, 9.8*inch, width=2*inch, height=2*inch)
-            print(f"✅ Logo drawn successfully")
-        except Exception as e:
-            print(f"❌ Error drawing logo: {e}")
-    else:
-        print(f"⚠️ Logo file not found at {logo_path}")
-    
+
+    # Logo (top-left)
+    logo = load_logo()
+    if logo is not None:
+        canvas_obj.drawImage(logo, 0.5*inch, 9.8*inch, width=LOGO_SIZE, height=LOGO_SIZE)
+
     # Dynamic report title: crop_acres_season_year (center)
-    title = f"{payload.farmer_details.crop_name.upper()} {payload.farmer_details.total_acres} acres | {payload.farmer_details.season}_{datetime.now().year}"
+    title = f"{payload.farmer_details.crop_name.upper()} {payload.farmer_details.total_acres} acres | {payload.farmer_details.season}_{generated_at.year}"
     canvas_obj.setFont("Helvetica-Bold", 18)
     canvas_obj.drawCentredString(4.25*inch, 10.8*inch, title)
-    
+
     # Farmer Name (top-right)
     canvas_obj.setFont("Helvetica", 12)
     canvas_obj.drawCentredString(4.25*inch, 10.5*inch, f"{payload.farmer_details.farmer_name}")
-    
+
     # Timestamp (below farmer name)
     canvas_obj.setFont("Helvetica", 9)
-    timestamp = f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}"
+    timestamp = f"Generated on {generated_at.strftime('%B %d, %Y at %I:%M %p')}"
     canvas_obj.drawCentredString(4.25*inch, 10.2*inch, timestamp)
-    
+
     # Horizontal line separator
     canvas_obj.setLineWidth(1)
     canvas_obj.line(0.5*inch, 10*inch, 8*inch, 10*inch)
-    
+
     canvas_obj.restoreState()
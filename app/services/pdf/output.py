@@ -0,0 +1,79 @@
+import logging
+from functools import lru_cache
+from io import BytesIO
+from typing import Optional, Tuple
+from PIL import Image
+from reportlab import rl_config
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from app.config import settings
+from app.log import log_event
+
+logger = logging.getLogger(__name__)
+
+# Name the optional REPORT_PDF_SYMBOL_FONT is registered under
+SYMBOL_FONT = "ReportSymbols"
+
+
+def configure_pdf_output() -> None:
+    """Apply the process-wide ReportLab output settings; runs when the report engine is imported"""
+    # Streams are Flate-compressed either way. ASCII85 on top only keeps the
+    # file 7-bit clean, which no client needs, and makes every stream 25% larger
+    rl_config.pageCompression = 1
+    if settings.pdf_compact:
+        rl_config.useA85 = 0
+
+
+def image_settings() -> Tuple:
+    """Settings that change ``compact_image`` output, for cache keys of compacted images"""
+    return ("compact", settings.pdf_image_dpi, settings.pdf_jpeg_quality) if settings.pdf_compact else ()
+
+
+def compact_image(data: bytes, width: float, height: float) -> bytes:
+    """Image bytes for drawing at ``width`` x ``height`` points.
+
+    With ``REPORT_PDF_COMPACT`` the image is resampled down to
+    ``REPORT_PDF_IMAGE_DPI`` (never up) and re-encoded as JPEG, which
+    ReportLab embeds as is; ``data`` is returned unchanged when that is not
+    smaller, or when compaction is off.
+    """
+    if not settings.pdf_compact:
+        return data
+    dpi = settings.pdf_image_dpi
+    with Image.open(BytesIO(data)) as image:
+        size = (min(image.width, round(width / 72 * dpi)), min(image.height, round(height / 72 * dpi)))
+        image = image.resize(size, Image.LANCZOS) if size != image.size else image.copy()
+    if image.mode != "RGB":
+        # JPEG has no alpha: flatten onto the white page
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.convert("RGBA").getchannel("A"))
+        image = background
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=settings.pdf_jpeg_quality, optimize=True)
+    return output.getvalue() if output.tell() < len(data) else data
+
+
+@lru_cache(maxsize=1)
+def symbol_font() -> Optional[str]:
+    """Registered name of the ``REPORT_PDF_SYMBOL_FONT`` TTF, or None when it is unset or unusable.
+
+    ReportLab embeds a TrueType font as a subset of the glyphs a document uses,
+    so the font adds only the few symbols actually drawn.
+    """
+    path = settings.pdf_symbol_font
+    if not path:
+        return None
+    try:
+        pdfmetrics.registerFont(TTFont(SYMBOL_FONT, path))
+    except Exception as e:
+        log_event(logger, logging.ERROR, "symbol_font_failed", path=path, error=str(e))
+        return None
+    return SYMBOL_FONT
+
+
+def heading_text(icon: str, title: str) -> str:
+    """Paragraph markup for a section heading: the icon in the symbol font when there is one"""
+    font = symbol_font()
+    if font is None:
+        return f"{icon} {title}"
+    return f'<font name="{font}">{icon}</font> {title}'
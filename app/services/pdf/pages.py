@@ -0,0 +1,174 @@
+import re
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence, Tuple
+import reportlab
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Flowable, PageBreak, Table, TableStyle
+from app.config import settings
+
+# Internal font resource name in a content stream, e.g. "/F1" in "BT /F1 9 Tf"
+_FONT_REF = re.compile(r"/F\d+(?= )")
+
+
+def check_canvas_internals() -> None:
+    """Fail loudly if ReportLab no longer has the private canvas state page capture relies on.
+
+    Recording and replaying pages reads and appends to ``canvas._code`` (the
+    page's content stream operators) and maps fonts through
+    ``canvas._doc.fontMapping`` / ``getInternalFontName``. These are not public
+    API; requirements.txt pins the ReportLab version they were checked against.
+    """
+    canvas = Canvas(BytesIO())
+    doc = getattr(canvas, "_doc", None)
+    if not (isinstance(getattr(canvas, "_code", None), list)
+            and isinstance(getattr(doc, "fontMapping", None), dict)
+            and callable(getattr(doc, "getInternalFontName", None))):
+        raise RuntimeError(
+            f"ReportLab {reportlab.Version} lacks the canvas internals season report page reuse "
+            "needs (canvas._code, canvas._doc.fontMapping, getInternalFontName); "
+            "install the version pinned in requirements.txt"
+        )
+
+
+check_canvas_internals()
+
+
+@dataclass
+class CapturedPage:
+    """The PDF drawing operators of one table page, position independent.
+
+    ``fonts`` maps the internal font names used in ``stream`` (``/F1``) to the
+    real font names, so the stream can be replayed into another document where
+    the same fonts got different internal names.
+    """
+    page: int
+    first_row: int
+    row_count: int
+    width: float
+    height: float
+    stream: str
+    fonts: Dict[str, str]
+
+
+class RecordedTable(Flowable):
+    """A table filling (at most) one page that keeps the operators it drew in ``captured``"""
+
+    def __init__(self, table: Table, page: int, first_row: int, row_count: int):
+        super().__init__()
+        self.table = table
+        self.page = page
+        self.first_row = first_row
+        self.row_count = row_count
+        self.hAlign = table.hAlign
+        self.captured: Optional[CapturedPage] = None
+
+    def wrap(self, availWidth, availHeight):
+        self.width, self.height = self.table.wrap(availWidth, availHeight)
+        return self.width, self.height
+
+    def draw(self):
+        code = self.canv._code
+        mark = len(code)
+        self.table.drawOn(self.canv, 0, 0)
+        stream = "\n".join(code[mark:])
+        fonts = {internal: name for name, internal in self.canv._doc.fontMapping.items()
+                 if f"{internal} " in stream}
+        self.captured = CapturedPage(self.page, self.first_row, self.row_count, self.width, self.height,
+                                     stream, fonts)
+
+
+class ReplayedTable(Flowable):
+    """Draw a ``CapturedPage`` again without building or laying out its table"""
+
+    def __init__(self, captured: CapturedPage, hAlign: str = "CENTER"):
+        super().__init__()
+        self.captured = captured
+        self.width = captured.width
+        self.height = captured.height
+        self.hAlign = hAlign
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        stream = self.captured.stream
+        renames = {}
+        for internal, name in self.captured.fonts.items():
+            current = self.canv._doc.getInternalFontName(name)
+            if current != internal:
+                renames[internal] = current
+        if renames:
+            stream = _FONT_REF.sub(lambda match: renames.get(match.group(0), match.group(0)), stream)
+        self.canv._code.append(stream)
+
+
+def paged_table(heading: Sequence[Flowable], header: list, rows: List[list], col_widths: List[float],
+                style: TableStyle, frame_size: Tuple[float, float], first_row: int = 0,
+                reused: Sequence[CapturedPage] = (), totals_row: Optional[list] = None,
+                totals_style: Optional[TableStyle] = None) -> Tuple[List[Flowable], List[RecordedTable]]:
+    """Lay a table out page by page, starting at the top of a page.
+
+    ``reused`` pages (the leading pages of an earlier render) are replayed as
+    they are; ``rows`` are the rows after them, numbered from ``first_row``.
+    Row heights are measured once and the rows are packed into one table per
+    page, each repeating ``header``, so every page depends only on its own rows
+    and can be captured and replayed on a later render. ``totals_row`` ends the
+    last page, which is then styled with ``totals_style``.
+
+    Returns the flowables and the recorders of the newly laid out pages.
+    """
+    frame_width, frame_height = frame_size
+    page_flowables: List[Flowable] = [ReplayedTable(captured) for captured in reused]
+    available = frame_height
+    if not reused:
+        for flowable in heading:
+            available -= flowable.wrap(frame_width, frame_height)[1] + flowable.getSpaceAfter()
+
+    body = rows + ([totals_row] if totals_row is not None else [])
+    header_height, row_heights = _row_heights(header, body, col_widths, style,
+                                              totals_style if totals_row is not None else style, frame_size)
+
+    pages: List[Tuple[int, int]] = []
+    start, used = 0, header_height
+    for i, height in enumerate(row_heights):
+        if used + height > available and i > start:
+            pages.append((start, i))
+            start, used, available = i, header_height, frame_height
+        used += height
+    if row_heights or not reused:
+        pages.append((start, len(row_heights)))
+
+    recorders = []
+    for n, (start, end) in enumerate(pages):
+        last = n == len(pages) - 1
+        table = Table([header, *body[start:end]], colWidths=col_widths)
+        table.setStyle(totals_style if last and totals_row is not None else style)
+        recorders.append(RecordedTable(table, len(reused) + n, first_row + start, min(end, len(rows)) - start))
+    page_flowables.extend(recorders)
+
+    elements: List[Flowable] = list(heading)
+    for n, flowable in enumerate(page_flowables):
+        if n:
+            elements.append(PageBreak())
+        elements.append(flowable)
+    return elements, recorders
+
+
+def _row_heights(header: list, body: List[list], col_widths: List[float], style: TableStyle,
+                 last_style: TableStyle, frame_size: Tuple[float, float]) -> Tuple[float, List[float]]:
+    """Height of the header row and of every body row.
+
+    Table's height calculation is quadratic in its row count, so rows are
+    measured in tables of ``ledger_chunk_rows``; the last one uses ``last_style``.
+    """
+    chunk_rows = settings.ledger_chunk_rows
+    header_height, heights = 0.0, []
+    for start in range(0, max(len(body), 1), chunk_rows):
+        chunk = body[start:start + chunk_rows]
+        measure = Table([header, *chunk], colWidths=col_widths)
+        measure.setStyle(last_style if start + chunk_rows >= len(body) else style)
+        measure.wrap(*frame_size)
+        header_height = measure._rowHeights[0]
+        heights.extend(measure._rowHeights[1:])
+    return header_height, heights
@@ -1,3 +1,4 @@
+from types import MappingProxyType
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER
@@ -67,3 +68,92 @@ def get_transaction_table_style():
             ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
         ]
     )
+
+
+def get_ledger_table_style():
+    """Returns TableStyle for ledger chunks (header row, no totals row)"""
+    return TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#3AC0DE")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("ALIGN", (1, 1), (1, -1), "LEFT"),
+            ("ALIGN", (3, 1), (3, -1), "LEFT"),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, 0), 11),
+            ("FONTSIZE", (0, 1), (-1, -1), 9),
+            ("LINEBELOW", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f0f9ff")]),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("TOPPADDING", (0, 0), (-1, -1), 2),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+        ]
+    )
+
+
+def get_farmer_table_style():
+    """Returns TableStyle for the two-column farmer details table"""
+    return TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#dbeafe")),
+            ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
+            ("ALIGN", (0, 0), (0, -1), "RIGHT"),
+            ("ALIGN", (1, 0), (1, -1), "LEFT"),
+            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+            ("FONTNAME", (1, 0), (1, -1), "Helvetica"),
+            ("FONTSIZE", (0, 0), (-1, -1), 10),
+            ("LINEBELOW", (0, 0), (-1, -2), 0.5, colors.grey),
+            ("LINEBELOW", (0, -1), (-1, -1), 1, colors.grey),
+            ("ROWBACKGROUNDS", (0, 0), (-1, -1), [colors.white, colors.HexColor("#f0f9ff")]),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 10),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 10),
+            ("TOPPADDING", (0, 0), (-1, -1), 2),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+        ]
+    )
+
+
+def get_summary_table_style():
+    """Returns TableStyle for the finance summary (profit/loss row is styled per table)"""
+    return TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#e0e7ff")),
+            ("BACKGROUND", (1, 0), (1, -1), colors.HexColor("#f5f3ff")),
+            ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
+            ("ALIGN", (0, 0), (0, -1), "RIGHT"),
+            ("ALIGN", (1, 0), (1, -1), "LEFT"),
+            ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 11),
+            ("LINEBELOW", (0, 0), (-1, -2), 1, colors.grey),
+            ("LINEBELOW", (0, -1), (-1, -1), 1, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 15),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 15),
+            ("TOPPADDING", (0, 0), (-1, -1), 2),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+        ]
+    )
+
+
+class StyleRegistry:
+    """Paragraph and table styles built once per process and shared by every report.
+
+    ``Table.setStyle`` copies a TableStyle's commands into the table, so one
+    TableStyle instance can style any number of tables. Paragraph styles are
+    exposed through a read-only mapping; treat the registry as immutable.
+    """
+
+    def __init__(self):
+        sheet = build_styles()
+        self.paragraphs = MappingProxyType({name: sheet[name] for name in sheet.byName})
+        self.farmer_table = get_farmer_table_style()
+        self.summary_table = get_summary_table_style()
+        self.transaction_table = get_transaction_table_style()
+        self.ledger_table = get_ledger_table_style()
+
+    def __getitem__(self, name: str) -> ParagraphStyle:
+        return self.paragraphs[name]
+
+
+report_styles = StyleRegistry()
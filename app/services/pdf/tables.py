@@ -1,7 +1,18 @@
+import math
+from itertools import islice
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from reportlab.platypus import Table, TableStyle
-from app.services.pdf.styles import get_transaction_table_style
+from reportlab.platypus import LongTable, Table
+from app.config import settings
+from app.services.pdf.styles import report_styles
+from app.services.aggregates import finance_summary_rows
+from app.services.transactions import LEDGER_HEADER, TRANSACTION_HEADER, TransactionColumns, iter_ledger_entries
+
+TRANSACTION_COL_WIDTHS = [0.5 * inch, 1.5 * inch, 1.3 * inch, 1.2 * inch, 2 * inch]
+LEDGER_COL_WIDTHS = [1.2 * inch, 1.4 * inch, 1.3 * inch, 1.5 * inch, 1.2 * inch]
+
+# Body font size of the transaction and ledger tables; no row is shorter
+MIN_ROW_HEIGHT = 9
 
 
 def farmer_table(payload):
@@ -18,157 +29,107 @@ def farmer_table(payload):
     ]
 
     table = Table(data, colWidths=[2 * inch, 4 * inch])
-    table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#dbeafe")),
-                ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
-                ("ALIGN", (0, 0), (0, -1), "RIGHT"),
-                ("ALIGN", (1, 0), (1, -1), "LEFT"),
-                ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                ("FONTNAME", (1, 0), (1, -1), "Helvetica"),
-                ("FONTSIZE", (0, 0), (-1, -1), 10),
-                ("LINEBELOW", (0, 0), (-1, -2), 0.5, colors.grey),
-                ("LINEBELOW", (0, -1), (-1, -1), 1, colors.grey),
-                ("ROWBACKGROUNDS", (0, 0), (-1, -1), [colors.white, colors.HexColor("#f0f9ff")]),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("LEFTPADDING", (0, 0), (-1, -1), 10),
-                ("RIGHTPADDING", (0, 0), (-1, -1), 10),
-                ("TOPPADDING", (0, 0), (-1, -1), 2),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
-            ]
-        )
-    )
+    table.setStyle(report_styles.farmer_table)
     return table
 
 
-def expense_table(expenses):
-    data = [["#", "Category", "Amount", "Date", "Description"]]
-    total = 0
+def max_table_rows(frame_height: float, max_pages: int) -> int:
+    """More table rows than ``max_pages`` frames of ``frame_height`` can hold.
 
-    for idx, expense in enumerate(expenses, 1):
-        data.append(
-            [
-                str(idx),
-                expense.category,
-                f"{expense.amount:,.2f}",
-                str(expense.expense_date),
-                expense.description or "-",
-            ]
-        )
-        total += expense.amount
+    No row is shorter than its 9pt body font, so rows past this many would
+    only be laid out beyond the page limit and need not be built.
+    """
+    return max_pages * math.ceil(frame_height / MIN_ROW_HEIGHT)
 
-    data.append(["", "Total Expenses", f"{total:,.2f}", "", ""])
 
-    table = Table(data, colWidths=[0.5 * inch, 1.5 * inch, 1.3 * inch, 1.2 * inch, 2 * inch])
-    table.setStyle(get_transaction_table_style())
-    return table, total
+def expense_table(expenses: TransactionColumns, total=None, max_rows=None):
+    """Itemised expense tables and the total; pass ``total`` when it is already known to skip summing"""
+    return _transaction_tables(expenses, "Total Expenses", total, max_rows=max_rows)
 
 
-def income_table(incomes):
-    data = [["#", "Category", "Amount", "Date", "Description"]]
-    total = 0
+def income_table(incomes: TransactionColumns, total=None, max_rows=None):
+    """Itemised income tables and the total; pass ``total`` when it is already known to skip summing"""
+    return _transaction_tables(incomes, "Total Income", total, max_rows=max_rows)
 
-    for idx, income in enumerate(incomes, 1):
-        data.append(
-            [
-                str(idx),
-                income.category,
-                f"{income.amount:,.2f}",
-                str(income.income_date),
-                income.description or "-",
-            ]
-        )
-        total += income.amount
 
-    data.append(["", "Total Income", f"{total:,.2f}", "", ""])
+def _transaction_tables(columns: TransactionColumns, total_label: str, total=None, chunk_rows=None, max_rows=None):
+    """Itemised transactions as LongTable chunks (see ``ledger_tables``); the last carries the totals row.
+
+    With ``max_rows`` only that many transactions are tabled, and the totals
+    row is left out if some were cut.
+    """
+    if total is None:
+        total = columns.total
+
+    categories = columns.categories
+    rows = zip(columns.category_codes.tolist(), columns.amounts.tolist(), columns.iso_dates(),
+               columns.description_labels())
+    chunks = _row_chunks(
+        ([str(idx), categories[code], f"{amount:,.2f}", txn_date, description]
+         for idx, (code, amount, txn_date, description) in islice(enumerate(rows, 1), max_rows)),
+        chunk_rows or settings.ledger_chunk_rows,
+    )
+    complete = max_rows is None or len(columns) <= max_rows
+    if complete:
+        chunks[-1].append(["", total_label, f"{total:,.2f}", "", ""])
 
-    table = Table(data, colWidths=[0.5 * inch, 1.5 * inch, 1.3 * inch, 1.2 * inch, 2 * inch])
-    table.setStyle(get_transaction_table_style())
-    return table, total
+    tables = [_long_table([TRANSACTION_HEADER, *chunk], TRANSACTION_COL_WIDTHS, report_styles.ledger_table)
+              for chunk in chunks[:-1]]
+    # Only a last chunk ending in the totals row is styled like one
+    tables.append(_long_table([TRANSACTION_HEADER, *chunks[-1]], TRANSACTION_COL_WIDTHS,
+                              report_styles.transaction_table if complete else report_styles.ledger_table))
+    return tables, total
 
 
 def finance_summary_section(total_income, total_expenses, total_acres, total_production=0):
     """Create detailed finance summary section with calculations"""
-    cost_per_acre = total_expenses / total_acres if total_acres > 0 else 0
     net_profit = total_income - total_expenses
-    profit_status = "Profit" if net_profit >= 0 else "Loss"
     profit_color = colors.HexColor("#16a34a") if net_profit >= 0 else colors.HexColor("#dc2626")
 
-    data = [
-        ["Total Income:", f"{total_income:,.2f}"],
-        ["Total Expense:", f"{total_expenses:,.2f}"],
-        [f"{profit_status}:", f"{abs(net_profit):,.2f}"],
-        ["Cost of Cultivation/Acre:", f"{cost_per_acre:,.2f}"],
-    ]
+    data = [[f"{label}:", f"{value:,.2f}"]
+            for label, value in finance_summary_rows(total_income, total_expenses, total_acres)]
 
     table = Table(data, colWidths=[3 * inch, 2.5 * inch])
+    table.setStyle(report_styles.summary_table)
+    # Highlight profit/loss row
     table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#e0e7ff")),
-                ("BACKGROUND", (1, 0), (1, -1), colors.HexColor("#f5f3ff")),
-                ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
-                ("ALIGN", (0, 0), (0, -1), "RIGHT"),
-                ("ALIGN", (1, 0), (1, -1), "LEFT"),
-                ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, -1), 11),
-                ("LINEBELOW", (0, 0), (-1, -2), 1, colors.grey),
-                ("LINEBELOW", (0, -1), (-1, -1), 1, colors.grey),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("LEFTPADDING", (0, 0), (-1, -1), 15),
-                ("RIGHTPADDING", (0, 0), (-1, -1), 15),
-                ("TOPPADDING", (0, 0), (-1, -1), 2),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
-                # Highlight profit/loss row
-                ("BACKGROUND", (0, 3), (-1, 3), colors.HexColor("#fff0f5")) if net_profit < 0 else ("BACKGROUND", (0, 3), (-1, 3), colors.HexColor("#f0fff4")),
-                ("TEXTCOLOR", (1, 3), (1, 3), profit_color),
-            ]
-        )
+        [
+            ("BACKGROUND", (0, 3), (-1, 3), colors.HexColor("#fff0f5")) if net_profit < 0 else ("BACKGROUND", (0, 3), (-1, 3), colors.HexColor("#f0fff4")),
+            ("TEXTCOLOR", (1, 3), (1, 3), profit_color),
+        ]
     )
     return table
 
 
-def ledger_table(expenses, incomes):
-    """Create merged ledger table of all transactions (expenses and income)"""
-    # Create transaction list with type
-    transactions = []
-    
-    # Add expenses
-    for expense in expenses:
-        transactions.append({
-            'date': str(expense.expense_date),
-            'particulars': expense.category,
-            'type': 'Expense',
-            'description': expense.description or '-',
-            'amount': expense.amount
-        })
-    
-    # Add incomes
-    for income in incomes:
-        transactions.append({
-            'date': str(income.income_date),
-            'particulars': income.category,
-            'type': 'Income',
-            'description': income.description or '-',
-            'amount': income.amount
-        })
-    
-    # Sort by date
-    transactions.sort(key=lambda x: x['date'])
-    
-    # Create table data with headers
-    data = [["Date", "Particulars", "Transaction Type", "Description", "Amount"]]
-    
-    for txn in transactions:
-        data.append([
-            txn['date'],
-            txn['particulars'],
-            txn['type'],
-            txn['description'],
-            f"{txn['amount']:,.2f}"
-        ])
-    
-    table = Table(data, colWidths=[1.2 * inch, 1.4 * inch, 1.3 * inch, 1.5 * inch, 1.2 * inch])
-    table.setStyle(get_transaction_table_style())
+def ledger_tables(expenses: TransactionColumns, incomes: TransactionColumns, chunk_rows=None, max_rows=None,
+                  order=None):
+    """Create the merged ledger of all transactions as fixed-size LongTable chunks.
+
+    One huge Table gets slower and slower to split across pages, so the ledger
+    is emitted in chunks of ``chunk_rows`` transactions, each repeating the
+    header row on every page it spans. ``max_rows`` keeps only the first
+    entries (see ``max_table_rows``). ``order`` is passed on to ``iter_ledger_entries``.
+    """
+    entries = islice(iter_ledger_entries(expenses, incomes, order=order), max_rows)
+    chunks = _row_chunks(
+        ([txn_date.isoformat(), particulars, txn_type, description, f"{amount:,.2f}"]
+         for txn_date, particulars, txn_type, description, amount in entries),
+        chunk_rows or settings.ledger_chunk_rows,
+    )
+    return [_long_table([LEDGER_HEADER, *chunk], LEDGER_COL_WIDTHS, report_styles.ledger_table) for chunk in chunks]
+
+
+def _row_chunks(rows, chunk_rows):
+    """Split table rows into lists of at most ``chunk_rows``; there is always at least one list"""
+    chunks = [[]]
+    for row in rows:
+        if len(chunks[-1]) == chunk_rows:
+            chunks.append([])
+        chunks[-1].append(row)
+    return chunks
+
+
+def _long_table(data, col_widths, style):
+    table = LongTable(data, colWidths=col_widths, repeatRows=1)
+    table.setStyle(style)
     return table
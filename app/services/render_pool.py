@@ -0,0 +1,117 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from app.config import settings
+
+
+class RenderPoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+class RenderPool:
+    """Bounded executor that keeps CPU-heavy rendering off the event loop.
+
+    At most ``max_workers`` renders run at once and at most ``max_queue`` more
+    wait for a worker; anything beyond that is rejected immediately with
+    ``RenderPoolSaturated`` so the caller can answer 503 instead of piling up work.
+    """
+
+    def __init__(self, mode: str = "process", max_workers: int = 1, max_queue: int = 0):
+        if mode not in ("process", "thread"):
+            raise ValueError(f"Unknown render mode: {mode}")
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="render"
+                    )
+            return self._executor
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._in_flight - self.max_workers)
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on the pool and await its result"""
+        if not self._acquire():
+            raise RenderPoolSaturated(
+                f"Render pool saturated ({self.max_workers} running, {self.max_queue} queued)"
+            )
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        # Release the slot only when the work really finishes, not when the
+        # awaiting request is cancelled (e.g. client disconnect)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def run_when_free(self, fn: Callable[..., Any], *args: Any, retry_delay: float = 0.2) -> Any:
+        """Like ``run``, but wait for a free slot instead of failing when saturated.
+
+        For background work (batches, jobs) that should yield to interactive requests.
+        """
+        while True:
+            try:
+                return await self.run(fn, *args)
+            except RenderPoolSaturated:
+                await asyncio.sleep(retry_delay)
+
+    async def warm(self, fn: Callable[..., Any], *args: Any) -> list:
+        """Start the workers and run ``fn(*args)`` once per worker process (once in thread mode).
+
+        The pool spawns a process per submission while none is idle, so
+        submitting ``max_workers`` calls at once starts them all.
+        """
+        calls = self.max_workers if self.mode == "process" else 1
+        return list(await asyncio.gather(*(self.run(fn, *args) for _ in range(calls))))
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+render_pool = RenderPool(
+    mode=settings.render_mode,
+    max_workers=settings.render_workers,
+    max_queue=settings.render_queue_size,
+)
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from app.config import settings
+from app.models import FarmerDetails
+from app.services.cache import BytesLRUCache, content_key
+from app.services.metrics import observe_report
+from app.services.report_options import ReportOptions
+from app.services.spool import RenderedPDF
+from app.services.transactions import ColumnarPayload, ReportPayload, TransactionColumns
+
+# Bump whenever the report layout changes so cached PDFs are not served stale
+REPORT_VERSION = 4
+
+report_cache = BytesLRUCache(
+    "report",
+    max_entries=settings.report_cache_size,
+    max_bytes=settings.report_cache_max_bytes,
+    directory=settings.report_cache_dir,
+)
+
+# The chart depends only on the two totals, so rendered PNGs are cached by value
+chart_cache = BytesLRUCache(
+    "chart",
+    max_entries=settings.chart_cache_size,
+    directory=settings.chart_cache_dir,
+)
+
+# Renders currently running per fingerprint, so concurrent retries share one render
+_pending: Dict[str, "asyncio.Future[RenderedPDF]"] = {}
+
+
+class RenderAbandoned(Exception):
+    """Set on a shared render whose owning request was cancelled; waiters render again themselves"""
+
+
+def render_settings() -> Tuple:
+    """Settings that change the rendered PDF for the same payload"""
+    return (settings.chart_renderer, settings.pdf_compact, settings.pdf_image_dpi, settings.pdf_jpeg_quality,
+            settings.pdf_symbol_font)
+
+
+def canonical_payload_json(payload: ReportPayload) -> str:
+    """Sorted, whitespace-free JSON of the payload; identical submissions give identical text.
+
+    A columnar payload gives the same text as the ``FinancePayload`` it was decoded from;
+    an empty description is written as null either way, as both render as none.
+    """
+    if isinstance(payload, ColumnarPayload):
+        data = {
+            "farmer_details": payload.farmer_details.model_dump(mode="json"),
+            "expenses": _columns_json(payload.expenses, "expense_date"),
+            "income": _columns_json(payload.income, "income_date"),
+        }
+    else:
+        data = payload.model_dump(mode="json")
+        for item in (*data["expenses"], *data["income"]):
+            if item["description"] == "":
+                item["description"] = None
+    return json.dumps(
+        data,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+
+
+def _columns_json(columns: TransactionColumns, date_field: str) -> List[dict]:
+    """The items of one transaction list as ``model_dump(mode="json")`` would give them"""
+    categories = columns.categories
+    descriptions = [*columns.descriptions, None]
+    rows = zip(columns.category_codes.tolist(), columns.amounts.tolist(), columns.iso_dates(),
+               columns.description_codes.tolist())
+    return [
+        {"category": categories[code], "amount": amount, date_field: day, "description": descriptions[description]}
+        for code, amount, day, description in rows
+    ]
+
+
+def payload_fingerprint(payload: ReportPayload, options: Optional[ReportOptions] = None) -> str:
+    """Stable hash of the payload plus everything else that changes the PDF"""
+    return content_key("report", REPORT_VERSION, *render_settings(), canonical_payload_json(payload),
+                       *_options_parts(options))
+
+
+def upload_fingerprint(farmer_details: FarmerDetails, upload_digest: str,
+                       options: Optional[ReportOptions] = None) -> str:
+    """Stable hash of an uploaded report: the farmer details plus a digest of the raw upload"""
+    farmer_json = json.dumps(farmer_details.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return content_key("report-upload", REPORT_VERSION, *render_settings(), farmer_json, upload_digest,
+                       *_options_parts(options))
+
+
+def _options_parts(options: Optional[ReportOptions]) -> Tuple[str, ...]:
+    # The complete report keeps the key it had before sections and page limits existed
+    return () if options is None or options.full else (options.cache_key(),)
+
+
+def etag_for(fingerprint: str) -> str:
+    return f'"{fingerprint}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """True when an ``If-None-Match`` header value matches ``etag``"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+async def get_or_render(fingerprint: str, render: Callable[[], Awaitable[RenderedPDF]]) -> Tuple[RenderedPDF, bool]:
+    """Return ``(rendered_pdf, cache_hit)``, rendering and caching on a miss"""
+    if report_cache.enabled:
+        cached = report_cache.get(fingerprint)
+        if cached is not None:
+            observe_report({}, len(cached), cache_hit=True)
+            return RenderedPDF(size=len(cached), data=cached), True
+
+    # The owner of a shared render may be cancelled (its client went away);
+    # the next waiter then takes the render over
+    while (pending := _pending.get(fingerprint)) is not None:
+        try:
+            shared = await asyncio.shield(pending)
+        except RenderAbandoned:
+            continue
+        # A spooled temp file belongs to the request that rendered it
+        if shared.in_memory:
+            observe_report({}, shared.size, cache_hit=True)
+            return shared, True
+        break
+
+    future = asyncio.get_running_loop().create_future()
+    _pending[fingerprint] = future
+    try:
+        started = time.perf_counter()
+        rendered = await render()
+        if rendered.stats:
+            # Whatever the worker did not spend rendering was queueing and IPC
+            wall_ms = (time.perf_counter() - started) * 1000
+            rendered.stats["stages_ms"]["queue_wait"] = round(max(0.0, wall_ms - rendered.stats["render_ms"]), 3)
+        observe_report(rendered.stats, rendered.size, cache_hit=False)
+        if report_cache.enabled and rendered.in_memory:
+            report_cache.put(fingerprint, rendered.data)
+        future.set_result(rendered)
+        return rendered, False
+    except asyncio.CancelledError:
+        # Only this request is cancelled, not the others waiting on its render
+        future.set_exception(RenderAbandoned(fingerprint))
+        future.exception()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark the exception as retrieved when nobody else was waiting on it
+        future.exception()
+        raise
+    finally:
+        if _pending.get(fingerprint) is future:
+            del _pending[fingerprint]
@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# Report sections, in document order
+REPORT_SECTIONS = ("summary", "chart", "expenses", "income", "ledger", "farmer")
+
+# The one-page summary (e.g. for a loan application): no itemised tables and no ledger
+SUMMARY_SECTIONS = ("summary", "chart", "farmer")
+
+
+@dataclass(frozen=True)
+class ReportOptions:
+    """Which sections a report contains (always in document order) and an optional page limit.
+
+    Picklable, so it travels to the render workers with the payload.
+    """
+    sections: Tuple[str, ...] = REPORT_SECTIONS
+    max_pages: Optional[int] = None
+
+    @classmethod
+    def from_request(cls, sections: Optional[str] = None, summary_only: bool = False,
+                     max_pages: Optional[int] = None) -> "ReportOptions":
+        """Options from request parameters; ``sections`` is a comma-separated list.
+
+        Raises ``ValueError`` for unknown sections, an empty selection or both
+        ``sections`` and ``summary_only``.
+        """
+        if sections is not None and summary_only:
+            raise ValueError("Use either sections or summary_only, not both")
+        if summary_only:
+            return cls(sections=SUMMARY_SECTIONS, max_pages=max_pages)
+        if sections is None:
+            return cls(max_pages=max_pages)
+        names = {name.strip().lower() for name in sections.split(",") if name.strip()}
+        unknown = names - set(REPORT_SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown section(s): {', '.join(sorted(unknown))} "
+                             f"(one or more of {', '.join(REPORT_SECTIONS)})")
+        if not names:
+            raise ValueError("Select at least one section")
+        return cls(sections=tuple(name for name in REPORT_SECTIONS if name in names), max_pages=max_pages)
+
+    @property
+    def full(self) -> bool:
+        """True for the complete report, the default"""
+        return self.sections == REPORT_SECTIONS and self.max_pages is None
+
+    def cache_key(self) -> str:
+        return f"sections={','.join(self.sections)};max_pages={self.max_pages or ''}"
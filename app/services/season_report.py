@@ -0,0 +1,145 @@
+import time
+from datetime import date, datetime
+from io import BytesIO
+from typing import Dict, List, Optional
+from reportlab.lib.units import inch
+from reportlab.platypus import PageBreak, Paragraph, Spacer
+from app.services.finance_report_generator import report_document
+from app.services.pdf.chart import build_chart_flowable
+from app.services.pdf.footer import draw_page_footer
+from app.services.pdf.header import draw_page_header
+from app.services.pdf.output import heading_text
+from app.services.pdf.pages import CapturedPage, RecordedTable, paged_table
+from app.services.pdf.styles import report_styles
+from app.services.pdf.tables import (
+    LEDGER_COL_WIDTHS,
+    LEDGER_HEADER,
+    TRANSACTION_COL_WIDTHS,
+    TRANSACTION_HEADER,
+    farmer_table,
+    finance_summary_section,
+)
+from app.services.seasons import EXPENSE, INCOME, SEASON_LAYOUT_VERSION, SeasonHeaderPayload, SeasonStore, season_store
+from app.services.spool import RenderedPDF
+from app.services.timing import StageTimer
+
+# SimpleDocTemplate's frame keeps 6pt of padding on every side
+_FRAME_PADDING = 12
+
+
+def render_season_report(season_id: str, generated_at: Optional[datetime] = None,
+                         store: SeasonStore = season_store) -> RenderedPDF:
+    """Render a season's report, replaying the pages kept from its last render.
+
+    Unlike the one-shot report, every section starts on a new page and is laid
+    out one table per page, so a page depends only on its own rows. Pages whose
+    rows are unchanged since the last render are replayed from the store as
+    recorded PDF operators; only the rest is laid out, and every finished page
+    (all but the last of each section) is kept for the next render.
+    Module-level so process pools can pickle it.
+    """
+    started = time.perf_counter()
+    timer = StageTimer()
+    generated_at = generated_at or datetime.now()
+    layout = str(SEASON_LAYOUT_VERSION)
+
+    season = store.get(season_id)
+    payload = SeasonHeaderPayload(store.farmer_details(season))
+    total_expenses, total_income = season["total_expenses"], season["total_income"]
+
+    def on_page(canvas, doc):
+        draw_page_header(canvas, doc, payload, doc.page, generated_at)
+        draw_page_footer(canvas, doc)
+
+    buffer = BytesIO()
+    doc = report_document(buffer, payload.farmer_details.farmer_name)
+    frame_size = (doc.width - _FRAME_PADDING, doc.height - _FRAME_PADDING)
+    styles = report_styles
+    recorders: Dict[str, List[RecordedTable]] = {}
+    reused_pages = 0
+
+    with timer.stage("tables"):
+        elements = [
+            Paragraph(heading_text("📈", "Finance Summary"), styles["SectionHeader"]),
+            finance_summary_section(
+                total_income=total_income,
+                total_expenses=total_expenses,
+                total_acres=payload.farmer_details.total_acres,
+            ),
+            Spacer(1, 0.5 * inch),
+        ]
+    with timer.stage("chart"):
+        elements.append(build_chart_flowable(total_income, total_expenses))
+
+    with timer.stage("tables"):
+        for kind, title, total_label, total in (
+            (EXPENSE, heading_text("💰", "Expenses"), "Total Expenses", total_expenses),
+            (INCOME, heading_text("💵", "Income"), "Total Income", total_income),
+        ):
+            reused = store.cached_pages(season_id, kind, layout)
+            first_row = _rows_covered(reused)
+            rows = [
+                [str(seq), row["category"], f"{row['amount']:,.2f}", date.fromordinal(row["day"]).isoformat(),
+                 row["description"] or "-"]
+                for seq, row in enumerate(store.transactions(season_id, kind, first_row), first_row + 1)
+            ]
+            section, recorders[kind] = paged_table(
+                [Paragraph(title, styles["SectionHeader"])], TRANSACTION_HEADER, rows, TRANSACTION_COL_WIDTHS,
+                styles.ledger_table, frame_size, first_row, reused,
+                totals_row=["", total_label, f"{total:,.2f}", "", ""], totals_style=styles.transaction_table,
+            )
+            elements.append(PageBreak())
+            elements.extend(section)
+            reused_pages += len(reused)
+
+    with timer.stage("ledger"):
+        reused = store.cached_pages(season_id, "ledger", layout)
+        first_row = _rows_covered(reused)
+        rows = [
+            [date.fromordinal(row["day"]).isoformat(), row["category"], row["kind"].capitalize(),
+             row["description"] or "-", f"{row['amount']:,.2f}"]
+            for row in store.ledger(season_id, first_row)
+        ]
+        section, recorders["ledger"] = paged_table(
+            [Paragraph(heading_text("📝", "Ledger"), styles["SectionHeader"])], LEDGER_HEADER, rows, LEDGER_COL_WIDTHS,
+            styles.ledger_table, frame_size, first_row, reused,
+        )
+        elements.append(PageBreak())
+        elements.extend(section)
+        elements.append(Spacer(1, 0.4 * inch))
+        reused_pages += len(reused)
+
+    with timer.stage("tables"):
+        elements.append(Paragraph(heading_text("📋", "Farmer & Crop Details"), styles["SectionHeader"]))
+        elements.append(farmer_table(payload))
+        elements.append(Spacer(1, 0.5 * inch))
+        elements.append(Spacer(1, 0.5 * inch))
+        footer_text = f"Report generated on {generated_at.strftime('%B %d, %Y at %I:%M %p')}"
+        elements.append(Paragraph(footer_text, styles["InfoText"]))
+
+    with timer.stage("layout"):
+        doc.build(elements, onFirstPage=on_page, onLaterPages=on_page)
+
+    # The last page of a section changes with the next append; every other new page is kept
+    finished: Dict[str, List[CapturedPage]] = {
+        section: [recorder.captured for recorder in section_recorders[:-1] if recorder.captured is not None]
+        for section, section_recorders in recorders.items()
+    }
+    with timer.stage("page_cache"):
+        store.save_pages(season_id, season["version"], layout, finished)
+
+    data = buffer.getvalue()
+    rendered = RenderedPDF(size=len(data), data=data)
+    rendered.stats = {
+        "stages_ms": timer.durations,
+        "render_ms": round((time.perf_counter() - started) * 1000, 3),
+        "pages": doc.page,
+        "reused_pages": reused_pages,
+        "expense_rows": season["expense_count"],
+        "income_rows": season["income_count"],
+    }
+    return rendered
+
+
+def _rows_covered(pages: List[CapturedPage]) -> int:
+    return pages[-1].first_row + pages[-1].row_count if pages else 0
@@ -0,0 +1,332 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+from app.config import settings
+from app.models import ExpenseItem, FarmerDetails, IncomeItem
+
+if TYPE_CHECKING:
+    # Kept pages are only built while rendering, which loads the PDF engine anyway
+    from app.services.pdf.pages import CapturedPage
+
+EXPENSE = "expense"
+INCOME = "income"
+
+# Bump whenever the season report page layout changes so kept pages are not replayed stale
+SEASON_LAYOUT_VERSION = 1
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS seasons (
+        id TEXT PRIMARY KEY,
+        farmer_details TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        version INTEGER NOT NULL DEFAULT 0,
+        expense_count INTEGER NOT NULL DEFAULT 0,
+        income_count INTEGER NOT NULL DEFAULT 0,
+        total_expenses REAL NOT NULL DEFAULT 0,
+        total_income REAL NOT NULL DEFAULT 0
+    )
+    """,
+    # kind is "expense" or "income"; seq numbers each kind in entry order from 0.
+    # ORDER BY day, kind, seq is the ledger order (expenses first on equal dates).
+    """
+    CREATE TABLE IF NOT EXISTS transactions (
+        season_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        amount REAL NOT NULL,
+        day INTEGER NOT NULL,
+        description TEXT,
+        PRIMARY KEY (season_id, kind, seq)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS transactions_ledger ON transactions (season_id, day, kind, seq)",
+    # Running totals, updated in the same transaction as every append
+    """
+    CREATE TABLE IF NOT EXISTS category_totals (
+        season_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        category TEXT NOT NULL,
+        total REAL NOT NULL,
+        first_seq INTEGER NOT NULL,
+        PRIMARY KEY (season_id, kind, category)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS month_totals (
+        season_id TEXT NOT NULL,
+        month TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        total REAL NOT NULL,
+        PRIMARY KEY (season_id, month, kind)
+    ) WITHOUT ROWID
+    """,
+    # Finished pages of the last render; layout identifies the report layout they were drawn with
+    """
+    CREATE TABLE IF NOT EXISTS rendered_pages (
+        season_id TEXT NOT NULL,
+        section TEXT NOT NULL,
+        page INTEGER NOT NULL,
+        layout TEXT NOT NULL,
+        first_row INTEGER NOT NULL,
+        row_count INTEGER NOT NULL,
+        width REAL NOT NULL,
+        height REAL NOT NULL,
+        stream TEXT NOT NULL,
+        fonts TEXT NOT NULL,
+        PRIMARY KEY (season_id, section, page)
+    ) WITHOUT ROWID
+    """,
+)
+
+
+class SeasonNotFound(KeyError):
+    """Raised for an unknown season id"""
+
+
+class SeasonStore:
+    """Persistent per-farmer, per-season ledger in SQLite.
+
+    Transactions are append-only. Totals per season, category and month are
+    updated as part of every append, so summaries never rescan the ledger, and
+    the finished pages of the last rendered report are kept so the next render
+    only lays out pages whose rows changed (see ``season_report``).
+
+    The connection is opened lazily and per process, so render pool workers
+    can use the module-level store as well.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None or self._pid != os.getpid():
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            db.row_factory = sqlite3.Row
+            with db:
+                db.execute("PRAGMA journal_mode=WAL")
+                for statement in _SCHEMA:
+                    db.execute(statement)
+            self._db, self._pid = db, os.getpid()
+        return self._db
+
+    def create(self, farmer_details: FarmerDetails) -> str:
+        season_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self.db:
+            self.db.execute(
+                "INSERT INTO seasons (id, farmer_details, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (season_id, farmer_details.model_dump_json(), now, now),
+            )
+        return season_id
+
+    def get(self, season_id: str) -> dict:
+        with self._lock:
+            row = self.db.execute("SELECT * FROM seasons WHERE id = ?", (season_id,)).fetchone()
+        if row is None:
+            raise SeasonNotFound(season_id)
+        return dict(row)
+
+    def farmer_details(self, season: dict) -> FarmerDetails:
+        return FarmerDetails(**json.loads(season["farmer_details"]))
+
+    def append(self, season_id: str, expenses: Sequence[ExpenseItem], income: Sequence[IncomeItem]) -> dict:
+        """Append transactions, update the running totals and drop the cached pages they change.
+
+        Expense and income rows only ever go after the existing ones, and the
+        last page of a section is never kept, so their kept pages stay valid.
+        The ledger is in date order: a back-dated row changes every ledger page
+        from its position onwards.
+        """
+        rows = {
+            EXPENSE: [(item.category, item.amount, item.expense_date.toordinal(), item.description)
+                      for item in expenses],
+            INCOME: [(item.category, item.amount, item.income_date.toordinal(), item.description)
+                     for item in income],
+        }
+        with self._lock, self.db:
+            db = self.db
+            season = db.execute("SELECT * FROM seasons WHERE id = ?", (season_id,)).fetchone()
+            if season is None:
+                raise SeasonNotFound(season_id)
+
+            # First ledger position the new rows land on: after every expense on or
+            # before their date, and after income before (expense) or on (income) it
+            ledger_start = None
+            for kind, kind_rows in rows.items():
+                if not kind_rows:
+                    continue
+                day = min(row[2] for row in kind_rows)
+                income_op = "<" if kind == EXPENSE else "<="
+                position = db.execute(
+                    f"""SELECT (SELECT COUNT(*) FROM transactions WHERE season_id = ? AND day <= ? AND kind = ?)
+                             + (SELECT COUNT(*) FROM transactions WHERE season_id = ? AND day {income_op} ?
+                                AND kind = ?)""",
+                    (season_id, day, EXPENSE, season_id, day, INCOME),
+                ).fetchone()[0]
+                ledger_start = position if ledger_start is None else min(ledger_start, position)
+
+            for kind, kind_rows in rows.items():
+                first_seq = season[f"{kind}_count"]
+                db.executemany(
+                    "INSERT INTO transactions (season_id, kind, seq, category, amount, day, description)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(season_id, kind, seq, *row) for seq, row in enumerate(kind_rows, first_seq)],
+                )
+                db.executemany(
+                    "INSERT INTO category_totals (season_id, kind, category, total, first_seq) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (season_id, kind, category) DO UPDATE SET total = total + excluded.total",
+                    [(season_id, kind, category, amount, seq)
+                     for seq, (category, amount, _, _) in enumerate(kind_rows, first_seq)],
+                )
+                db.executemany(
+                    "INSERT INTO month_totals (season_id, month, kind, total) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (season_id, month, kind) DO UPDATE SET total = total + excluded.total",
+                    [(season_id, _month(day), kind, amount) for _, amount, day, _ in kind_rows],
+                )
+
+            if ledger_start is not None:
+                db.execute(
+                    "DELETE FROM rendered_pages WHERE season_id = ? AND section = 'ledger'"
+                    " AND first_row + row_count > ?",
+                    (season_id, ledger_start),
+                )
+            db.execute(
+                f"""UPDATE seasons SET version = version + 1, updated_at = ?,
+                       expense_count = expense_count + ?, income_count = income_count + ?,
+                       total_expenses = total_expenses + ?, total_income = total_income + ?
+                    WHERE id = ?""",
+                (time.time(), len(rows[EXPENSE]), len(rows[INCOME]),
+                 sum(row[1] for row in rows[EXPENSE]), sum(row[1] for row in rows[INCOME]), season_id),
+            )
+            season = db.execute("SELECT * FROM seasons WHERE id = ?", (season_id,)).fetchone()
+        return dict(season)
+
+    def by_category(self, season_id: str, kind: str) -> Dict[str, float]:
+        """Total amount per category (rounded to paise), in first-seen order"""
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT category, total FROM category_totals WHERE season_id = ? AND kind = ? ORDER BY first_seq",
+                (season_id, kind),
+            ).fetchall()
+        return {row["category"]: round(row["total"], 2) for row in rows}
+
+    def by_month(self, season_id: str) -> Dict[str, Dict[str, float]]:
+        """{"YYYY-MM": {"income": ..., "expense": ...}} in calendar order"""
+        result: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT month, kind, total FROM month_totals WHERE season_id = ? ORDER BY month",
+                (season_id,),
+            ).fetchall()
+        for row in rows:
+            result.setdefault(row["month"], {"income": 0.0, "expense": 0.0})[row["kind"]] = round(row["total"], 2)
+        return result
+
+    def transactions(self, season_id: str, kind: str, start: int = 0) -> List[sqlite3.Row]:
+        """Rows of one kind in entry order from ``start``: (category, amount, day, description)"""
+        with self._lock:
+            return self.db.execute(
+                "SELECT category, amount, day, description FROM transactions"
+                " WHERE season_id = ? AND kind = ? AND seq >= ? ORDER BY seq",
+                (season_id, kind, start),
+            ).fetchall()
+
+    def ledger(self, season_id: str, start: int = 0) -> List[sqlite3.Row]:
+        """Ledger entries (day, category, kind, description, amount) in date order from position ``start``"""
+        with self._lock:
+            return self.db.execute(
+                "SELECT day, category, kind, description, amount FROM transactions WHERE season_id = ?"
+                " ORDER BY day, kind, seq LIMIT -1 OFFSET ?",
+                (season_id, start),
+            ).fetchall()
+
+    def cached_pages(self, season_id: str, section: str, layout: str) -> List["CapturedPage"]:
+        """Consecutive leading pages of ``section`` kept from the last render with ``layout``"""
+        from app.services.pdf.pages import CapturedPage
+
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT * FROM rendered_pages WHERE season_id = ? AND section = ? AND layout = ? ORDER BY page",
+                (season_id, section, layout),
+            ).fetchall()
+        pages: List["CapturedPage"] = []
+        for row in rows:
+            expected_row = pages[-1].first_row + pages[-1].row_count if pages else 0
+            if row["page"] != len(pages) or row["first_row"] != expected_row:
+                break
+            pages.append(CapturedPage(row["page"], row["first_row"], row["row_count"], row["width"],
+                                      row["height"], row["stream"], json.loads(row["fonts"])))
+        return pages
+
+    def save_pages(self, season_id: str, version: int, layout: str,
+                   pages: Dict[str, List["CapturedPage"]]) -> bool:
+        """Keep freshly rendered pages, unless the season changed while it was rendering"""
+        with self._lock, self.db:
+            current = self.db.execute("SELECT version FROM seasons WHERE id = ?", (season_id,)).fetchone()
+            if current is None or current["version"] != version:
+                return False
+            self.db.execute("DELETE FROM rendered_pages WHERE season_id = ? AND layout != ?", (season_id, layout))
+            self.db.executemany(
+                "INSERT OR REPLACE INTO rendered_pages (season_id, section, page, layout, first_row, row_count,"
+                " width, height, stream, fonts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(season_id, section, page.page, layout, page.first_row, page.row_count, page.width, page.height,
+                  page.stream, json.dumps(page.fonts))
+                 for section, section_pages in pages.items() for page in section_pages],
+            )
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db = None
+
+
+@dataclass
+class SeasonHeaderPayload:
+    """The part of a payload the shared header and farmer table read"""
+    farmer_details: FarmerDetails
+
+
+def _month(day: int) -> str:
+    return date.fromordinal(day).strftime("%Y-%m")
+
+
+season_store = SeasonStore(settings.season_db)
+
+
+def season_summary(season_id: str, store: SeasonStore = season_store) -> dict:
+    """Totals and breakdowns of a season, all read from the running totals"""
+    season = store.get(season_id)
+    farmer_details = store.farmer_details(season)
+    total_expenses, total_income = season["total_expenses"], season["total_income"]
+    acres = farmer_details.total_acres
+    return {
+        "season_id": season_id,
+        "version": season["version"],
+        "farmer_details": farmer_details.model_dump(mode="json"),
+        "expense_rows": season["expense_count"],
+        "income_rows": season["income_count"],
+        "total_expenses": total_expenses,
+        "total_income": total_income,
+        "net_profit": total_income - total_expenses,
+        "cost_per_acre": total_expenses / acres if acres > 0 else 0,
+        "expense_by_category": store.by_category(season_id, EXPENSE),
+        "income_by_category": store.by_category(season_id, INCOME),
+        "by_month": store.by_month(season_id),
+    }
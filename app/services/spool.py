@@ -0,0 +1,108 @@
+import os
+import tempfile
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Iterator, List, Optional
+
+
+@dataclass
+class RenderedPDF:
+    """A finished PDF, held either in memory (``data``) or in a temp file (``path``)"""
+    size: int
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+    # Render statistics (stage timings, pages, rows); empty when served from cache
+    stats: dict = field(default_factory=dict)
+
+    @property
+    def in_memory(self) -> bool:
+        return self.data is not None
+
+    def read_bytes(self) -> bytes:
+        if self.data is not None:
+            return self.data
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def discard(self) -> None:
+        """Remove the backing temp file, if any"""
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+class PDFSpool:
+    """Write-only file object that keeps output in memory up to ``threshold``
+    bytes and moves it to a named temp file once it grows past that.
+
+    Unlike ``tempfile.SpooledTemporaryFile`` the rolled-over file has a path, so
+    it can be handed from a render worker process back to the server process.
+    """
+
+    def __init__(self, threshold: int, directory: Optional[str] = None):
+        self.threshold = threshold
+        self.directory = directory
+        self.size = 0
+        self._buffer: Optional[BytesIO] = BytesIO()
+        self._file = None
+
+    def write(self, data: bytes) -> int:
+        if self._file is None and self.size + len(data) > self.threshold:
+            self._file = tempfile.NamedTemporaryFile(
+                prefix="report_", suffix=".pdf", dir=self.directory, delete=False
+            )
+            self._file.write(self._buffer.getvalue())
+            self._buffer = None
+        (self._file or self._buffer).write(data)
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def finish(self) -> RenderedPDF:
+        if self._file is not None:
+            self._file.close()
+            return RenderedPDF(size=self.size, path=self._file.name)
+        return RenderedPDF(size=self.size, data=self._buffer.getvalue())
+
+
+class StreamSink:
+    """Write-only, non-seekable sink that hands written bytes back in chunks"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.pending = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self.pending += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.pending = 0
+        return data
+
+
+def iter_file_chunks(rendered: RenderedPDF, chunk_size: int) -> Iterator[bytes]:
+    """Yield a file-backed PDF in fixed-size chunks, deleting the file afterwards.
+
+    Responses also delete it in a background task, for bodies never iterated.
+    """
+    try:
+        with open(rendered.path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        rendered.discard()
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+from app.config import settings
+from app.log import log_event
+from app.services.engines import load_engines, warm_up
+from app.services.render_pool import render_pool
+from app.services.timing import StageTimer
+
+logger = logging.getLogger(__name__)
+
+PREWARM_MODES = ("off", "import", "render")
+
+
+class StartupReport:
+    """Where this server process spent its time between importing the app and being ready.
+
+    ``imports`` is the app's own import time; the other stages run in the
+    lifespan startup hook. The process is ready once the configured pre-warm
+    has finished and until it starts draining (see ``app.server``), which
+    ``/ready`` reports to load balancers and autoscalers.
+    """
+
+    def __init__(self):
+        self.timer = StageTimer()
+        self.started = time.perf_counter()
+        self.ready_ms: Optional[float] = None
+        self.workers: list = []
+        # Set when the server starts draining before shutdown
+        self.draining = False
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_ms is not None
+
+    def imported(self, import_started: float) -> None:
+        """Record the app import, which began at ``import_started`` (a perf_counter reading)"""
+        self.started = import_started
+        self.timer.add("imports", (time.perf_counter() - import_started) * 1000)
+
+    def mark_ready(self) -> None:
+        self.ready_ms = round((time.perf_counter() - self.started) * 1000, 3)
+        log_event(logger, logging.INFO, "startup", prewarm=settings.prewarm, ready_ms=self.ready_ms,
+                  stages_ms=self.timer.durations, workers=self.workers)
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready and not self.draining,
+            "draining": self.draining,
+            "prewarm": settings.prewarm,
+            "ready_ms": self.ready_ms,
+            "stages_ms": dict(self.timer.durations),
+            "workers": list(self.workers),
+        }
+
+
+startup_report = StartupReport()
+
+
+async def prewarm(mode: Optional[str] = None) -> None:
+    """Load the report engines ahead of the first request, then mark the process ready.
+
+    ``import`` loads ReportLab (and matplotlib for PNG charts) into this
+    process; ``render`` also starts every render pool worker and renders a
+    one-row report in each. A failing pre-warm is logged, not fatal: renders
+    then load the engines on first use.
+    """
+    mode = mode or settings.prewarm
+    try:
+        if mode not in PREWARM_MODES:
+            raise ValueError(f"Unknown prewarm mode: {mode}")
+        if mode in ("import", "render"):
+            with startup_report.timer.stage("engine_imports"):
+                # Before the pool starts, so forked render workers inherit the loaded
+                # modules (spawned ones, e.g. under serve.py, import them in warm_up)
+                await asyncio.to_thread(load_engines)
+        if mode == "render":
+            with startup_report.timer.stage("worker_warmup"):
+                startup_report.workers = await render_pool.warm(warm_up)
+    except Exception as e:
+        log_event(logger, logging.WARNING, "prewarm_failed", prewarm=mode, error=str(e))
+    startup_report.mark_ready()
@@ -0,0 +1,181 @@
+import sys
+from array import array
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Union
+import numpy as np
+from app.models import FarmerDetails, FinancePayload
+
+# Day ordinal of 1970-01-01, to convert date ordinals to numpy datetime64[D]
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Column headings of the itemised expense/income tables and of the ledger,
+# shared by the PDF tables and the CSV/XLSX exports
+TRANSACTION_HEADER = ["#", "Category", "Amount", "Date", "Description"]
+LEDGER_HEADER = ["Date", "Particulars", "Transaction Type", "Description", "Amount"]
+
+
+@dataclass
+class TransactionColumns:
+    """Columnar view of one transaction list (expenses or income).
+
+    Categories and descriptions are interned: ``category_codes[i]`` indexes into
+    ``categories`` and ``description_codes[i]`` into ``descriptions`` (-1 when
+    the transaction has no description, or an empty one). Dates are stored as
+    ``date.toordinal()`` day numbers. A row costs 20 bytes plus its share of
+    the distinct strings, instead of a model object with four attributes.
+    """
+    amounts: np.ndarray            # float64
+    days: np.ndarray               # int32 date ordinals
+    category_codes: np.ndarray     # int32
+    categories: List[str]
+    description_codes: np.ndarray  # int32, -1 for no description
+    descriptions: List[str]
+
+    @classmethod
+    def from_items(cls, items, date_field: str) -> "TransactionColumns":
+        """Convert ``ExpenseItem``/``IncomeItem`` models in one pass"""
+        count = len(items)
+        amounts = np.empty(count, dtype=np.float64)
+        days = np.empty(count, dtype=np.int32)
+        codes = np.empty(count, dtype=np.int32)
+        description_codes = np.empty(count, dtype=np.int32)
+        index: Dict[str, int] = {}
+        description_index: Dict[Optional[str], int] = {None: -1}
+        for i, item in enumerate(items):
+            amounts[i] = item.amount
+            days[i] = getattr(item, date_field).toordinal()
+            codes[i] = index.setdefault(item.category, len(index))
+            description_codes[i] = description_index.setdefault(item.description or None, len(description_index) - 1)
+        return cls(amounts=amounts, days=days, category_codes=codes, categories=list(index),
+                   description_codes=description_codes, descriptions=list(description_index)[1:])
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    @property
+    def total(self) -> float:
+        return float(self.amounts.sum())
+
+    def by_category(self) -> Dict[str, float]:
+        """Total amount per category (rounded to paise), in first-seen order"""
+        sums = np.bincount(self.category_codes, weights=self.amounts, minlength=len(self.categories))
+        return {category: round(float(total), 2) for category, total in zip(self.categories, sums)}
+
+    def description_labels(self, missing: str = "-") -> List[str]:
+        """Description of each transaction as text, ``missing`` where there is none"""
+        # Code -1 picks the trailing ``missing`` entry
+        labels = [*self.descriptions, missing]
+        return [labels[code] for code in self.description_codes.tolist()]
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and their string tables"""
+        strings = sum(sys.getsizeof(text) for text in self.categories + self.descriptions)
+        arrays = self.amounts.nbytes + self.days.nbytes + self.category_codes.nbytes + self.description_codes.nbytes
+        return arrays + strings
+
+    def dates(self) -> np.ndarray:
+        """Date of each transaction as ``datetime64[D]``"""
+        return (self.days.astype(np.int64) - _EPOCH_ORDINAL).astype("datetime64[D]")
+
+    def iso_dates(self) -> List[str]:
+        """Date of each transaction as ``YYYY-MM-DD`` text"""
+        return np.datetime_as_string(self.dates(), unit="D").tolist()
+
+    def months(self) -> np.ndarray:
+        """Month of each transaction as ``datetime64[M]``"""
+        return self.dates().astype("datetime64[M]")
+
+
+class TransactionColumnsBuilder:
+    """Append-only builder for ``TransactionColumns`` backed by compact ``array`` buffers"""
+
+    def __init__(self):
+        self._amounts = array("d")
+        self._days = array("i")
+        self._codes = array("i")
+        self._index: Dict[str, int] = {}
+        self._description_codes = array("i")
+        self._description_index: Dict[Optional[str], int] = {None: -1}
+
+    def __len__(self) -> int:
+        return len(self._amounts)
+
+    def extend(self, categories: List[str], amounts: List[float], days: List[int],
+               descriptions: List[Optional[str]]) -> None:
+        """Append many rows at once; the four lists are parallel. Empty descriptions count as none"""
+        self._amounts.extend(amounts)
+        self._days.extend(days)
+        index = self._index
+        self._codes.extend([index.setdefault(category, len(index)) for category in categories])
+        index = self._description_index
+        self._description_codes.extend([index.setdefault(text or None, len(index) - 1) for text in descriptions])
+
+    def build(self) -> TransactionColumns:
+        return TransactionColumns(
+            amounts=np.frombuffer(self._amounts, dtype=np.float64).copy(),
+            days=np.frombuffer(self._days, dtype=np.int32).copy(),
+            category_codes=np.frombuffer(self._codes, dtype=np.int32).copy(),
+            categories=list(self._index),
+            description_codes=np.frombuffer(self._description_codes, dtype=np.int32).copy(),
+            descriptions=list(self._description_index)[1:],
+        )
+
+
+@dataclass
+class ColumnarPayload:
+    """Farmer details plus transactions already in columnar form (e.g. from a bulk upload).
+
+    Accepted wherever the report pipeline takes a ``FinancePayload``.
+    """
+    farmer_details: FarmerDetails
+    expenses: TransactionColumns
+    income: TransactionColumns
+
+
+# Anything a report can be rendered from
+ReportPayload = Union[FinancePayload, ColumnarPayload]
+
+
+def to_ordinals(dates: np.ndarray) -> np.ndarray:
+    """``datetime64[D]`` values as ``date.toordinal()`` day numbers"""
+    return dates.astype(np.int64) + _EPOCH_ORDINAL
+
+
+def ledger_order(expenses: TransactionColumns, income: TransactionColumns) -> np.ndarray:
+    """Indexes into expenses-then-income in date order.
+
+    The sort is stable over expenses followed by income, so on any one day
+    every expense comes before every income entry, and entries of the same
+    type and day keep their payload order.
+    """
+    return np.argsort(np.concatenate([expenses.days, income.days]), kind="stable")
+
+
+def iter_ledger_entries(expenses: TransactionColumns, incomes: TransactionColumns, missing_description: str = "-",
+                        order: Optional[np.ndarray] = None):
+    """Yield (date, particulars, type, description, amount) for every transaction in date order.
+
+    ``order`` is the ``ledger_order`` of the two columns when the caller already has it.
+
+    The order is one stable argsort over the date ordinals of both columns
+    (expenses first), so on equal dates expenses come before income, the same
+    order as the earlier heap merge of the two date-sorted streams. Columns
+    hold day ordinals, not dates, so sorting them whole is cheaper than merging
+    two iterators that build a ``date`` per row before comparing.
+    """
+    streams = [
+        (columns.categories, columns.category_codes.tolist(), columns.days.tolist(),
+         columns.description_labels(missing_description), columns.amounts.tolist(), txn_type)
+        for columns, txn_type in ((expenses, "Expense"), (incomes, "Income"))
+    ]
+    expense_count = len(expenses)
+    if order is None:
+        order = ledger_order(expenses, incomes)
+    for i in order.tolist():
+        if i < expense_count:
+            categories, codes, days, descriptions, amounts, txn_type = streams[0]
+        else:
+            categories, codes, days, descriptions, amounts, txn_type = streams[1]
+            i -= expense_count
+        yield date.fromordinal(days[i]), categories[codes[i]], txn_type, descriptions[i], amounts[i]
@@ -0,0 +1,55 @@
+import random
+from datetime import date, timedelta
+from app.models import FinancePayload
+
+EXPENSE_CATEGORIES = ["Seeds", "Fertilizer", "Pesticide", "Labour", "Irrigation", "Machinery", "Transport"]
+INCOME_CATEGORIES = ["Crop Sale", "Subsidy", "By-product Sale"]
+SEASON_START = date(2024, 6, 1)
+SEASON_DAYS = 135
+
+
+def synthetic_payload_dict(rows: int, seed: int = 0, income_share: float = 0.25) -> dict:
+    """JSON-ready payload with ``rows`` transactions in total (at least one of each kind)"""
+    rng = random.Random(seed)
+    income_rows = max(1, int(rows * income_share))
+    expense_rows = max(1, rows - income_rows)
+
+    def day() -> str:
+        return (SEASON_START + timedelta(days=rng.randrange(SEASON_DAYS))).isoformat()
+
+    return {
+        "farmer_details": {
+            "farmer_name": f"Benchmark Farmer {seed}",
+            "crop_name": "Rice",
+            "season": "Kharif",
+            "total_acres": 12.5,
+            "sowing_date": SEASON_START.isoformat(),
+            "harvest_date": (SEASON_START + timedelta(days=SEASON_DAYS)).isoformat(),
+            "village": "Wadgaon",
+            "taluka": "Haveli",
+            "district": "Pune",
+            "state": "Maharashtra",
+        },
+        "expenses": [
+            {
+                "category": rng.choice(EXPENSE_CATEGORIES),
+                "amount": round(rng.uniform(50, 25000), 2),
+                "expense_date": day(),
+                "description": rng.choice([None, "Bulk purchase", "Paid in cash", "Hired for two days"]),
+            }
+            for _ in range(expense_rows)
+        ],
+        "income": [
+            {
+                "category": rng.choice(INCOME_CATEGORIES),
+                "amount": round(rng.uniform(1000, 250000), 2),
+                "income_date": day(),
+                "description": rng.choice([None, "Sold at APMC market"]),
+            }
+            for _ in range(income_rows)
+        ],
+    }
+
+
+def synthetic_payload(rows: int, seed: int = 0, income_share: float = 0.25) -> FinancePayload:
+    return FinancePayload(**synthetic_payload_dict(rows, seed, income_share))
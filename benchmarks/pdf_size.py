@@ -0,0 +1,116 @@
+"""Check report PDF sizes against recorded budgets and the sample reports in docs/.
+
+Run from the repository root (``tests/test_pdf_size.py`` runs the same check under pytest):
+
+    python -m benchmarks.pdf_size                                    # check
+    python -m benchmarks.pdf_size --save benchmarks/pdf_sizes.json   # record new budgets
+
+Every reference report is rendered from a fixed synthetic payload and
+timestamp. The run exits with status 1 if a report grew more than
+``--tolerance`` over its recorded budget, or if a vector-chart report is
+larger than the median docs/ sample with the same page count.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+DOCS_DIR = Path(__file__).resolve().parents[1] / "docs"
+BUDGETS_PATH = Path(__file__).resolve().parent / "pdf_sizes.json"
+GENERATED_AT = datetime(2024, 10, 15, 9, 30)
+
+# A page object in the page tree (not the /Pages node)
+_PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+
+# name -> (transactions, chart renderer)
+REFERENCE_REPORTS = {
+    "rows_10": (10, "vector"),
+    "rows_1000": (1000, "vector"),
+    "rows_10_matplotlib": (10, "matplotlib"),
+}
+
+
+def render_sizes() -> Dict[str, dict]:
+    from app.config import settings
+    from app.services.finance_report_generator import FinanceReportGenerator
+    from benchmarks.payloads import synthetic_payload
+
+    results = {}
+    configured = settings.chart_renderer
+    try:
+        for name, (rows, renderer) in REFERENCE_REPORTS.items():
+            settings.chart_renderer = renderer
+            generator = FinanceReportGenerator()
+            pdf = generator.generate(synthetic_payload(rows), GENERATED_AT).getvalue()
+            results[name] = {"pdf_bytes": len(pdf), "pages": generator.stats["pages"], "chart": renderer}
+    finally:
+        settings.chart_renderer = configured
+    return results
+
+
+def sample_sizes() -> Dict[int, List[int]]:
+    """Sizes of the docs/ sample reports by page count (pages are counted from the page tree)"""
+    sizes = defaultdict(list)
+    for path in sorted(DOCS_DIR.glob("*.pdf")):
+        data = path.read_bytes()
+        sizes[len(_PAGE_OBJECT.findall(data))].append(len(data))
+    return sizes
+
+
+def check(results: Dict[str, dict], budgets: Dict[str, dict], samples: Dict[int, List[int]],
+          tolerance: float) -> List[str]:
+    """Return one message per report over its budget or over the docs/ samples"""
+    problems = []
+    for name, result in results.items():
+        budget = budgets.get(name, {}).get("pdf_bytes")
+        if budget and result["pdf_bytes"] > budget * (1 + tolerance):
+            problems.append(f"{name} is {result['pdf_bytes']} bytes, over its budget of {budget} (+{tolerance:.0%})")
+        comparable = samples.get(result["pages"])
+        if result["chart"] == "vector" and comparable:
+            median = statistics.median(comparable)
+            if result["pdf_bytes"] > median:
+                problems.append(f"{name} is {result['pdf_bytes']} bytes, larger than the median "
+                                f"{result['pages']}-page docs/ sample ({median:.0f})")
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budgets", default=str(BUDGETS_PATH), help="JSON file of recorded sizes")
+    parser.add_argument("--save", help="write the sizes to this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.02, help="allowed relative growth (default 0.02)")
+    args = parser.parse_args(argv)
+    os.environ.setdefault("REPORT_LOG_LEVEL", "WARNING")
+
+    results = render_sizes()
+    samples = sample_sizes()
+    for name, result in results.items():
+        print(f"{name:20} {result['pdf_bytes']:>9} bytes  {result['pages']:>3} pages  chart {result['chart']}")
+    for pages, sizes in sorted(samples.items()):
+        print(f"docs/ {pages}-page samples: {len(sizes):>3}  median {statistics.median(sizes):>9.0f} bytes")
+
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"saved {args.save}")
+        return 0
+
+    budgets = {}
+    if os.path.exists(args.budgets):
+        with open(args.budgets) as handle:
+            budgets = json.load(handle)
+    problems = check(results, budgets, samples, args.tolerance)
+    for problem in problems:
+        print(f"SIZE REGRESSION: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
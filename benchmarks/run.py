@@ -0,0 +1,285 @@
+"""Benchmark the report pipeline and compare against a JSON baseline.
+
+Run from the repository root:
+
+    python -m benchmarks.run                                  # all cases and sizes
+    python -m benchmarks.run --sizes 10,1000 --cases generate,ledger
+    python -m benchmarks.run --save benchmarks/baseline.json  # record a new baseline
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+
+Every (case, size) runs in a fresh process so its peak RSS is its own. With
+``--baseline`` the run exits with status 1 if any metric regressed by more
+than ``--tolerance`` or an absolute floor in ``FLOORS`` was missed.
+Baselines are only comparable on the machine that recorded them.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Callable, Dict, List
+
+DEFAULT_SIZES = (10, 1000, 10000, 100000)
+# Runs per size unless --repeat is given; big reports are slow enough to be stable
+DEFAULT_REPEATS = {10: 20, 1000: 5, 10000: 3, 100000: 1}
+GENERATED_AT = datetime(2024, 11, 1, 9, 30)
+
+# metric -> 1 if higher is worse, -1 if lower is worse
+REGRESSION_METRICS = {
+    "p50_ms": 1,
+    "p95_ms": 1,
+    "peak_rss_mb": 1,
+    "pdf_bytes": 1,
+    "rows_per_s": -1,
+    "pages_per_s": -1,
+}
+# (case, metric) -> (minimum value, smallest size the floor applies to)
+FLOORS = {
+    ("ledger", "rows_per_s"): (3000, 1000),
+}
+
+CASES: Dict[str, Callable[[int, int], List[dict]]] = {}
+
+
+def case(name: str):
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+@case("generate")
+def bench_generate(rows: int, repeat: int) -> List[dict]:
+    """FinanceReportGenerator.generate end to end, in memory"""
+    from app.services.finance_report_generator import FinanceReportGenerator
+    from app.services.pdf.chart import chart_cache
+    from benchmarks.payloads import synthetic_payload
+
+    payload = synthetic_payload(rows)
+    samples = []
+    for _ in range(repeat):
+        chart_cache.clear()
+        generator = FinanceReportGenerator()
+        buffer, ms = _timed(lambda: generator.generate(payload, GENERATED_AT))
+        samples.append({
+            "ms": ms,
+            "pdf_bytes": len(buffer.getvalue()),
+            "pages": generator.stats["pages"],
+            "stages_ms": generator.stats["stages_ms"],
+        })
+    return samples
+
+
+@case("ledger")
+def bench_ledger(rows: int, repeat: int) -> List[dict]:
+    """ledger_tables plus page layout of the ledger alone"""
+    from io import BytesIO
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
+    from app.services.pdf.tables import ledger_tables
+    from benchmarks.payloads import synthetic_payload
+
+    payload = synthetic_payload(rows)
+    samples = []
+    for _ in range(repeat):
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4)
+        _, ms = _timed(lambda: doc.build(ledger_tables(payload.expenses, payload.income)))
+        samples.append({"ms": ms, "pdf_bytes": len(buffer.getvalue()), "pages": doc.page})
+    return samples
+
+
+@case("chart")
+def bench_chart(rows: int, repeat: int) -> List[dict]:
+    """Uncached matplotlib PNG chart (the vector chart is part of ``generate``)"""
+    from app.services.pdf.chart import chart_cache, generate_income_expense_chart
+
+    samples = []
+    for i in range(repeat):
+        chart_cache.clear()
+        png, ms = _timed(lambda: generate_income_expense_chart(100000.0 + i, 60000.0 + i))
+        samples.append({"ms": ms, "png_bytes": len(png.getvalue())})
+    return samples
+
+
+@case("endpoint")
+def bench_endpoint(rows: int, repeat: int) -> List[dict]:
+    """POST /api/generate-report through the ASGI app (distinct payloads, so no cache hits)"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from benchmarks.payloads import synthetic_payload_dict
+
+    bodies = [synthetic_payload_dict(rows, seed=seed) for seed in range(repeat)]
+    samples = []
+    with TestClient(app) as client:
+        for body in bodies:
+            response, ms = _timed(lambda: client.post("/api/generate-report", json=body))
+            response.raise_for_status()
+            samples.append({"ms": ms, "pdf_bytes": len(response.content)})
+    return samples
+
+
+def _bench_decode(rows: int, repeat: int, decode) -> List[dict]:
+    from app.services.aggregates import aggregate_payload
+    from benchmarks.payloads import synthetic_payload_dict
+
+    body = json.dumps(synthetic_payload_dict(rows)).encode()
+    samples = []
+    for _ in range(repeat):
+        _, ms = _timed(lambda: aggregate_payload(decode(body)))
+        samples.append({"ms": ms})
+    return samples
+
+
+@case("decode")
+def bench_decode(rows: int, repeat: int) -> List[dict]:
+    """JSON body to report aggregates the way FastAPI decodes it by default (json.loads, then FinancePayload)"""
+    from app.models import FinancePayload
+
+    return _bench_decode(rows, repeat, lambda body: FinancePayload.model_validate(json.loads(body)))
+
+
+@case("decode_fast")
+def bench_decode_fast(rows: int, repeat: int) -> List[dict]:
+    """JSON body to report aggregates on the REPORT_JSON_FAST_PATH decoder"""
+    from app.services.fast_json import decode_finance_payload
+
+    return _bench_decode(rows, repeat, decode_finance_payload)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarise(rows: int, samples: List[dict]) -> dict:
+    latencies = [sample["ms"] for sample in samples]
+    p50 = _percentile(latencies, 0.5)
+    result = {
+        "rows": rows,
+        "runs": len(samples),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(_percentile(latencies, 0.95), 3),
+        "max_ms": round(max(latencies), 3),
+        "rows_per_s": round(rows / (p50 / 1000), 1) if p50 else None,
+    }
+    for field in ("pdf_bytes", "png_bytes", "pages"):
+        if field in samples[0]:
+            result[field] = samples[-1][field]
+    if "pages" in result and p50:
+        result["pages_per_s"] = round(result["pages"] / (p50 / 1000), 2)
+    if "stages_ms" in samples[0]:
+        stages = {}
+        for stage in samples[0]["stages_ms"]:
+            stage_p50 = _percentile([sample["stages_ms"].get(stage, 0.0) for sample in samples], 0.5)
+            stages[stage] = {
+                "p50_ms": round(stage_p50, 3),
+                "pages_per_s": round(result["pages"] / (stage_p50 / 1000), 2) if stage_p50 else None,
+            }
+        result["stages"] = stages
+    return result
+
+
+def _run_case(name: str, rows: int, repeat: int) -> dict:
+    result = summarise(rows, CASES[name](rows, repeat))
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+    return result
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Return one message per regressed metric or missed floor"""
+    problems = []
+    for key, result in results.items():
+        name = key.split("/")[0]
+        for (floor_case, metric), (minimum, min_rows) in FLOORS.items():
+            value = result.get(metric)
+            if floor_case == name and result["rows"] >= min_rows and value is not None and value < minimum:
+                problems.append(f"{key} {metric}={value} is below the floor of {minimum}")
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric, direction in REGRESSION_METRICS.items():
+            old, new = previous.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * direction
+            if change > tolerance:
+                problems.append(f"{key} {metric} {old} -> {new} ({change:+.0%} worse)")
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated cases to run")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated row counts")
+    parser.add_argument("--repeat", type=int, help="runs per size (default depends on size)")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression (default 0.25)")
+    args = parser.parse_args(argv)
+
+    cases = [name.strip() for name in args.cases.split(",") if name.strip()]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    # Quiet logs, and render in-process so the endpoint's peak RSS includes the render
+    os.environ.setdefault("REPORT_LOG_LEVEL", "WARNING")
+    os.environ.setdefault("REPORT_RENDER_MODE", "thread")
+
+    results: Dict[str, dict] = {}
+    for name in cases:
+        # The chart does not depend on the payload size
+        for rows in ([0] if name == "chart" else sizes):
+            repeat = args.repeat or DEFAULT_REPEATS.get(rows, 3 if rows else 20)
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(_run_case, name, rows, repeat).result()
+            key = f"{name}/{rows}"
+            results[key] = result
+            print(f"{key:18} p50 {result['p50_ms']:>10.1f} ms  p95 {result['p95_ms']:>10.1f} ms  "
+                  f"rss {result['peak_rss_mb']:>7.1f} MB  "
+                  + "  ".join(f"{field} {result[field]}" for field in ("rows_per_s", "pages_per_s", "pdf_bytes")
+                              if result.get(field) is not None and (rows or field != "rows_per_s")),
+                  flush=True)
+
+    if args.save:
+        document = {
+            "meta": {
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "results": results,
+        }
+        with open(args.save, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    problems = compare(results, baseline, args.tolerance)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
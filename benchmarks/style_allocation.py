@@ -0,0 +1,69 @@
+"""Per-request cost of building report styles vs. using the shared registry.
+
+Run from the repository root:
+
+    python -m benchmarks.style_allocation [iterations]
+"""
+import sys
+import time
+import tracemalloc
+from app.services.pdf.styles import (
+    build_styles,
+    get_farmer_table_style,
+    get_ledger_table_style,
+    get_summary_table_style,
+    get_transaction_table_style,
+    report_styles,
+)
+
+
+def rebuilt_per_request():
+    """What every report used to do: a fresh stylesheet and fresh TableStyles"""
+    styles = build_styles()
+    tables = [
+        get_farmer_table_style(),
+        get_summary_table_style(),
+        get_transaction_table_style(),
+        get_transaction_table_style(),
+        get_ledger_table_style(),
+    ]
+    return styles, tables
+
+
+def shared_registry():
+    styles = report_styles
+    tables = [
+        styles.farmer_table,
+        styles.summary_table,
+        styles.transaction_table,
+        styles.transaction_table,
+        styles.ledger_table,
+    ]
+    return styles, tables
+
+
+def measure(fn, iterations: int) -> dict:
+    fn()  # warm up imports and caches
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    started = time.perf_counter()
+    kept = [fn() for _ in range(iterations)]
+    elapsed = time.perf_counter() - started
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del kept
+    return {
+        "us_per_request": round(elapsed / iterations * 1e6, 2),
+        "bytes_per_request": round(allocated / iterations),
+    }
+
+
+def main(iterations: int = 2000) -> None:
+    for name, fn in (("rebuilt_per_request", rebuilt_per_request), ("shared_registry", shared_registry)):
+        result = measure(fn, iterations)
+        print(f"{name:22} {result['us_per_request']:>10} us/request {result['bytes_per_request']:>10} bytes/request")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
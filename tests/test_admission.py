@@ -0,0 +1,59 @@
+"""Rate limits and render admission as clients see them: 429, 503 and 413 with their headers."""
+import asyncio
+import httpx
+import pytest
+from app.main import app
+from app.routers import finance
+from app.services import admission
+from app.services.admission import AdmissionController, RateLimiter
+from benchmarks.payloads import synthetic_payload_dict
+
+
+def _post(path: str, json, hold: int = 0, controller: AdmissionController = None):
+    """POST to the app, optionally while ``hold`` of ``controller``'s capacity is taken"""
+
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            if not hold:
+                return await client.post(path, json=json)
+            async with controller.admit(hold):
+                return await client.post(path, json=json)
+
+    return asyncio.run(send())
+
+
+def test_rate_limit_answers_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(admission, "rate_limiter", RateLimiter(per_minute=6, burst=2))
+    # An empty batch passes the rate limit, then fails validation
+    assert [_post("/api/generate-reports/batch", []).status_code for _ in range(2)] == [400, 400]
+    response = _post("/api/generate-reports/batch", [])
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["retry-after"]) <= 10
+
+
+def test_busy_admission_answers_503(monkeypatch):
+    controller = AdmissionController(capacity=1000, max_wait=0.05)
+    monkeypatch.setattr(finance, "admission", controller)
+    response = _post("/api/generate-report", synthetic_payload_dict(10, seed=4291), hold=1000, controller=controller)
+    assert response.status_code == 503
+    assert "retry-after" in response.headers
+    assert controller.in_flight == 0 and controller.waiting == 0
+
+
+def test_report_above_capacity_answers_413(monkeypatch):
+    monkeypatch.setattr(finance, "admission", AdmissionController(capacity=100, max_wait=1))
+    response = _post("/api/generate-report", synthetic_payload_dict(10, seed=4292))
+    assert response.status_code == 413
+    assert "max_pages" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("burst", [1, 3])
+def test_charged_batch_items_throttle_the_client(burst):
+    limiter = RateLimiter(per_minute=60, burst=burst)
+    limiter.acquire("client")
+    limiter.charge("client", 5)
+    with pytest.raises(admission.RateLimited) as excinfo:
+        limiter.acquire("client")
+    # Five tokens in debt plus the one to take, at one a second
+    assert excinfo.value.retry_after == pytest.approx(6 - (burst - 1), abs=0.5)
@@ -0,0 +1,66 @@
+"""The REPORT_JSON_FAST_PATH decoder: same figures, ledger, ETag and errors as FinancePayload validation."""
+import json
+import pytest
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from app.models import FinancePayload
+from app.services.aggregates import aggregate_payload
+from app.services.fast_json import decode_finance_payload
+from app.services.report_cache import etag_for, payload_fingerprint
+from app.services.report_options import ReportOptions
+from app.services.transactions import ColumnarPayload, iter_ledger_entries
+from benchmarks.payloads import synthetic_payload_dict
+
+
+def _decode_both(data: dict):
+    body = json.dumps(data).encode()
+    return decode_finance_payload(body), FinancePayload.model_validate_json(body)
+
+
+@pytest.mark.parametrize("rows", [2, 300])
+def test_fast_path_matches_model_validation(rows):
+    data = synthetic_payload_dict(rows, seed=rows)
+    # Empty and missing descriptions as well as null ones
+    data["expenses"][0]["description"] = ""
+    data["income"][0].pop("description", None)
+    fast, model = _decode_both(data)
+    assert isinstance(fast, ColumnarPayload)
+
+    fast_figures, model_figures = aggregate_payload(fast), aggregate_payload(model)
+    assert fast_figures.totals() == model_figures.totals()
+    assert fast_figures.expense_by_category == model_figures.expense_by_category
+    assert fast_figures.income_by_category == model_figures.income_by_category
+    assert fast_figures.by_month == model_figures.by_month
+    assert list(iter_ledger_entries(fast_figures.expenses, fast_figures.income)) == \
+        list(iter_ledger_entries(model_figures.expenses, model_figures.income))
+
+
+def test_fast_path_keeps_the_etag():
+    fast, model = _decode_both(synthetic_payload_dict(50, seed=7))
+    assert etag_for(payload_fingerprint(fast)) == etag_for(payload_fingerprint(model))
+    options = ReportOptions(max_pages=2)
+    assert payload_fingerprint(fast, options) == payload_fingerprint(model, options)
+
+
+@pytest.mark.parametrize("field, value", [
+    ("amount", -5),
+    ("amount", True),
+    ("amount", "12.5"),
+    ("expense_date", "2024-6-1"),
+    ("category", ""),
+])
+def test_fast_path_falls_back_to_model(field, value):
+    data = synthetic_payload_dict(5, seed=1)
+    data["expenses"][1][field] = value
+    body = json.dumps(data).encode()
+    try:
+        expected = FinancePayload.model_validate_json(body)
+    except ValidationError as e:
+        with pytest.raises(RequestValidationError) as excinfo:
+            decode_finance_payload(body)
+        assert [error["loc"] for error in excinfo.value.errors()] == \
+            [("body", *error["loc"]) for error in e.errors()]
+    else:
+        # Valid after coercion ("12.5"): the model path decodes it
+        decoded = decode_finance_payload(body)
+        assert aggregate_payload(decoded).totals() == aggregate_payload(expected).totals()
@@ -0,0 +1,72 @@
+"""Upload parsing: rows land in the right columns and row errors carry their line numbers."""
+import pytest
+from app.services.ingest import TransactionUploadParser, UploadInvalid, UploadRejected, UploadTooLarge
+
+CSV_BODY = (
+    b"type,category,amount,date,description\n"
+    b'expense,Seeds,100,2024-06-01,"bought in\ntwo lots"\n'
+    b"income,Crop Sale,abc,2024-06-02,\n"
+    b"income,Crop Sale,500,2024-06-03,\n"
+)
+
+
+def _parse(body: bytes, content_type: str, chunk_size: int = 0, **kwargs):
+    parser = TransactionUploadParser(content_type, **kwargs)
+    chunk_size = chunk_size or len(body)
+    for start in range(0, len(body), chunk_size):
+        parser.feed(body[start:start + chunk_size])
+    return parser.finish()
+
+
+@pytest.mark.parametrize("chunk_size", [0, 7])
+def test_csv_error_line_counts_quoted_newlines(chunk_size):
+    with pytest.raises(UploadInvalid) as excinfo:
+        _parse(CSV_BODY, "text/csv", chunk_size, batch_rows=1)
+    assert excinfo.value.error_count == 1
+    assert excinfo.value.errors == [{"line": 4, "field": "amount", "message": "Must be a number greater than 0"}]
+
+
+def test_csv_quoted_newline_kept_in_description():
+    body = CSV_BODY.replace(b"abc", b"250")
+    expenses, income = _parse(body, "text/csv", 5, batch_rows=1)
+    assert expenses.description_labels() == ["bought in\ntwo lots"]
+    assert expenses.amounts.tolist() == [100.0]
+    assert income.amounts.tolist() == [250.0, 500.0]
+
+
+def test_ndjson_errors_by_line():
+    body = (
+        b'{"type": "expense", "category": "Seeds", "amount": 100, "date": "2024-06-01"}\n'
+        b"{not json\n"
+        b"\n"
+        b'{"type": "income", "category": "Crop Sale", "amount": 5, "date": "2024-13-01"}\n'
+        b"[1]\n"
+        b'{"type": "income", "category": "Crop Sale", "amount": -1, "date": "2024-06-02"}\n'
+    )
+    with pytest.raises(UploadInvalid) as excinfo:
+        _parse(body, "application/x-ndjson")
+    errors = sorted((error["line"], error["field"]) for error in excinfo.value.errors)
+    assert errors == [(2, None), (4, "date"), (5, None), (6, "amount")]
+    assert excinfo.value.error_count == 4
+
+
+def test_ndjson_accepts_item_shaped_rows():
+    body = (
+        b'{"type": "expense", "category": "Seeds", "amount": 100, "expense_date": "2024-06-01"}\n'
+        b'{"type": "income", "category": "Crop Sale", "amount": 900, "income_date": "2024-06-20", '
+        b'"description": "Mandi"}'
+    )
+    expenses, income = _parse(body, "application/x-ndjson")
+    assert expenses.iso_dates() == ["2024-06-01"]
+    assert income.description_labels() == ["Mandi"]
+
+
+def test_csv_header_must_name_required_columns():
+    with pytest.raises(UploadRejected, match="missing column"):
+        _parse(b"type,category,amount\nexpense,Seeds,1\n", "text/csv")
+
+
+def test_too_many_rows_of_one_type():
+    rows = b"".join(b"expense,Seeds,10,2024-06-01\n" for _ in range(30))
+    with pytest.raises(UploadTooLarge, match="expense rows"):
+        _parse(b"type,category,amount,date\n" + rows, "text/csv", batch_rows=10, max_items=25)
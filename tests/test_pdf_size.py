@@ -0,0 +1,13 @@
+"""PDF byte-size regression check: the reference reports of ``benchmarks.pdf_size`` against their budgets."""
+import json
+from benchmarks.pdf_size import BUDGETS_PATH, check, render_sizes, sample_sizes
+
+TOLERANCE = 0.02
+
+
+def test_reference_reports_within_budget():
+    budgets = json.loads(BUDGETS_PATH.read_text())
+    results = render_sizes()
+    assert set(results) == set(budgets), "re-record benchmarks/pdf_sizes.json after changing the reference reports"
+    problems = check(results, budgets, sample_sizes(), TOLERANCE)
+    assert not problems, "\n".join(problems)
@@ -0,0 +1,57 @@
+"""Season reports replay unchanged pages from the store and still match a full render byte for byte."""
+from datetime import date, datetime
+import pytest
+from reportlab import rl_config
+from app.models import ExpenseItem, IncomeItem
+from app.services.season_report import render_season_report
+from app.services.seasons import SeasonStore
+from benchmarks.payloads import synthetic_payload
+
+GENERATED_AT = datetime(2024, 11, 1, 9, 30)
+
+
+@pytest.fixture(autouse=True)
+def invariant_pdfs(monkeypatch):
+    # No creation timestamps or random document ids, so renders can be compared
+    monkeypatch.setattr(rl_config, "invariant", 1)
+
+
+def _season(tmp_path, name: str, payload, *appends):
+    store = SeasonStore(str(tmp_path / f"{name}.sqlite3"))
+    season_id = store.create(payload.farmer_details)
+    store.append(season_id, payload.expenses, payload.income)
+    for expenses, income in appends:
+        store.append(season_id, expenses, income)
+    return store, season_id
+
+
+def test_rerender_reuses_pages(tmp_path):
+    store, season_id = _season(tmp_path, "season", synthetic_payload(600))
+    cold = render_season_report(season_id, GENERATED_AT, store)
+    warm = render_season_report(season_id, GENERATED_AT, store)
+    assert cold.stats["reused_pages"] == 0
+    assert warm.stats["reused_pages"] > 0
+    assert warm.stats["pages"] == cold.stats["pages"]
+    assert warm.data == cold.data
+    store.close()
+
+
+def test_appended_season_matches_full_render(tmp_path):
+    payload = synthetic_payload(600)
+    late_expense = ([ExpenseItem(category="Seeds", amount=123.45, expense_date=date(2024, 10, 30),
+                                 description="late")], [])
+    backdated_income = ([], [IncomeItem(category="Subsidy", amount=500, income_date=date(2024, 7, 1))])
+
+    store, season_id = _season(tmp_path, "incremental", payload)
+    render_season_report(season_id, GENERATED_AT, store)
+    for expenses, income in (late_expense, backdated_income):
+        store.append(season_id, expenses, income)
+        incremental = render_season_report(season_id, GENERATED_AT, store)
+    assert incremental.stats["reused_pages"] > 0
+
+    reference_store, reference_id = _season(tmp_path, "reference", payload, late_expense, backdated_income)
+    reference = render_season_report(reference_id, GENERATED_AT, reference_store)
+    assert reference.stats["reused_pages"] == 0
+    assert incremental.data == reference.data
+    store.close()
+    reference_store.close()
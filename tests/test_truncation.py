@@ -0,0 +1,66 @@
+"""``max_pages``: the report stops after that many pages, says so on its last page and is flagged truncated."""
+import re
+import zlib
+from datetime import datetime
+import pytest
+from app.services.finance_report_generator import FinanceReportGenerator
+from app.services.report_options import ReportOptions
+from benchmarks.payloads import synthetic_payload
+
+GENERATED_AT = datetime(2024, 11, 1, 9, 30)
+NOTE = b"Report truncated at page"
+
+
+def _render(payload, max_pages=None):
+    generator = FinanceReportGenerator()
+    options = ReportOptions(max_pages=max_pages) if max_pages else None
+    pdf = generator.generate(payload, GENERATED_AT, options=options).getvalue()
+    return pdf, generator.stats
+
+
+def _page_count(pdf: bytes) -> int:
+    return int(re.search(rb"/Count (\d+) /Kids", pdf).group(1))
+
+
+def _streams(pdf: bytes):
+    for match in re.finditer(rb"stream\r?\n(.*?)endstream", pdf, re.S):
+        try:
+            yield zlib.decompressobj().decompress(match.group(1))
+        except zlib.error:
+            # Images
+            continue
+
+
+@pytest.fixture(scope="module")
+def payload():
+    return synthetic_payload(400)
+
+
+@pytest.fixture(scope="module")
+def full_pages(payload):
+    pdf, stats = _render(payload)
+    assert not stats["truncated"]
+    assert stats["pages"] == _page_count(pdf) > 4
+    return stats["pages"]
+
+
+@pytest.mark.parametrize("max_pages", [1, 3])
+def test_page_limit_truncates(payload, full_pages, max_pages):
+    pdf, stats = _render(payload, max_pages)
+    assert stats["truncated"]
+    assert stats["pages"] == _page_count(pdf) == max_pages
+    assert sum(NOTE in stream for stream in _streams(pdf)) == 1
+
+
+def test_last_page_before_the_limit(payload, full_pages):
+    pdf, stats = _render(payload, full_pages - 1)
+    assert stats["truncated"]
+    assert _page_count(pdf) == full_pages - 1
+
+
+@pytest.mark.parametrize("extra", [0, 5])
+def test_limit_at_or_above_the_length_is_not_truncation(payload, full_pages, extra):
+    pdf, stats = _render(payload, full_pages + extra)
+    assert not stats["truncated"]
+    assert _page_count(pdf) == full_pages
+    assert not any(NOTE in stream for stream in _streams(pdf))